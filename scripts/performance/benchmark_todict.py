@@ -0,0 +1,133 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Compares azure.cli.core.util.todict with the previous implementation on synthetic results.
+
+Usage: python benchmark_todict.py [--count N] [--repeat R]
+"""
+
+from __future__ import print_function
+
+import argparse
+import re
+import timeit
+from datetime import datetime, timedelta
+from enum import Enum
+
+from msrest.serialization import Model
+
+from azure.cli.core.util import todict
+
+KEYS_CAMELCASE_PATTERN = re.compile('(?!^)_([a-zA-Z])')
+
+
+def legacy_todict(obj):  # pylint: disable=too-many-return-statements
+    """ The implementation of todict before per-class key maps were introduced. """
+    def to_camel_case(s):
+        return re.sub(KEYS_CAMELCASE_PATTERN, lambda x: x.group(1).upper(), s)
+
+    if isinstance(obj, dict):
+        return {k: legacy_todict(v) for (k, v) in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_todict(a) for a in obj]
+    elif isinstance(obj, Enum):
+        return obj.value
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, timedelta):
+        return str(obj)
+    elif hasattr(obj, '_asdict'):
+        return legacy_todict(obj._asdict())
+    elif hasattr(obj, '__dict__'):
+        return dict([(to_camel_case(k), legacy_todict(v))
+                     for k, v in obj.__dict__.items()
+                     if not callable(v) and not k.startswith('_')])
+    return obj
+
+
+class ProvisioningState(Enum):
+    succeeded = 'Succeeded'
+    failed = 'Failed'
+
+
+class SubResource(Model):
+    _attribute_map = {'id': {'key': 'id', 'type': 'str'}}
+
+    def __init__(self, id=None):  # pylint: disable=redefined-builtin
+        super(SubResource, self).__init__()
+        self.id = id
+
+
+class IPConfiguration(Model):
+    _attribute_map = {
+        'id': {'key': 'id', 'type': 'str'},
+        'name': {'key': 'name', 'type': 'str'},
+        'private_ip_address': {'key': 'properties.privateIPAddress', 'type': 'str'},
+        'private_ip_allocation_method': {'key': 'properties.privateIPAllocationMethod', 'type': 'str'},
+        'subnet': {'key': 'properties.subnet', 'type': 'SubResource'},
+        'primary': {'key': 'properties.primary', 'type': 'bool'},
+        'provisioning_state': {'key': 'properties.provisioningState', 'type': 'str'},
+    }
+
+    def __init__(self, index):
+        super(IPConfiguration, self).__init__()
+        self.id = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/' \
+                  'networkInterfaces/nic{0}/ipConfigurations/ipconfig{0}'.format(index)
+        self.name = 'ipconfig{}'.format(index)
+        self.private_ip_address = '10.0.{}.{}'.format(index // 256 % 256, index % 256)
+        self.private_ip_allocation_method = 'Dynamic'
+        self.subnet = SubResource('/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/'
+                                  'virtualNetworks/vnet/subnets/default')
+        self.primary = True
+        self.provisioning_state = ProvisioningState.succeeded
+
+
+class NetworkInterface(Model):
+    _attribute_map = {
+        'id': {'key': 'id', 'type': 'str'},
+        'name': {'key': 'name', 'type': 'str'},
+        'location': {'key': 'location', 'type': 'str'},
+        'tags': {'key': 'tags', 'type': '{str}'},
+        'ip_configurations': {'key': 'properties.ipConfigurations', 'type': '[IPConfiguration]'},
+        'mac_address': {'key': 'properties.macAddress', 'type': 'str'},
+        'enable_accelerated_networking': {'key': 'properties.enableAcceleratedNetworking', 'type': 'bool'},
+        'resource_guid': {'key': 'properties.resourceGuid', 'type': 'str'},
+        'created_time': {'key': 'properties.createdTime', 'type': 'iso-8601'},
+    }
+
+    def __init__(self, index):
+        super(NetworkInterface, self).__init__()
+        self.id = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/' \
+                  'networkInterfaces/nic{}'.format(index)
+        self.name = 'nic{}'.format(index)
+        self.location = 'westus'
+        self.tags = {'env': 'test', 'index': str(index)}
+        self.ip_configurations = [IPConfiguration(index)]
+        self.mac_address = '00-0D-3A-00-{:02X}-{:02X}'.format(index // 256 % 256, index % 256)
+        self.enable_accelerated_networking = False
+        self.resource_guid = '00000000-0000-0000-0000-{:012d}'.format(index)
+        self.created_time = datetime(2017, 9, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000, help='number of objects in the result')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+
+    result = [NetworkInterface(i) for i in range(args.count)]
+    if todict(result) != legacy_todict(result):
+        raise AssertionError('todict output differs from the previous implementation')
+
+    print('Serializing {} network interfaces, best of {} runs:'.format(args.count, args.repeat))
+    timings = {}
+    for name, func in (('legacy', legacy_todict), ('todict', todict)):
+        timings[name] = min(timeit.repeat(lambda: func(result), number=1, repeat=args.repeat))  # pylint: disable=cell-var-from-loop
+        print('  {:8} {:8.3f}s'.format(name, timings[name]))
+    print('  speedup  {:8.2f}x'.format(timings['legacy'] / timings['todict']))
+
+
+if __name__ == '__main__':
+    main()
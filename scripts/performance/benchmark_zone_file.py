@@ -0,0 +1,70 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Measures parse_zone_file on a synthetic zone file with a mix of record types.
+
+Usage: python benchmark_zone_file.py [--count N] [--repeat R]
+"""
+
+from __future__ import print_function
+
+import argparse
+import timeit
+
+from azure.cli.command_modules.network.zone_file import parse_zone_file
+
+ZONE_NAME = 'example.com.'
+
+
+def make_zone_text(count):
+    """ Returns a zone file with about count records, like the exports of a DNS registrar. """
+    lines = [
+        '; synthetic zone file for {}'.format(ZONE_NAME),
+        '$TTL 1h',
+        '@ IN SOA ns1.example.com. hostmaster (',
+        '         2017091801 ; serial',
+        '         12h 15m 3w 3h )',
+        '@ 1d IN NS ns1.example.com.',
+    ]
+    for index in range(count // 8):
+        if index % 1000 == 0:
+            lines.append('$ORIGIN sub{}.{}'.format(index // 1000, ZONE_NAME))
+        name = 'host{}'.format(index)
+        lines.extend([
+            '{} 300 IN A 10.{}.{}.1'.format(name, index // 256 % 256, index % 256),
+            '           300 IN A 10.{}.{}.2 ; same record set'.format(index // 256 % 256, index % 256),
+            '{} IN AAAA 2001:db8::{:x}'.format(name, index),
+            'www.{} IN CNAME {}'.format(name, name),
+            'mail.{} IN MX 10 mx{}.example.com.'.format(name, index % 10),
+            '_sip._tcp.{} IN SRV 10 20 5060 sip.{}'.format(name, name),
+            'txt.{} IN TXT ( "v=spf1 include:_spf.example.com"'.format(name),
+            '                "-all \\"quoted\\"; text" )',
+            'ptr.{} PTR {}.example.com.'.format(name, name)
+        ])
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000, help='number of records in the zone')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs')
+    args = parser.parse_args()
+
+    text = make_zone_text(args.count)
+    zone = parse_zone_file(text, ZONE_NAME)
+    record_count = sum(len(records) if isinstance(records, list) else 1
+                       for record_sets in zone.values() for records in record_sets.values())
+
+    print('Parsing {} records ({:.1f} MB), best of {} runs:'.format(
+        record_count, len(text) / 1024.0 / 1024.0, args.repeat))
+    # splitting the text into words is the least any parser does
+    split = min(timeit.repeat(lambda: [line.split() for line in text.splitlines()], number=1, repeat=args.repeat))
+    parse = min(timeit.repeat(lambda: parse_zone_file(text, ZONE_NAME), number=1, repeat=args.repeat))
+    print('  {:8} {:8.3f}s'.format('split', split))
+    print('  {:8} {:8.3f}s {:10.0f} records/s'.format('parse', parse, record_count / parse))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,8 +9,10 @@ import errno
 import sys
 import platform
 import json
+import re
 import traceback
 from collections import OrderedDict
+from itertools import islice
 from six import StringIO, text_type, u, string_types
 import colorama
 from tabulate import tabulate
@@ -34,12 +36,22 @@ class ComplexEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, o)
 
 
-def format_json(obj):
-    result = obj.result
+# number of rows used to lay out the columns of a streamed table
+STREAM_TABLE_BUFFER_SIZE = 1000
+
+# a table transformer that projects each item of a list, e.g. '[].{Name:name}'
+_ITEM_PROJECTION_PATTERN = re.compile(r'^\s*\[\]\.([^|]+)$')
+
+
+def _dump_json(result):
     # OrderedDict.__dict__ is always '{}', to persist the data, convert to dict first.
     input_dict = dict(result) if hasattr(result, '__dict__') else result
     return json.dumps(input_dict, indent=2, sort_keys=True, cls=ComplexEncoder,
-                      separators=(',', ': ')) + '\n'
+                      separators=(',', ': '))
+
+
+def format_json(obj):
+    return _dump_json(obj.result) + '\n'
 
 
 def format_json_color(obj):
@@ -86,12 +98,72 @@ def format_tsv(obj):
     return TsvOutput.dump(result_list)
 
 
+def stream_json(obj):
+    """ Yields the items of a streamed result as a JSON array, one item at a time. The output
+    is identical to format_json of the whole list. """
+    empty = True
+    for item in obj.result:
+        yield ('[\n  ' if empty else ',\n  ') + _dump_json(item).replace('\n', '\n  ')
+        empty = False
+    yield '[]\n' if empty else '\n]\n'
+
+
+def stream_tsv(obj):
+    for item in obj.result:
+        yield TsvOutput.dump([item])
+
+
+def stream_table(obj):
+    items = obj.result
+    if obj.table_transformer:
+        match = _ITEM_PROJECTION_PATTERN.match(obj.table_transformer) \
+            if isinstance(obj.table_transformer, string_types) else None
+        if not match:
+            # the transformer needs the whole list
+            yield format_table(CommandResultItem(list(items), table_transformer=obj.table_transformer))
+            return
+        from jmespath import compile as compile_jmes, Options
+        expression = compile_jmes(match.group(1))
+        items = (item for item in (expression.search(item, Options(OrderedDict)) for item in obj.result)
+                 if item is not None)
+    try:
+        for chunk in TableOutput(should_sort_keys=not obj.table_transformer).dump_stream(items):
+            yield chunk
+    except ValueError:
+        logger.debug(traceback.format_exc())
+        raise CLIError("Table output unavailable. "
+                       "Use the --query option to specify an appropriate query. "
+                       "Use --debug for more info.")
+
+
 class CommandResultItem(object):  # pylint: disable=too-few-public-methods
 
-    def __init__(self, result, table_transformer=None, is_query_active=False):
+    def __init__(self, result, table_transformer=None, is_query_active=False, error=None):
         self.result = result
         self.table_transformer = table_transformer
         self.is_query_active = is_query_active
+        # raised once the result is output, e.g. when only some of the --ids operations succeeded
+        self.error = error
+
+
+class StreamingResult(object):
+    """ A list result whose items are retrieved and converted lazily, e.g. the pages of a
+    paged list operation. Output formats that support it write each item as it arrives
+    instead of waiting for the whole list. """
+
+    def __init__(self, iterable):
+        self._iterable = iterable
+        self._converters = []
+
+    def add_converter(self, converter):
+        """ Registers a function applied to every item in turn. """
+        self._converters.append(converter)
+
+    def __iter__(self):
+        for item in self._iterable:
+            for converter in self._converters:
+                item = converter(item)
+            yield item
 
 
 class OutputProducer(object):  # pylint: disable=too-few-public-methods
@@ -104,6 +176,12 @@ class OutputProducer(object):  # pylint: disable=too-few-public-methods
         'tsv': format_tsv,
     }
 
+    stream_format_dict = {
+        format_json: stream_json,
+        format_table: stream_table,
+        format_tsv: stream_tsv,
+    }
+
     def __init__(self, formatter, file=sys.stdout):  # pylint: disable=redefined-builtin
         self.formatter = formatter
         self.file = file
@@ -111,17 +189,27 @@ class OutputProducer(object):  # pylint: disable=too-few-public-methods
     def out(self, obj):
         if platform.system() == 'Windows':
             self.file = colorama.AnsiToWin32(self.file).stream
-        output = self.formatter(obj)
+        if isinstance(obj.result, StreamingResult):
+            stream_formatter = OutputProducer.stream_format_dict.get(self.formatter)
+            if stream_formatter:
+                for output in stream_formatter(obj):
+                    if not self._print(output):
+                        break
+                return
+            obj.result = list(obj.result)
+        self._print(self.formatter(obj))
+
+    def _print(self, output):
         try:
             print(output, file=self.file, end='')
         except IOError as ex:
             if ex.errno == errno.EPIPE:
-                pass
-            else:
-                raise
+                return False
+            raise
         except UnicodeEncodeError:
             print(output.encode('ascii', 'ignore').decode('utf-8', 'ignore'),
                   file=self.file, end='')
+        return True
 
     @staticmethod
     def get_formatter(format_type):
@@ -166,7 +254,36 @@ class TableOutput(object):  # pylint: disable=too-few-public-methods
         return self._auto_table_item(result)
 
     def dump(self, data):
-        table_data = self._auto_table(data)
+        return TableOutput._dump_table(self._auto_table(data))
+
+    def dump_stream(self, data, buffer_size=STREAM_TABLE_BUFFER_SIZE):
+        """ Yields the table of an iterable of items in chunks. The columns and their widths are
+        laid out from the first `buffer_size` items; later rows are aligned to them. """
+        data = iter(data)
+        table_data = self._auto_table(list(islice(data, buffer_size)))
+        table_str = TableOutput._dump_table(table_data)
+        yield table_str
+        if not table_data:
+            return
+
+        columns = []
+        for row in table_data:
+            columns.extend(k for k in row if k not in columns)
+        widths = [len(dashes) for dashes in table_str.split('\n')[1].split('  ')]
+        numeric = [all(isinstance(row[k], (int, float)) and not isinstance(row[k], bool)
+                       for row in table_data if k in row) for k in columns]
+        for item in data:
+            row = self._auto_table_item(item)
+            cells = []
+            for column, width, is_numeric in zip(columns, widths, numeric):
+                value = row.get(column, '')
+                value = format(value, 'g') if isinstance(value, float) else value
+                value = value if isinstance(value, string_types) else str(value)
+                cells.append(value.rjust(width) if is_numeric else value.ljust(width))
+            yield '  '.join(cells).rstrip() + '\n'
+
+    @staticmethod
+    def _dump_table(table_data):
         table_str = tabulate(table_data, headers="keys", tablefmt="simple") if table_data else ''
         if table_str == '\n':
             raise ValueError('Unable to extract fields for table.')
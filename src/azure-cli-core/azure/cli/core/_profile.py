@@ -300,7 +300,13 @@ class Profile(object):
             default_sub_id = new_active_one[_SUBSCRIPTION_ID]
 
             set_cloud_subscription(active_cloud.name, default_sub_id)
+        self._save_subscriptions(subscriptions)
+
+    def _save_subscriptions(self, subscriptions):
         self._storage[_SUBSCRIPTIONS] = subscriptions
+        # the cached management clients and credentials may belong to the previous accounts
+        from azure.cli.core.commands.client_factory import clear_client_caches
+        clear_client_caches()
 
     @staticmethod
     def _pick_working_subscription(subscriptions):
@@ -326,7 +332,7 @@ class Profile(object):
         result[0][_IS_DEFAULT_SUBSCRIPTION] = True
 
         set_cloud_subscription(active_cloud.name, result[0][_SUBSCRIPTION_ID])
-        self._storage[_SUBSCRIPTIONS] = subscriptions
+        self._save_subscriptions(subscriptions)
 
     def logout(self, user_or_sp):
         subscriptions = self.load_cached_subscriptions(all_clouds=True)
@@ -334,11 +340,11 @@ class Profile(object):
                   if user_or_sp.lower() == x[_USER_ENTITY][_USER_NAME].lower()]
         subscriptions = [x for x in subscriptions if x not in result]
 
-        self._storage[_SUBSCRIPTIONS] = subscriptions
+        self._save_subscriptions(subscriptions)
         self._creds_cache.remove_cached_creds(user_or_sp)
 
     def logout_all(self):
-        self._storage[_SUBSCRIPTIONS] = []
+        self._save_subscriptions([])
         self._creds_cache.remove_all_cached_creds()
 
     def load_cached_subscriptions(self, all_clouds=False):
@@ -5,6 +5,9 @@
 
 import json
 import os
+import stat
+import sys
+import tempfile
 import time
 try:
     import collections.abc as collections
@@ -15,6 +18,15 @@ except ImportError:
 from codecs import open as codecs_open
 
 
+def _replace(src, dst):
+    try:
+        os.replace(src, dst)
+    except AttributeError:  # Python 2 has no os.replace, and os.rename doesn't replace files on Windows
+        if sys.platform == 'win32' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
 class Session(collections.MutableMapping):
     '''A simple dict-like class that is backed by a JSON file.
 
@@ -43,8 +55,22 @@ class Session(collections.MutableMapping):
 
     def save(self):
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            # write a temporary file and move it over the session file, so that other processes
+            # never read a partially written file
+            fd, temp_filename = tempfile.mkstemp(dir=os.path.dirname(self.filename) or None,
+                                                 prefix=os.path.basename(self.filename) + '.', suffix='.tmp')
+            os.close(fd)
+            try:
+                with codecs_open(temp_filename, 'w', encoding=self._encoding) as f:
+                    json.dump(self.data, f)
+                try:
+                    os.chmod(temp_filename, stat.S_IMODE(os.stat(self.filename).st_mode))
+                except OSError:
+                    pass
+                _replace(temp_filename, self.filename)
+            finally:
+                if os.path.exists(temp_filename):
+                    os.remove(temp_filename)
 
     def save_with_retry(self, retries=5):
         for _ in range(retries - 1):
@@ -85,3 +111,6 @@ CONFIG = Session()
 
 # SESSION provides read-write session variables
 SESSION = Session()
+
+# INDEX contains the precompiled command index (command name -> owning module)
+INDEX = Session()
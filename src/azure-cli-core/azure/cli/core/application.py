@@ -8,12 +8,13 @@ import sys
 import os
 import uuid
 import argparse
+import threading
 from azure.cli.core.parser import AzCliCommandParser, enable_autocomplete
-from azure.cli.core._output import CommandResultItem
+from azure.cli.core._output import CommandResultItem, StreamingResult
 import azure.cli.core.extensions
 import azure.cli.core._help as _help
 import azure.cli.core.azlogging as azlogging
-from azure.cli.core.util import todict, truncate_text, CLIError, read_file_content
+from azure.cli.core.util import todict, truncate_text, CLIError, PartialResultError, read_file_content
 from azure.cli.core._config import az_config
 import azure.cli.core.commands.progress as progress
 
@@ -23,6 +24,10 @@ logger = azlogging.get_az_logger(__name__)
 
 ARGCOMPLETE_ENV_NAME = '_ARGCOMPLETE'
 
+# number of concurrent invocations of a command given several values for a list argument (e.g. --ids),
+# unless the command sets its own max_workers
+DEFAULT_MAX_WORKERS = 1
+
 
 class Configuration(object):  # pylint: disable=too-few-public-methods
     """The configuration object tracks session specific data such
@@ -111,7 +116,9 @@ class Application(object):
             'command': 'unknown',
             'completer_active': ARGCOMPLETE_ENV_NAME in os.environ,
             'query_active': False,
-            'az_interactive_active': False
+            'az_interactive_active': False,
+            'stream_output': False,
+            'invocation_count': 0
         }
 
         # Register presence of and handlers for global parameters
@@ -128,8 +135,15 @@ class Application(object):
         self.parser = AzCliCommandParser(prog='az', parents=[self.global_parser])
         self.configuration = configuration
         self.progress_controller = progress.ProgressHook()
+        self._worker = threading.local()
 
     def get_progress_controller(self, det=False):
+        # invocations running on a worker thread each get their own controller so concurrent
+        # operations don't reset one another's progress, and don't draw over each other
+        worker_controller = getattr(self._worker, 'progress_controller', None)
+        if worker_controller:
+            worker_controller.init_progress(progress.SilentProgressView())
+            return worker_controller
         self.progress_controller.init_progress(progress.get_progress_view(det))
         return self.progress_controller
 
@@ -184,7 +198,8 @@ class Application(object):
         args = self.parser.parse_args(argv)
 
         self.raise_event(self.COMMAND_PARSER_PARSED, command=args.command, args=args)
-        results = []
+        iterate_arg_names = [name for name, value in vars(args).items() if isinstance(value, IterateValue)]
+        invocations = []
         for expanded_arg in _explode_list_args(args):
             self.session['command'] = expanded_arg.command
             try:
@@ -204,25 +219,94 @@ class Application(object):
             params.pop('subcommand', None)
             params.pop('func', None)
             params.pop('command', None)
-
-            telemetry.set_command_details(expanded_arg.command,
-                                          self.configuration.output_format,
-                                          [p for p in unexpanded_argv if p.startswith('-')])
-
-            result = expanded_arg.func(params)
-            result = todict(result)
-            results.append(result)
-
-        if len(results) == 1:
+            invocations.append((expanded_arg, params))
+
+        telemetry.set_command_details(args.command,
+                                      self.configuration.output_format,
+                                      [p for p in unexpanded_argv if p.startswith('-')])
+
+        # Paged results of a single invocation are written out as they are retrieved unless
+        # the output has to be queried as a whole.
+        self.session['stream_output'] = len(invocations) == 1 and \
+            not self.session['query_active'] and not self.session['az_interactive_active'] and \
+            az_config.getboolean('core', 'stream_output', fallback=True)
+        self.session['invocation_count'] = len(invocations)
+        results, error = self._invoke(invocations, iterate_arg_names,
+                                      max_workers=getattr(command_table[args.command], 'max_workers', None))
+
+        if len(invocations) == 1:
             results = results[0]
 
+        if isinstance(results, StreamingResult):
+            results.add_converter(todict)
+            results.add_converter(self._transform_item)
+
         event_data = {'result': results}
         self.raise_event(self.TRANSFORM_RESULT, event_data=event_data)
         self.raise_event(self.FILTER_RESULT, event_data=event_data)
 
         return CommandResultItem(event_data['result'],
                                  table_transformer=command_table[args.command].table_transformer,
-                                 is_query_active=self.session['query_active'])
+                                 is_query_active=self.session['query_active'],
+                                 error=error)
+
+    def _invoke(self, invocations, iterate_arg_names, max_workers=None):
+        """ Invokes the command handler once per exploded set of arguments and returns the
+        results in order along with the error to raise once they are output, if any. When a list
+        argument (e.g. --ids) produced several invocations they run on a bounded thread pool if
+        the command's own max_workers (else the configured max_workers) allows, and every
+        failure is logged. Only the results of the successful invocations are returned, or the
+        result of a PartialResultError raised by the only invocation. """
+        def _run(expanded_arg, params):
+            result = expanded_arg.func(params)
+            return result if isinstance(result, StreamingResult) else todict(result)
+
+        def _run_in_worker(expanded_arg, params):
+            self._worker.progress_controller = progress.ProgressHook()
+            try:
+                return _run(expanded_arg, params)
+            finally:
+                self._worker.progress_controller = None
+
+        if len(invocations) == 1:
+            try:
+                return [_run(*invocations[0])], None
+            except PartialResultError as ex:
+                return [todict(ex.result)], ex
+
+        max_workers = min(max_workers or _get_max_workers(), len(invocations))
+        if max_workers <= 1 or _prompts_for_confirmation(invocations[0][0]):
+            outcomes = []
+            for invocation in invocations:
+                try:
+                    outcomes.append((_run(*invocation), None))
+                except Exception as ex:  # pylint: disable=broad-except
+                    outcomes.append((None, ex))
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            logger.debug('Running %d invocations of %s with %d workers.',
+                         len(invocations), self.session['command'], max_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_run_in_worker, *invocation) for invocation in invocations]
+            outcomes = [(None, f.exception()) if f.exception() else (f.result(), None) for f in futures]
+
+        results = [result for result, ex in outcomes if not ex]
+        errors = [(invocation, ex) for invocation, (_, ex) in zip(invocations, outcomes) if ex]
+        if not errors:
+            return results, None
+        for (_, params), ex in errors:
+            logger.error("%s: %s", ', '.join(str(params.get(name)) for name in iterate_arg_names) or
+                         self.session['command'], getattr(ex, 'message', None) or ex)
+        error = CLIError('{} of {} operations failed.'.format(len(errors), len(invocations)))
+        if not results:
+            raise error
+        return results, error
+
+    def _transform_item(self, item):
+        event_data = {'result': item}
+        for func in list(self._event_handlers[self.TRANSFORM_RESULT]):
+            func(event_data=event_data)
+        return event_data['result']
 
     def raise_event(self, name, **kwargs):
         '''Raise the event `name`.
@@ -321,6 +405,19 @@ class Application(object):
         del args._output_format
 
 
+def _get_max_workers():
+    try:
+        return az_config.getint('core', 'max_workers', fallback=DEFAULT_MAX_WORKERS)
+    except ValueError:
+        raise CLIError("Invalid value for the '[core] max_workers' setting. Use a positive integer.")
+
+
+def _prompts_for_confirmation(args):
+    from azure.cli.core.commands import CONFIRM_PARAM_NAME
+    return (hasattr(args, CONFIRM_PARAM_NAME) and not getattr(args, CONFIRM_PARAM_NAME) and
+            not az_config.getboolean('core', 'disable_confirm_prompt', fallback=False))
+
+
 def _validate_arguments(args, **_):
     for validator in getattr(args, '_validators', []):
         validator(args)
@@ -8,7 +8,6 @@ from __future__ import print_function
 import datetime
 import json
 import logging as logs
-import pkgutil
 import re
 import sys
 import time
@@ -22,7 +21,7 @@ from six import string_types, reraise
 
 import azure.cli.core.azlogging as azlogging
 import azure.cli.core.telemetry as telemetry
-from azure.cli.core.util import CLIError
+from azure.cli.core.util import CLIError, get_retry_after
 from azure.cli.core.prompting import prompt_y_n, NoTTYException
 from azure.cli.core._config import az_config, DEFAULTS_SECTION
 from azure.cli.core.profiles import ResourceType, supported_api_version
@@ -38,6 +37,9 @@ logger = azlogging.get_az_logger(__name__)
 # 1 hour in milliseconds
 DEFAULT_QUERY_TIME_RANGE = 3600000
 
+# minimum seconds between two reports of the progress of template deployments
+PROGRESS_REPORT_INTERVAL = 10
+
 
 CONFIRM_PARAM_NAME = 'yes'
 
@@ -141,15 +143,31 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         self.progress_controller = progress_controller or APPLICATION.get_progress_controller()
         self.deploy_dict = {}
         self.last_progress_report = datetime.datetime.now()
+        self._monitor_client = None
 
     def _delay(self):
         time.sleep(self.poller_done_interval_ms / 1000.0)
 
-    def _generate_template_progress(self, correlation_id):  # pylint: disable=no-self-use
-        """ gets the progress for template deployments """
+    def _wait(self, poller):
+        """ Waits for the poller to complete, at most for the polling interval. Pollers running in the
+        background return as soon as the operation completes instead of sleeping the whole interval. """
+        if not hasattr(poller, 'wait'):
+            self._delay()
+            return
+        try:
+            poller.wait(timeout=self.poller_done_interval_ms / 1000.0)
+        except Exception:  # pylint: disable=broad-except
+            pass  # the failure is raised by poller.result()
+
+    def _get_monitor_client(self):
         from azure.cli.core.commands.client_factory import get_mgmt_service_client
         from azure.monitor import MonitorClient
+        if self._monitor_client is None:
+            self._monitor_client = get_mgmt_service_client(MonitorClient)
+        return self._monitor_client
 
+    def _generate_template_progress(self, correlation_id):
+        """ gets the progress for template deployments """
         if correlation_id is not None:  # pylint: disable=too-many-nested-blocks
             formatter = "eventTimestamp ge {}"
 
@@ -159,7 +177,7 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
 
             odata_filters = "{} and {} eq '{}'".format(odata_filters, 'correlationId', correlation_id)
 
-            activity_log = get_mgmt_service_client(MonitorClient).activity_logs.list(filter=odata_filters)
+            activity_log = self._get_monitor_client().activity_logs.list(filter=odata_filters)
 
             results = []
             max_events = 50  # default max value for events in list_activity_log
@@ -209,33 +227,30 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
 
     def __call__(self, poller):
         from msrest.exceptions import ClientException
-        correlation_message = ''
         self.progress_controller.begin()
-        correlation_id = None
+
+        # the correlation id of an operation doesn't change while it runs
+        correlation_id = _get_correlation_id(poller)
+        correlation_message = 'Correlation ID: {}'.format(correlation_id) if correlation_id else ''
 
         az_logger = azlogging.get_az_logger()
         is_verbose = any(handler.level <= logs.INFO for handler in az_logger.handlers)
+        # the activity log doesn't change before the service expects to be polled again
+        retry_after = get_retry_after(getattr(poller, '_response', None)) or 0
+        progress_interval = datetime.timedelta(seconds=max(PROGRESS_REPORT_INTERVAL, retry_after))
 
         while not poller.done():
             self.progress_controller.add(message='Running')
-            try:
-                # pylint: disable=protected-access
-                correlation_id = json.loads(
-                    poller._response.__dict__['_content'].decode())['properties']['correlationId']
-
-                correlation_message = 'Correlation ID: {}'.format(correlation_id)
-            except:  # pylint: disable=bare-except
-                pass
 
             current_time = datetime.datetime.now()
-            if is_verbose and current_time - self.last_progress_report >= datetime.timedelta(seconds=10):
+            if is_verbose and current_time - self.last_progress_report >= progress_interval:
                 self.last_progress_report = current_time
                 try:
                     self._generate_template_progress(correlation_id)
                 except Exception as ex:  # pylint: disable=broad-except
                     logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
             try:
-                self._delay()
+                self._wait(poller)
             except KeyboardInterrupt:
                 self.progress_controller.stop()
                 logger.error('Long running operation wait cancelled.  %s', correlation_message)
@@ -252,6 +267,14 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         return result
 
 
+def _get_correlation_id(poller):
+    try:
+        # pylint: disable=protected-access
+        return json.loads(poller._response.__dict__['_content'].decode())['properties']['correlationId']
+    except:  # pylint: disable=bare-except
+        return None
+
+
 # pylint: disable=too-few-public-methods
 class DeploymentOutputLongRunningOperation(LongRunningOperation):
     def __call__(self, result):
@@ -311,7 +334,7 @@ class CliCommand(object):  # pylint:disable=too-many-instance-attributes
 
     def __init__(self, name, handler, description=None, table_transformer=None,
                  arguments_loader=None, description_loader=None,
-                 formatter_class=None, deprecate_info=None):
+                 formatter_class=None, deprecate_info=None, max_workers=None):
         self.name = name
         self.handler = handler
         self.help = None
@@ -324,6 +347,9 @@ class CliCommand(object):  # pylint:disable=too-many-instance-attributes
         self.formatter_class = formatter_class
         self.deprecate_info = deprecate_info
         self.command_source = None
+        # the number of invocations run at the same time when a list argument like --ids is given,
+        # None for the configured '[core] max_workers'
+        self.max_workers = max_workers
 
     @staticmethod
     def _should_load_description():
@@ -387,10 +413,13 @@ mod_to_ext_map = {}
 
 
 def load_params(command):
+    from azure.cli.core.commands._command_index import get_command_index
     try:
         command_table[command].load_arguments()
     except KeyError:
         return
+    finally:
+        get_command_index().save()
     command_module = command_module_map.get(command, None)
     if not command_module:
         logger.debug("Unable to load commands for '%s'. No module in command module map found.",
@@ -405,8 +434,10 @@ def load_params(command):
     _apply_parameter_info(command, command_table[command])
 
 
-def _get_command_table_from_extensions():
+def _get_command_table_from_extensions(ext_names=None):
     extensions = get_extension_names()
+    if ext_names is not None:
+        extensions = [ext_name for ext_name in extensions if ext_name in ext_names]
     if extensions:
         logger.debug("Found {} extensions: {}".format(len(extensions), extensions))
         for ext_name in extensions:
@@ -426,11 +457,34 @@ def _get_command_table_from_extensions():
                 logger.debug(traceback.format_exc())
 
 
+def _load_command_modules(mod_names):
+    cumulative_elapsed_time = 0
+    for mod in mod_names:
+        try:
+            start_time = timeit.default_timer()
+            import_module('azure.cli.command_modules.' + mod).load_commands()
+            elapsed_time = timeit.default_timer() - start_time
+            logger.debug("Loaded module '%s' in %.3f seconds.", mod, elapsed_time)
+            cumulative_elapsed_time += elapsed_time
+        except Exception as ex:  # pylint: disable=broad-except
+            # Changing this error message requires updating CI script that checks for failed
+            # module loading.
+            logger.error("Error loading command module '%s'", mod)
+            telemetry.set_exception(exception=ex, fault_type='module-load-error-' + mod,
+                                    summary='Error loading module: {}'.format(mod))
+            logger.debug(traceback.format_exc())
+    return cumulative_elapsed_time
+
+
 def get_command_table(module_name=None):
     '''Loads command table(s)
     When `module_name` is specified, only commands from that module will be loaded.
-    If the module is not found, all commands are loaded.
+    The command index is consulted for any other module or extension owning commands in
+    that group. If neither resolves the group, all commands are loaded and the index is
+    rebuilt when stale.
     '''
+    from azure.cli.core.commands._command_index import get_command_index
+    command_index = get_command_index()
     loaded = False
     # TODO remove module_name != 'sf' once old sf module is deprecated from the repo
     if module_name and module_name not in BLACKLISTED_MODS and module_name != 'sf':
@@ -439,44 +493,33 @@ def get_command_table(module_name=None):
             logger.debug("Successfully loaded command table from module '%s'.", module_name)
             loaded = True
         except ImportError:
-            logger.debug("Loading all installed modules as module with name '%s' not found.", module_name)
+            logger.debug("Module with name '%s' not found. Looking up the command index.", module_name)
         except Exception:  # pylint: disable=broad-except
             pass
-    if not loaded:
-        installed_command_modules = []
-        try:
-            mods_ns_pkg = import_module('azure.cli.command_modules')
-            installed_command_modules = [modname for _, modname, _ in
-                                         pkgutil.iter_modules(mods_ns_pkg.__path__)
-                                         if modname not in BLACKLISTED_MODS]
-        except ImportError:
-            pass
+    index_entry = command_index.get(module_name)
+    if index_entry:
+        _load_command_modules([mod for mod in index_entry.modules if not (loaded and mod == module_name)])
+        logger.debug("Loaded command group '%s' from modules %s and extensions %s using the command index.",
+                     module_name, index_entry.modules, index_entry.extensions)
+        loaded = True
+    full_load = not loaded
+    if full_load:
+        installed_command_modules = sorted(command_index.version['modules'])
         logger.debug('Installed command modules %s', installed_command_modules)
-        cumulative_elapsed_time = 0
-        for mod in installed_command_modules:
-            try:
-                start_time = timeit.default_timer()
-                import_module('azure.cli.command_modules.' + mod).load_commands()
-                elapsed_time = timeit.default_timer() - start_time
-                logger.debug("Loaded module '%s' in %.3f seconds.", mod, elapsed_time)
-                cumulative_elapsed_time += elapsed_time
-            except Exception as ex:  # pylint: disable=broad-except
-                # Changing this error message requires updating CI script that checks for failed
-                # module loading.
-                logger.error("Error loading command module '%s'", mod)
-                telemetry.set_exception(exception=ex, fault_type='module-load-error-' + mod,
-                                        summary='Error loading module: {}'.format(mod))
-                logger.debug(traceback.format_exc())
+        cumulative_elapsed_time = _load_command_modules(installed_command_modules)
         logger.debug("Loaded all modules in %.3f seconds. "
                      "(note: there's always an overhead with the first module loaded)",
                      cumulative_elapsed_time)
     try:
         # We always load extensions even if the appropriate module has been loaded
-        # as an extension could override the commands already loaded.
-        _get_command_table_from_extensions()
+        # as an extension could override the commands already loaded. When the command
+        # index is available, only the extensions contributing to the group are loaded.
+        _get_command_table_from_extensions(index_entry.extensions if index_entry else None)
     except Exception:  # pylint: disable=broad-except
         logger.warning("Unable to load extensions. Use --debug for more information.")
         logger.debug(traceback.format_exc())
+    if full_load and not command_index.is_valid():
+        command_index.update(command_table, command_module_map, mod_to_ext_map)
     _update_command_definitions(command_table)
     ordered_commands = OrderedDict(command_table)
     return ordered_commands
@@ -521,17 +564,23 @@ def cli_command(module_name, name, operation,
     command_table[name] = cmd
 
 
-def get_op_handler(operation):
-    """ Import and load the operation handler """
-    # Patch the unversioned sdk path to include the appropriate API version for the
-    # resource type in question.
+def resolve_operation(operation):
+    """ Patch the unversioned sdk path of an operation to include the appropriate API version
+    for the resource type in question. Nothing is imported. """
     from azure.cli.core._profile import CLOUD
-    import types
 
     for rt in ResourceType:
         if operation.startswith(rt.import_prefix):
             operation = operation.replace(rt.import_prefix,
                                           get_versioned_sdk_path(CLOUD.profile, rt))
+    return operation
+
+
+def get_op_handler(operation):
+    """ Import and load the operation handler """
+    import types
+
+    operation = resolve_operation(operation)
     try:
         mod_to_import, attr_path = operation.split('#')
         op = import_module(mod_to_import)
@@ -573,6 +622,25 @@ def _is_paged(obj):
     return False
 
 
+def stream_result(result):
+    """ Returns the items of a paged result as a list, or as a `StreamingResult` when the
+    application is able to write them out as the pages arrive. The first page is always
+    retrieved here so that errors are reported like any other service error. Commands returning
+    items from a generator, e.g. a filtered paged result, opt into streaming by returning
+    stream_result(items). """
+    from itertools import chain
+    from azure.cli.core.application import APPLICATION
+    from azure.cli.core._output import StreamingResult
+    if not APPLICATION.session.get('stream_output'):
+        return list(result)
+    items = iter(result)
+    try:
+        first_item = next(items)
+    except StopIteration:
+        return []
+    return StreamingResult(chain([first_item], items))
+
+
 def _is_poller(obj):
     # Since loading msrest is expensive, we avoid it until we have to
     if obj.__class__.__name__ == 'AzureOperationPoller':
@@ -612,7 +680,7 @@ def create_command(module_name, name, operation,
                     if _is_poller(result):
                         return LongRunningOperation('Starting {}'.format(name))(result)
                     elif _is_paged(result):
-                        return list(result)
+                        return stream_result(result)
                     return result
                 except Exception as ex:  # pylint: disable=broad-except
                     rp = _check_rp_not_registered_err(ex)
@@ -650,7 +718,7 @@ def create_command(module_name, name, operation,
     name = ' '.join(name.split())
 
     def arguments_loader():
-        return extract_args_from_signature(get_op_handler(operation), no_wait_param=no_wait_param)
+        return extract_cached_args_from_signature(operation, no_wait_param=no_wait_param)
 
     def description_loader():
         return extract_full_summary_from_signature(get_op_handler(operation))
@@ -665,6 +733,29 @@ def create_command(module_name, name, operation,
     return cmd
 
 
+def extract_cached_args_from_signature(operation, no_wait_param=None):
+    """ Extracts the arguments of an operation from its signature and docstring. The result is
+    cached in the command index so later invocations don't need to import the operation (and
+    with it the SDK) just to build the parser. """
+    from azure.cli.core.commands._command_index import get_command_index
+    command_index = get_command_index()
+    operation_key = '{}|{}'.format(resolve_operation(operation), no_wait_param or '')
+    cached_arguments = command_index.get_arguments(operation_key)
+    if cached_arguments is not None:
+        return [(name, CliCommandArgument(**settings)) for name, settings in cached_arguments]
+
+    arguments = list(extract_args_from_signature(get_op_handler(operation), no_wait_param=no_wait_param))
+    try:
+        # round-trip through JSON to snapshot the settings before overrides are applied to them
+        serialized_arguments = json.loads(json.dumps([(name, argument.type.settings)
+                                                      for name, argument in arguments]))
+    except (TypeError, ValueError):
+        logger.debug("Arguments of operation '%s' are not cacheable.", operation)
+    else:
+        command_index.set_arguments(operation_key, serialized_arguments)
+    return arguments
+
+
 def _user_confirmed(confirmation, command_args):
     if callable(confirmation):
         return confirmation(command_args)
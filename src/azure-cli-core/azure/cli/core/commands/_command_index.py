@@ -0,0 +1,253 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import pkgutil
+from importlib import import_module
+
+import azure.cli.core.azlogging as azlogging
+from azure.cli.core._session import INDEX
+from azure.cli.core.extension import (get_extension_names, get_extension_path, EXTENSIONS_MOD_PREFIX)
+
+logger = azlogging.get_az_logger(__name__)
+
+COMMAND_MODULE_PREFIX = 'azure.cli.command_modules.'
+
+INDEX_VERSION_KEY = 'version'
+INDEX_GROUPS_KEY = 'groups'
+INDEX_ARGUMENTS_KEY = 'arguments'
+
+
+def get_installed_command_modules(blacklisted_mods=None):
+    """ Returns a dict of installed command module name -> stamp of its installation. Only the
+    file system is inspected; no command module is imported. """
+    blacklisted_mods = blacklisted_mods or []
+    installed_command_modules = {}
+    try:
+        mods_ns_pkg = import_module('azure.cli.command_modules')
+        for finder, modname, _ in pkgutil.iter_modules(mods_ns_pkg.__path__):
+            if modname in blacklisted_mods:
+                continue
+            installed_command_modules[modname] = _get_module_stamp(getattr(finder, 'path', ''), modname)
+    except ImportError:
+        pass
+    return installed_command_modules
+
+
+def _get_installed_extensions():
+    return {ext_name: _get_mtime(get_extension_path(ext_name)) for ext_name in get_extension_names()}
+
+
+def _get_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _get_module_stamp(modules_path, modname):
+    """ Returns the modification time of the distribution metadata of a command module, which
+    pip rewrites whenever the module is installed, upgraded or removed. Modules installed from
+    a source checkout in development mode are edited in place without touching any metadata, so
+    their sources are stamped instead. """
+    # <site>/azure/cli/command_modules/<modname>
+    site_dir = os.path.dirname(os.path.dirname(os.path.dirname(modules_path)))
+    package_path = os.path.join(modules_path, modname)
+    if os.path.isfile(os.path.join(site_dir, 'setup.py')):
+        return _get_package_mtime(package_path)
+    metadata = _get_dist_metadata(site_dir, 'azure_cli_' + modname.replace('-', '_'))
+    return _get_mtime(os.path.join(site_dir, metadata) if metadata else package_path)
+
+
+_site_dir_entries = {}
+
+
+def _get_dist_metadata(site_dir, dist_name):
+    """ Returns the name of the .dist-info or .egg-info directory of a distribution in a site
+    directory, which is listed once per process. """
+    if site_dir not in _site_dir_entries:
+        try:
+            _site_dir_entries[site_dir] = os.listdir(site_dir)
+        except OSError:
+            _site_dir_entries[site_dir] = []
+    dist_name = dist_name.lower()
+    for entry in _site_dir_entries[site_dir]:
+        name, ext = os.path.splitext(entry.lower())
+        if ext in ('.dist-info', '.egg-info') and name.split('-')[0] == dist_name:
+            return entry
+    return None
+
+
+def _get_package_mtime(path):
+    """ Returns the latest modification time of a package directory and its Python sources
+    (excluding tests), so that editing a module in place invalidates the index too. """
+    mtime = _get_mtime(path)
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = [d for d in dirnames if d != 'tests']
+        for filename in filenames:
+            if filename.endswith('.py'):
+                mtime = max(mtime, _get_mtime(os.path.join(dirpath, filename)))
+    return mtime
+
+
+# stamp of the installed command modules and extensions, computed once per process
+_installed_version = {}
+
+
+def get_installed_version():
+    """ Returns the stamp of the CLI core and the installed command modules and extensions. It is
+    computed once per process; long running processes call `reset_installed_version` to notice
+    installation changes. """
+    if 'version' not in _installed_version:
+        _installed_version['version'] = _get_version()
+    return _installed_version['version']
+
+
+def reset_installed_version():
+    _installed_version.clear()
+    _site_dir_entries.clear()
+
+
+def _get_version(installed_modules=None, installed_extensions=None):
+    from azure.cli.core import __version__ as core_version
+    if installed_modules is None:
+        from azure.cli.core.commands import BLACKLISTED_MODS
+        installed_modules = get_installed_command_modules(BLACKLISTED_MODS)
+    if installed_extensions is None:
+        installed_extensions = _get_installed_extensions()
+    return {
+        'core': core_version,
+        'modules': installed_modules,
+        'extensions': installed_extensions
+    }
+
+
+# the command index shared by everything loading commands in the process
+_command_index = {}
+
+
+def get_command_index():
+    """ Returns the `CommandIndex` of the process, backed by the INDEX session. Sharing it means
+    the installation is stamped once and the arguments cached while loading commands are
+    written in one go by `CommandIndex.save`. """
+    command_index = _command_index.get('index')
+    if command_index is None or command_index.index is not INDEX:
+        command_index = _command_index['index'] = CommandIndex()
+    return command_index
+
+
+class CommandIndexEntry(object):  # pylint: disable=too-few-public-methods
+    """ The command modules and extensions that own the commands of a top-level command group. """
+
+    def __init__(self, modules=None, extensions=None):
+        self.modules = modules or []
+        self.extensions = extensions or []
+
+
+class CommandIndex(object):
+    """ Persistent index of the command table.
+
+    Maps every top-level command group to the command modules (and extensions) that register
+    commands in it, so that a command can be loaded by importing only its owning modules
+    instead of every installed module and extension. The index is stamped with the CLI core
+    version and the installed command modules and extensions, and is rebuilt after a full
+    command table load whenever that stamp no longer matches.
+    """
+
+    def __init__(self, index=None, installed_modules=None, installed_extensions=None):
+        self.index = INDEX if index is None else index
+        self._installed_modules = installed_modules
+        self._installed_extensions = installed_extensions
+        self._version = None
+        self._unsaved = False
+
+    @property
+    def version(self):
+        if self._version is None:
+            if self._installed_modules is None and self._installed_extensions is None:
+                self._version = get_installed_version()
+            else:
+                self._version = _get_version(self._installed_modules, self._installed_extensions)
+        return self._version
+
+    def is_valid(self):
+        return bool(self.index.get(INDEX_GROUPS_KEY)) and self.index.get(INDEX_VERSION_KEY) == self.version
+
+    def get(self, group_name):
+        """ Returns a `CommandIndexEntry` for the modules and extensions owning commands in the
+        top-level group `group_name`, or None if the index is stale or doesn't know the group. """
+        if not group_name or not self.is_valid():
+            return None
+        owners = self.index.get(INDEX_GROUPS_KEY).get(group_name)
+        if owners is None:
+            logger.debug("Command group '%s' not found in the command index.", group_name)
+            return None
+        return CommandIndexEntry(owners.get('modules'), owners.get('extensions'))
+
+    def update(self, command_table, command_module_map, mod_to_ext_map):
+        """ Rebuilds the index from a fully loaded command table. """
+        groups = {}
+        for command_name in command_table:
+            module, extension = _get_command_owner(command_module_map.get(command_name), mod_to_ext_map)
+            if not module and not extension:
+                continue
+            owners = groups.setdefault(command_name.split()[0], {'modules': [], 'extensions': []})
+            if module and module not in owners['modules']:
+                owners['modules'].append(module)
+            if extension and extension not in owners['extensions']:
+                owners['extensions'].append(extension)
+        self.index.data.update({
+            INDEX_VERSION_KEY: self.version,
+            INDEX_GROUPS_KEY: groups
+        })
+        if self._save():
+            logger.debug('Updated command index with %d command groups.', len(groups))
+
+    def get_arguments(self, operation_key):
+        """ Returns the cached signature arguments of an operation as a list of
+        (name, settings) pairs, or None if not cached for the installed modules. Arguments are
+        only cached while the index is backed by a file. """
+        if not self.index.filename:
+            return None
+        cache = self.index.get(INDEX_ARGUMENTS_KEY)
+        if not cache or cache.get(INDEX_VERSION_KEY) != self.version:
+            return None
+        return cache['operations'].get(operation_key)
+
+    def set_arguments(self, operation_key, arguments):
+        """ Caches the signature arguments of an operation until the index is saved. `arguments`
+        is a list of (name, settings) pairs whose settings must be JSON serializable. """
+        if not self.index.filename:
+            return
+        cache = self.index.get(INDEX_ARGUMENTS_KEY)
+        if not cache or cache.get(INDEX_VERSION_KEY) != self.version:
+            cache = {INDEX_VERSION_KEY: self.version, 'operations': {}}
+        cache['operations'][operation_key] = arguments
+        self.index.data[INDEX_ARGUMENTS_KEY] = cache
+        self._unsaved = True
+
+    def save(self):
+        """ Writes the arguments cached since the index was last written, if any. """
+        if self._unsaved:
+            self._save()
+
+    def _save(self):
+        try:
+            self.index.save_with_retry()
+            self._unsaved = False
+            return True
+        except (OSError, IOError, TypeError, ValueError) as ex:
+            logger.debug('Unable to save the command index: %s', ex)
+            return False
+
+
+def _get_command_owner(module_name, mod_to_ext_map):
+    if not module_name:
+        return None, None
+    if module_name.startswith(COMMAND_MODULE_PREFIX):
+        return module_name[len(COMMAND_MODULE_PREFIX):].split('.')[0], None
+    if module_name.startswith(EXTENSIONS_MOD_PREFIX):
+        return None, mod_to_ext_map.get(module_name.split('.')[0])
+    return None, None
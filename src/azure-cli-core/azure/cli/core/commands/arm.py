@@ -9,20 +9,25 @@ from six import string_types
 
 from azure.cli.core.commands import (CliCommand,
                                      get_op_handler,
+                                     extract_cached_args_from_signature,
                                      command_table as main_command_table,
                                      command_module_map as main_command_module_map,
                                      CONFIRM_PARAM_NAME)
-from azure.cli.core.commands._introspection import extract_args_from_signature
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
 from azure.cli.core.application import APPLICATION, IterateValue
 from azure.cli.core.prompting import prompt_y_n, NoTTYException
 from azure.cli.core._config import az_config
 import azure.cli.core.azlogging as azlogging
-from azure.cli.core.util import CLIError, todict, shell_safe_json_parse
+from azure.cli.core.util import CLIError, todict, shell_safe_json_parse, get_retry_after
 from azure.cli.core.profiles import ResourceType
 
 logger = azlogging.get_az_logger(__name__)
 
+# first polling interval of wait commands, in seconds, doubled after each poll up to --interval
+WAIT_INITIAL_INTERVAL = 1
+# number of resources given with --ids that are waited for at the same time
+WAIT_MAX_WORKERS = 20
+
 regex = re.compile(
     '/subscriptions/(?P<subscription>[^/]*)(/resource[gG]roups/(?P<resource_group>[^/]*))?'
     '/providers/(?P<namespace>[^/]*)/(?P<type>[^/]*)/(?P<name>[^/]*)'
@@ -323,6 +328,17 @@ def _user_confirmed(confirmation, command_args):
         return False
 
 
+def _memoize(loader):
+    """ Returns a function calling the given loader once and returning its result from then on. """
+    cache = []
+
+    def _load():
+        if not cache:
+            cache.append(loader())
+        return cache[0]
+    return _load
+
+
 def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=None,
                                setter_arg_name='parameters', table_transformer=None,
                                child_collection_prop_name=None, child_collection_key='name',
@@ -338,14 +354,13 @@ def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=
             custom_function_op))
 
     def get_arguments_loader():
-        return dict(extract_args_from_signature(get_op_handler(getter_op)))
+        return dict(extract_cached_args_from_signature(getter_op))
 
     def set_arguments_loader():
-        return dict(extract_args_from_signature(get_op_handler(setter_op),
-                                                no_wait_param=no_wait_param))
+        return dict(extract_cached_args_from_signature(setter_op, no_wait_param=no_wait_param))
 
     def function_arguments_loader():
-        return dict(extract_args_from_signature(get_op_handler(custom_function_op))) \
+        return dict(extract_cached_args_from_signature(custom_function_op)) \
             if custom_function_op else {}
 
     def arguments_loader():
@@ -359,8 +374,17 @@ def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=
         arguments.pop(setter_arg_name, None)
         return arguments
 
-    def handler(args):  # pylint: disable=too-many-branches,too-many-statements
+    # the argument names and handlers are resolved once per command rather than once per argument
+    get_argument_names = _memoize(lambda: frozenset(get_arguments_loader()))
+    set_argument_names = _memoize(lambda: frozenset(set_arguments_loader()))
+    function_argument_names = _memoize(lambda: frozenset(function_arguments_loader()))
+    get_getter = _memoize(lambda: get_op_handler(getter_op))
+    get_setter = _memoize(lambda: get_op_handler(setter_op))
+    get_custom_function = _memoize(lambda: get_op_handler(custom_function_op))
+
+    def handler(args):  # pylint: disable=too-many-branches,too-many-statements,too-many-locals
         from msrestazure.azure_operation import AzureOperationPoller
+        import time
 
         if confirmation \
             and not args.items().get(CONFIRM_PARAM_NAME) \
@@ -379,8 +403,9 @@ def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=
         except TypeError:
             client = factory(None) if factory else None
 
-        getterargs = {key: val for key, val in args.items() if key in get_arguments_loader()}
-        getter = get_op_handler(getter_op)
+        getterargs = {key: val for key, val in args.items() if key in get_argument_names()}
+        getter = get_getter()
+        start_time = time.time()
         try:
             if child_collection_prop_name:
                 parent = getter(client, **getterargs) if client else getter(**getterargs)
@@ -393,19 +418,20 @@ def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=
             else:
                 parent = None
                 instance = getter(client, **getterargs) if client else getter(**getterargs)
+            get_time = time.time()
 
             # pass instance to the custom_function, if provided
             if custom_function_op:
-                custom_function = get_op_handler(custom_function_op)
+                custom_function = get_custom_function()
                 custom_func_args = \
-                    {k: v for k, v in args.items() if k in function_arguments_loader()}
+                    {k: v for k, v in args.items() if k in function_argument_names()}
                 if child_collection_prop_name:
                     parent = custom_function(instance, parent, **custom_func_args)
                 else:
                     instance = custom_function(instance, **custom_func_args)
 
             # apply generic updates after custom updates
-            setterargs = {key: val for key, val in args.items() if key in set_arguments_loader()}
+            setterargs = {key: val for key, val in args.items() if key in set_argument_names()}
 
             for arg in ordered_arguments:
                 arg_type, arg_values = arg
@@ -428,7 +454,8 @@ def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=
 
             # Done... update the instance!
             setterargs[setter_arg_name] = parent if child_collection_prop_name else instance
-            setter = get_op_handler(setter_op)
+            setter = get_setter()
+            modify_time = time.time()
 
             opres = setter(client, **setterargs) if client else setter(**setterargs)
 
@@ -436,6 +463,8 @@ def cli_generic_update_command(module_name, name, getter_op, setter_op, factory=
                 return None
 
             result = opres.result() if isinstance(opres, AzureOperationPoller) else opres
+            logger.debug("Generic update '%s': get %.3fs, modify %.3fs, set %.3fs", name,
+                         get_time - start_time, modify_time - get_time, time.time() - modify_time)
             if child_collection_prop_name:
                 result = _get_child(
                     result,
@@ -487,13 +516,16 @@ def cli_generic_wait_command(module_name, name, getter_op, factory=None, excepti
         raise ValueError("Getter operation must be a string. Got '{}'".format(type(getter_op)))
 
     def get_arguments_loader():
-        return dict(extract_args_from_signature(get_op_handler(getter_op)))
+        return dict(extract_cached_args_from_signature(getter_op))
 
     def arguments_loader():
         arguments = {}
         arguments.update(get_arguments_loader())
         return arguments
 
+    get_argument_names = _memoize(lambda: frozenset(get_arguments_loader()))
+    get_getter = _memoize(lambda: get_op_handler(getter_op))
+
     def get_provisioning_state(instance):
         provisioning_state = getattr(instance, 'provisioning_state', None)
         if not provisioning_state:
@@ -509,7 +541,7 @@ def cli_generic_wait_command(module_name, name, getter_op, factory=None, excepti
         else:
             raise ex
 
-    def handler(args):
+    def handler(args):  # pylint: disable=too-many-branches,too-many-statements
         from msrest.exceptions import ClientException
         import time
         try:
@@ -518,9 +550,9 @@ def cli_generic_wait_command(module_name, name, getter_op, factory=None, excepti
             client = factory(None) if factory else None
 
         getterargs = {key: val for key, val in args.items()
-                      if key in get_arguments_loader()}
+                      if key in get_argument_names()}
 
-        getter = get_op_handler(getter_op)
+        getter = get_getter()
 
         timeout = args.pop('timeout')
         interval = args.pop('interval')
@@ -534,41 +566,62 @@ def cli_generic_wait_command(module_name, name, getter_op, factory=None, excepti
             raise CLIError(
                 "incorrect usage: --created | --updated | --deleted | --exists | --custom JMESPATH")
 
-        for _ in range(0, timeout, interval):
+        resource = '/'.join(str(getterargs[key]) for key in sorted(getterargs)
+                            if isinstance(getterargs[key], string_types))
+        # several resources are waited for when --ids is given; report when each of them is done
+        log_outcome = logger.warning if APPLICATION.session.get('invocation_count', 1) > 1 else logger.info
+
+        def _done(state):
+            log_outcome("'%s' is %s after %d seconds.", resource, state, time.time() - start_time)
+
+        # poll quickly at first and back off exponentially up to the polling interval
+        start_time = time.time()
+        interval = max(interval, 1)
+        delay = min(WAIT_INITIAL_INTERVAL, interval)
+        while True:
+            retry_after = None
             try:
                 instance = getter(client, **getterargs) if client else getter(**getterargs)
                 if wait_for_exists:
-                    return
+                    return _done('existing')
                 provisioning_state = get_provisioning_state(instance)
                 # until we have any needs to wait for 'Failed', let us bail out on this
                 if provisioning_state == 'Failed':
                     raise CLIError('The operation failed')
                 if wait_for_created or wait_for_updated:
                     if provisioning_state == 'Succeeded':
-                        return
+                        return _done(provisioning_state)
                 if custom_condition and bool(verify_property(instance, custom_condition)):
-                    return
+                    return _done('matching the condition')
             except ClientException as ex:
-                if getattr(ex, 'status_code', None) == 404:
+                status_code = getattr(ex, 'status_code', None)
+                if status_code == 404:
                     if wait_for_deleted:
-                        return
+                        return _done('deleted')
                     if not any([wait_for_created, wait_for_exists, custom_condition]):
                         _handle_exception(ex)
+                elif status_code == 429:
+                    # throttled, poll again when the service allows it
+                    retry_after = get_retry_after(getattr(ex, 'response', None))
                 else:
                     _handle_exception(ex)
             except Exception as ex:  # pylint: disable=broad-except
                 _handle_exception(ex)
 
-            time.sleep(interval)
-
-        return CLIError('Wait operation timed-out after {} seconds'.format(timeout))
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                raise CLIError('Wait operation timed-out after {} seconds'.format(timeout))
+            # a Retry-After shorter than the polling delay, e.g. 0, doesn't make it poll any faster
+            time.sleep(min(max(retry_after or 0, delay), remaining))
+            delay = min(delay * 2, interval)
 
-    cmd = CliCommand(name, handler, arguments_loader=arguments_loader)
+    # waiting mostly sleeps, so all the resources given with --ids are waited for at the same time
+    cmd = CliCommand(name, handler, arguments_loader=arguments_loader, max_workers=WAIT_MAX_WORKERS)
     group_name = 'Wait Condition'
     cmd.add_argument('timeout', '--timeout', default=3600, arg_group=group_name, type=int,
                      help='maximum wait in seconds')
     cmd.add_argument('interval', '--interval', default=30, arg_group=group_name, type=int,
-                     help='polling interval in seconds')
+                     help='maximum polling interval in seconds. Polling starts faster and backs off to it')
     cmd.add_argument('deleted', '--deleted', action='store_true', arg_group=group_name,
                      help='wait till deleted')
     cmd.add_argument('created', '--created', action='store_true', arg_group=group_name,
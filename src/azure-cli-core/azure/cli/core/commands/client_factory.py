@@ -3,7 +3,10 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import atexit
+import logging
 import os
+import threading
 from azure.cli.core import __version__ as core_version
 from azure.cli.core._profile import Profile, CLOUD
 import azure.cli.core._debug as _debug
@@ -48,6 +51,10 @@ def configure_common_settings(client):
     except KeyError:
         pass
 
+    _configure_session_headers(client)
+
+
+def _configure_session_headers(client):
     for header, value in APPLICATION.session['headers'].items():
         # We are working with the autorest team to expose the add_header functionality of the generated client to avoid
         # having to access private members
@@ -67,27 +74,135 @@ def _get_mgmt_service_client(client_type,
                              resource=CLOUD.endpoints.active_directory_resource_id,
                              **kwargs):
     logger.debug('Getting management service client client_type=%s', client_type.__name__)
-    profile = Profile()
-    cred, subscription_id, _ = profile.get_login_credentials(subscription_id=subscription_id,
-                                                             resource=resource)
-    client_kwargs = {}
-    if base_url_bound:
-        client_kwargs = {'base_url': CLOUD.endpoints.resource_manager}
-    if api_version:
-        client_kwargs['api_version'] = api_version
-    if kwargs:
-        client_kwargs.update(kwargs)
-
-    if subscription_bound:
-        client = client_type(cred, subscription_id, **client_kwargs)
-    else:
-        client = client_type(cred, **client_kwargs)
+    # Accounts, clients and credentials are cached until the profile changes so that repeated calls
+    # (e.g. one per --ids value) don't read the profile and rebuild the client and its serializers
+    # every time.
+    account = _account_cache.get_or_create(subscription_id, lambda: Profile().get_subscription(subscription_id))
+    cred, subscription_id, _ = _credential_cache.get_or_create(
+        (account['id'], account['user']['name'], resource),
+        lambda: Profile().get_login_credentials(subscription_id=account['id'], resource=resource))
+
+    def _create_client():
+        client_kwargs = {}
+        if base_url_bound:
+            client_kwargs = {'base_url': CLOUD.endpoints.resource_manager}
+        if api_version:
+            client_kwargs['api_version'] = api_version
+        if kwargs:
+            client_kwargs.update(kwargs)
+
+        if subscription_bound:
+            client = client_type(cred, subscription_id, **client_kwargs)
+        else:
+            client = client_type(cred, **client_kwargs)
 
-    configure_common_settings(client)
+        configure_common_settings(client)
+        return client
 
+    cache_key = (client_type, subscription_bound, subscription_id, api_version, base_url_bound, resource,
+                 CLOUD.name, account['user']['name'], tuple(sorted(kwargs.items())))
+    client = _client_cache.get_or_create(cache_key, _create_client, on_hit=_configure_session_headers)
     return (client, subscription_id)
 
 
+class _ObjectCache(object):
+    """ A thread-safe, process-wide cache that counts hits and misses. Entries with unhashable
+    keys are created but not cached. An entry is created outside of the lock, and callers asking
+    for it meanwhile wait for it rather than creating it again. """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, factory, on_hit=None):
+        try:
+            hash(key)
+        except TypeError:
+            self.misses += 1
+            return factory()
+        from concurrent.futures import Future
+        with self._lock:
+            future = self._items.get(key)
+            if future is None:
+                future = self._items[key] = Future()
+                self.misses += 1
+                create = True
+            else:
+                self.hits += 1
+                create = False
+        if create:
+            try:
+                item = factory()
+            except Exception as ex:
+                with self._lock:
+                    if self._items.get(key) is future:
+                        del self._items[key]
+                future.set_exception(ex)
+                raise
+            future.set_result(item)
+            return item
+        item = future.result()
+        if on_hit:
+            on_hit(item)
+        return item
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class _ConnectionCounter(logging.Filter):
+    """ Counts the HTTP connections opened, from the message urllib3 logs for each of them. """
+
+    def __init__(self):
+        super(_ConnectionCounter, self).__init__()
+        self.count = 0
+
+    def filter(self, record):
+        if str(record.msg).startswith('Starting new HTTP'):
+            self.count += 1
+        return True
+
+
+_account_cache = _ObjectCache()
+_client_cache = _ObjectCache()
+_credential_cache = _ObjectCache()
+_connection_counter = _ConnectionCounter()
+for _logger_name in ('urllib3.connectionpool', 'requests.packages.urllib3.connectionpool'):
+    logging.getLogger(_logger_name).addFilter(_connection_counter)
+
+
+def clear_client_caches():
+    """ Removes the cached accounts, management clients and credentials, e.g. when the profile changes. """
+    _account_cache.clear()
+    _client_cache.clear()
+    _credential_cache.clear()
+
+
+def get_client_cache_stats():
+    """ Returns the hits and misses of the management client and credential caches, and the number
+    of HTTP connections opened. """
+    return {
+        'clientHits': _client_cache.hits,
+        'clientMisses': _client_cache.misses,
+        'credentialHits': _credential_cache.hits,
+        'credentialMisses': _credential_cache.misses,
+        'connectionsOpened': _connection_counter.count
+    }
+
+
+def _log_client_cache_stats():
+    if _client_cache.hits or _client_cache.misses:
+        logger.debug('Management client cache: %d hits, %d misses. Credential cache: %d hits, %d misses. '
+                     '%d connections opened.', _client_cache.hits, _client_cache.misses,
+                     _credential_cache.hits, _credential_cache.misses, _connection_counter.count)
+
+
+atexit.register(_log_client_cache_stats)
+
+
 def get_data_service_client(service_type, account_name, account_key, connection_string=None,
                             sas_token=None, endpoint_suffix=None):
     logger.debug('Getting data service client service_type=%s', service_type.__name__)
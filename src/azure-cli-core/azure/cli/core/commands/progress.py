@@ -166,6 +166,18 @@ class DeterminateStandardOut(ProgressViewBase):
         self.out.flush()
 
 
+class SilentProgressView(ProgressViewBase):
+    """ discards the progress, e.g. for operations running on a worker thread """
+    def __init__(self, out=None):
+        super(SilentProgressView, self).__init__(out)
+
+    def write(self, args):
+        pass
+
+    def flush(self):
+        pass
+
+
 def get_progress_view(determinant=False, outstream=sys.stderr):
     """ gets your view """
     if determinant:
@@ -4,13 +4,24 @@
 # --------------------------------------------------------------------------------------------
 
 import unittest
+import mock
 
 import os
 import tempfile
+import threading
 
 from azure.cli.core.application import Application, Configuration, IterateAction
-from azure.cli.core.commands import CliCommand
-from azure.cli.core.util import CLIError
+from azure.cli.core._output import StreamingResult
+from azure.cli.core.commands import CliCommand, create_command, stream_result
+from azure.cli.core.util import CLIError, PartialResultError
+
+
+def _generate_items():
+    return (i for i in ['a', 'b'])
+
+
+def _stream_items():
+    return stream_result(i for i in ['a', 'b'])
 
 
 class TestApplication(unittest.TestCase):
@@ -97,6 +108,106 @@ class TestApplication(unittest.TestCase):
         self.assertEqual(hellos[1]['hello'], 'sir')
         self.assertEqual(hellos[1]['something'], 'else')
 
+    def test_list_value_parameter_parallel(self):
+        threads = set()
+        controllers = set()
+
+        def handler(args):
+            threads.add(threading.current_thread().name)
+            controllers.add(id(application.get_progress_controller()))
+            if args['hello'] in ('fail', 'error'):
+                raise CLIError('bad hello')
+            return args['hello']
+
+        command = CliCommand('test command', handler, max_workers=3)
+        command.add_argument('hello', '--hello', nargs='+', action=IterateAction)
+        cmd_table = {'test command': command}
+
+        config = Configuration()
+        config.get_command_table = lambda argv: cmd_table
+        application = Application(config)
+
+        result = application.execute('test command --hello a b c d e f'.split())
+        self.assertEqual(result.result, ['a', 'b', 'c', 'd', 'e', 'f'])
+        self.assertIsNone(result.error)
+        self.assertNotIn(threading.current_thread().name, threads)
+        self.assertNotIn(id(application.progress_controller), controllers)
+
+        # the successful results are returned and the failure is raised once they are output
+        with mock.patch('azure.cli.core.application.logger') as logger_mock:
+            result = application.execute('test command --hello a fail b error'.split())
+        self.assertEqual(result.result, ['a', 'b'])
+        self.assertEqual(str(result.error), '2 of 4 operations failed.')
+        self.assertEqual([c[0][1] for c in logger_mock.error.call_args_list], ['fail', 'error'])
+
+        with self.assertRaisesRegexp(CLIError, '2 of 2 operations failed.'):
+            application.execute('test command --hello fail error'.split())
+
+    def test_list_value_parameter_sequential_by_default(self):
+        threads = set()
+
+        def handler(args):
+            threads.add(threading.current_thread().name)
+            return args['hello']
+
+        command = CliCommand('test command', handler)
+        command.add_argument('hello', '--hello', nargs='+', action=IterateAction)
+        config = Configuration()
+        config.get_command_table = lambda argv: {'test command': command}
+        application = Application(config)
+
+        result = application.execute('test command --hello a b c'.split())
+        self.assertEqual(result.result, ['a', 'b', 'c'])
+        self.assertEqual(threads, {threading.current_thread().name})
+
+    def test_partial_result_output_before_error(self):
+        def handler(_):
+            raise PartialResultError('1 of 2 failed.', [{'id': 'a', 'status': 'Succeeded'},
+                                                        {'id': 'b', 'status': 'Failed'}])
+
+        config = Configuration()
+        config.get_command_table = lambda argv: {'test': CliCommand('test', handler)}
+        application = Application(config)
+
+        result = application.execute(['test'])
+        self.assertEqual(result.result, [{'id': 'a', 'status': 'Succeeded'}, {'id': 'b', 'status': 'Failed'}])
+        self.assertEqual(str(result.error), '1 of 2 failed.')
+
+    def test_streaming_result_converted_per_item(self):
+        class _Resource(object):  # pylint: disable=too-few-public-methods
+            def __init__(self, name):
+                self.name = name
+                self.id = '/subscriptions/sub/resourceGroups/rg/providers/p/t/' + name
+
+        def handler(args):
+            self.assertTrue(application.session['stream_output'])
+            return StreamingResult(iter([_Resource('a'), _Resource('b')]))
+
+        config = Configuration()
+        config.get_command_table = lambda argv: {'test': CliCommand('test', handler)}
+        application = Application(config)
+
+        result = application.execute(['test'])
+        self.assertIsInstance(result.result, StreamingResult)
+        self.assertEqual([(r['name'], r['resourceGroup']) for r in result.result], [('a', 'rg'), ('b', 'rg')])
+
+    def test_streaming_result_opt_in(self):
+        from azure.cli.core.application import APPLICATION
+        generate = create_command(None, 'test', '{}#_generate_items'.format(__name__), None, None, None)
+        stream = create_command(None, 'test', '{}#_stream_items'.format(__name__), None, None, None)
+
+        with mock.patch.dict(APPLICATION.session, {'stream_output': True}):
+            # a generator is returned as is unless the command streams it
+            result = generate.handler({})
+            self.assertNotIsInstance(result, (list, StreamingResult))
+            self.assertEqual(list(result), ['a', 'b'])
+            result = stream.handler({})
+            self.assertIsInstance(result, StreamingResult)
+            self.assertEqual(list(result), ['a', 'b'])
+
+        with mock.patch.dict(APPLICATION.session, {'stream_output': False}):
+            self.assertEqual(stream.handler({}), ['a', 'b'])
+
     def test_case_insensitive_command_path(self):
         import argparse
 
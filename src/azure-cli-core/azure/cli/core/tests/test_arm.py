@@ -3,9 +3,39 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import sys
 import unittest
 
-from azure.cli.core.commands.arm import parse_resource_id
+import mock
+from msrest.exceptions import ClientException
+
+from azure.cli.core.commands import command_table
+from azure.cli.core.commands.arm import parse_resource_id, cli_generic_wait_command
+from azure.cli.core.util import CLIError
+
+
+class _Instance(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, provisioning_state):
+        self.provisioning_state = provisioning_state
+
+
+class _HttpError(ClientException):
+
+    def __init__(self, status_code, headers=None):
+        super(_HttpError, self).__init__('HTTP error {}'.format(status_code))
+        self.status_code = status_code
+        self.response = mock.MagicMock(headers=headers or {})
+
+
+def _wait_getter(resource_group_name, name):  # pylint: disable=unused-argument
+    response = _WAIT_RESPONSES.pop(0)
+    if isinstance(response, Exception):
+        raise response
+    return response
+
+
+_WAIT_RESPONSES = []
 
 
 class TestARM(unittest.TestCase):
@@ -157,5 +187,46 @@ class TestARM(unittest.TestCase):
                     self.assertTrue(key not in kwargs and test['expected'][key] is None)
 
 
+class TestGenericWait(unittest.TestCase):
+
+    def setUp(self):
+        setattr(sys.modules[__name__], _wait_getter.__name__, _wait_getter)
+        cli_generic_wait_command(None, 'wait-test', '{}#{}'.format(__name__, _wait_getter.__name__))
+        self.handler = command_table['wait-test'].handler
+
+    @staticmethod
+    def _args(**kwargs):
+        args = {'resource_group_name': 'rg', 'name': 'res', 'timeout': 3600, 'interval': 30, 'created': False,
+                'deleted': False, 'updated': False, 'exists': False, 'custom': None}
+        args.update(kwargs)
+        return args
+
+    @mock.patch('time.sleep')
+    def test_wait_backs_off_to_interval(self, sleep):
+        _WAIT_RESPONSES[:] = [_Instance('Creating')] * 7 + [_Instance('Succeeded')]
+        self.handler(self._args(created=True, interval=10))
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [1, 2, 4, 8, 10, 10, 10])
+        self.assertEqual(command_table['wait-test'].max_workers, 20)
+
+    @mock.patch('time.sleep')
+    def test_wait_honors_retry_after(self, sleep):
+        _WAIT_RESPONSES[:] = [_HttpError(429, {'Retry-After': '17'}), _HttpError(404)]
+        self.handler(self._args(deleted=True))
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [17])
+
+        # no busy polling when the service allows polling again right away
+        sleep.reset_mock()
+        _WAIT_RESPONSES[:] = [_HttpError(429, {'Retry-After': '0'}), _HttpError(404)]
+        self.handler(self._args(deleted=True))
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [1])
+
+    @mock.patch('time.sleep')
+    def test_wait_timeout_raises(self, sleep):
+        _WAIT_RESPONSES[:] = [_Instance('Creating')]
+        with self.assertRaisesRegexp(CLIError, 'timed-out'):
+            self.handler(self._args(created=True, timeout=0))
+        sleep.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,123 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import logging
+import threading
+import time
+import unittest
+import mock
+
+import azure.cli.core.commands.client_factory as client_factory
+
+
+class _TestClient(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, credentials, subscription_id=None, **kwargs):
+        self.credentials = credentials
+        self.subscription_id = subscription_id
+        self.kwargs = kwargs
+
+
+def _get_subscription(subscription=None):
+    return {'id': subscription or 'sub1', 'user': {'name': 'user@example.com'}}
+
+
+def _get_login_credentials(resource=None, subscription_id=None):  # pylint: disable=unused-argument
+    return object(), subscription_id, 'tenant'
+
+
+class TestClientFactory(unittest.TestCase):
+
+    def setUp(self):
+        client_factory.clear_client_caches()
+        profile_patch = mock.patch('azure.cli.core.commands.client_factory.Profile')
+        settings_patch = mock.patch('azure.cli.core.commands.client_factory.configure_common_settings')
+        headers_patch = mock.patch('azure.cli.core.commands.client_factory._configure_session_headers')
+        self.profile_mock = profile_patch.start()
+        self.profile_mock.return_value.get_subscription.side_effect = _get_subscription
+        self.profile_mock.return_value.get_login_credentials.side_effect = _get_login_credentials
+        self.settings_mock = settings_patch.start()
+        self.headers_mock = headers_patch.start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_mgmt_client_reused(self):
+        client, sub_id = client_factory._get_mgmt_service_client(_TestClient)
+        same_client, _ = client_factory._get_mgmt_service_client(_TestClient)
+
+        self.assertIs(client, same_client)
+        self.assertEqual(sub_id, 'sub1')
+        self.assertEqual(self.settings_mock.call_count, 1)
+        self.headers_mock.assert_called_once_with(client)
+        self.assertEqual(self.profile_mock.return_value.get_login_credentials.call_count, 1)
+        self.assertEqual(self.profile_mock.return_value.get_subscription.call_count, 1)
+
+    def test_mgmt_client_cached_per_subscription_and_settings(self):
+        client, _ = client_factory._get_mgmt_service_client(_TestClient)
+        other_sub_client, sub_id = client_factory._get_mgmt_service_client(_TestClient, subscription_id='sub2')
+        other_version_client, _ = client_factory._get_mgmt_service_client(_TestClient, api_version='2017-05-10')
+        same_sub_client, _ = client_factory._get_mgmt_service_client(_TestClient, api_version='2017-05-10')
+
+        self.assertEqual(sub_id, 'sub2')
+        self.assertIsNot(client, other_sub_client)
+        self.assertIsNot(client, other_version_client)
+        self.assertIs(other_version_client, same_sub_client)
+        self.assertIs(client.credentials, other_version_client.credentials)
+        self.assertIsNot(client.credentials, other_sub_client.credentials)
+
+    def test_mgmt_client_unhashable_kwargs_not_cached(self):
+        hits = client_factory.get_client_cache_stats()['clientHits']
+        client, _ = client_factory._get_mgmt_service_client(_TestClient, extra=[1])
+        other_client, _ = client_factory._get_mgmt_service_client(_TestClient, extra=[1])
+        self.assertIsNot(client, other_client)
+        self.assertEqual(client_factory.get_client_cache_stats()['clientHits'], hits)
+
+    @mock.patch('azure.cli.core._profile._delete_file', autospec=True)
+    def test_mgmt_client_caches_cleared_when_profile_changes(self, _):
+        from azure.cli.core._profile import Profile
+        client, _ = client_factory._get_mgmt_service_client(_TestClient)
+        Profile({'subscriptions': []}, use_global_creds_cache=False).logout_all()
+        other_client, _ = client_factory._get_mgmt_service_client(_TestClient)
+
+        self.assertIsNot(client, other_client)
+        self.assertIsNot(client.credentials, other_client.credentials)
+        self.assertEqual(self.profile_mock.return_value.get_subscription.call_count, 2)
+
+    def test_object_cache_creates_outside_of_lock(self):
+        cache = client_factory._ObjectCache()
+        created = []
+
+        def _create():
+            self.assertFalse(cache._lock.locked())  # pylint: disable=protected-access
+            created.append(threading.current_thread().name)
+            time.sleep(0.05)
+            return object()
+
+        items = []
+        threads = [threading.Thread(target=lambda: items.append(cache.get_or_create('key', _create)))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(created), 1)
+        self.assertEqual(len(set(id(i) for i in items)), 1)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+        # a failure isn't cached
+        with self.assertRaises(ValueError):
+            cache.get_or_create('other', mock.MagicMock(side_effect=ValueError))
+        self.assertEqual(cache.get_or_create('other', lambda: 'created'), 'created')
+
+    def test_connections_opened_counted(self):
+        opened = client_factory.get_client_cache_stats()['connectionsOpened']
+        connection_logger = logging.getLogger('urllib3.connectionpool')
+        with mock.patch.object(connection_logger, 'level', logging.DEBUG):
+            connection_logger.debug('Starting new HTTPS connection (%d): %s:%s', 1, 'management.azure.com', 443)
+            connection_logger.debug('Resetting dropped connection: %s', 'management.azure.com')
+        self.assertEqual(client_factory.get_client_cache_stats()['connectionsOpened'], opened + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+from azure.cli.core._session import Session
+from azure.cli.core.commands import CliCommand, extract_cached_args_from_signature
+from azure.cli.core.commands._command_index import CommandIndex
+
+
+def _sample_handler():
+    pass
+
+
+def _sample_operation(resource_group_name, vm_name, force=False):
+    """ Sample operation.
+    :param resource_group_name: The name of the resource group.
+    :param vm_name: The name of the VM.
+    """
+    pass
+
+
+class TestCommandIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.session = Session()
+        self.session.filename = os.path.join(self.tempdir, 'commandIndex.json')
+        self.command_table = {
+            'vm create': CliCommand('vm create', _sample_handler),
+            'vmss create': CliCommand('vmss create', _sample_handler, deprecate_info='vmss new'),
+            'group list': CliCommand('group list', _sample_handler, table_transformer='[].{Name:name}'),
+            'group foo': CliCommand('group foo', _sample_handler)
+        }
+        self.command_table['group list'].add_argument('yes', '--yes', action='store_true')
+        self.command_module_map = {
+            'vm create': 'azure.cli.command_modules.vm.custom',
+            'vmss create': 'azure.cli.command_modules.vm.custom',
+            'group list': 'azure.cli.command_modules.resource.custom',
+            'group foo': 'azext_foo.custom'
+        }
+        self.mod_to_ext_map = {'azext_foo': 'foo-ext'}
+
+    def _get_index(self, modules=None, extensions=None):
+        return CommandIndex(self.session,
+                            installed_modules=modules or {'vm': 1.0, 'resource': 2.0},
+                            installed_extensions=extensions or {'foo-ext': 3.0})
+
+    def test_command_index_empty_is_invalid(self):
+        index = self._get_index()
+        self.assertFalse(index.is_valid())
+        self.assertIsNone(index.get('vmss'))
+
+    def test_command_index_update_and_get(self):
+        self._get_index().update(self.command_table, self.command_module_map, self.mod_to_ext_map)
+
+        index = self._get_index()
+        self.assertTrue(index.is_valid())
+        entry = index.get('vmss')
+        self.assertEqual(entry.modules, ['vm'])
+        self.assertEqual(entry.extensions, [])
+        entry = index.get('group')
+        self.assertEqual(entry.modules, ['resource'])
+        self.assertEqual(entry.extensions, ['foo-ext'])
+        self.assertIsNone(index.get('unknown'))
+
+    def test_command_index_stores_only_groups(self):
+        index = self._get_index()
+        index.update(self.command_table, self.command_module_map, self.mod_to_ext_map)
+        self.assertEqual(sorted(self.session.data), ['groups', 'version'])
+        self.assertEqual(sorted(self.session.data['groups']), ['group', 'vm', 'vmss'])
+
+    def test_command_index_module_stamp_from_dist_metadata(self):
+        from azure.cli.core.commands._command_index import _get_module_stamp
+        modules_path = os.path.join(self.tempdir, 'azure', 'cli', 'command_modules')
+        os.makedirs(os.path.join(modules_path, 'vm'))
+        metadata = os.path.join(self.tempdir, 'azure_cli_vm-2.0.14.dist-info')
+        os.makedirs(metadata)
+        os.utime(metadata, (1000, 1000))
+        source = os.path.join(modules_path, 'vm', 'custom.py')
+        with open(source, 'w') as f:
+            f.write('')
+        os.utime(source, (2000, 2000))
+        os.utime(os.path.join(modules_path, 'vm'), (1000, 1000))
+        with mock.patch('azure.cli.core.commands._command_index._site_dir_entries', {}):
+            self.assertEqual(_get_module_stamp(modules_path, 'vm'), 1000)
+
+            # a source checkout installed in development mode is stamped with its sources
+            with open(os.path.join(self.tempdir, 'setup.py'), 'w') as f:
+                f.write('')
+            self.assertEqual(_get_module_stamp(modules_path, 'vm'), 2000)
+
+    def test_command_index_invalidated_by_install_changes(self):
+        self._get_index().update(self.command_table, self.command_module_map, self.mod_to_ext_map)
+        self.assertFalse(self._get_index(modules={'vm': 5.0, 'resource': 2.0}).is_valid())
+        self.assertFalse(self._get_index(modules={'vm': 1.0}).is_valid())
+        self.assertFalse(self._get_index(extensions={'foo-ext': 3.0, 'bar-ext': 4.0}).is_valid())
+
+    def test_command_index_argument_cache(self):
+        self._get_index().set_arguments('op|', [['a', {'dest': 'a'}]])
+        self.assertEqual(self._get_index().get_arguments('op|'), [['a', {'dest': 'a'}]])
+        self.assertIsNone(self._get_index().get_arguments('other|'))
+        self.assertIsNone(self._get_index(modules={'vm': 5.0}).get_arguments('op|'))
+
+    def test_command_index_argument_cache_saved_once(self):
+        index = self._get_index()
+        with mock.patch.object(self.session, 'save') as save_mock:
+            for i in range(10):
+                index.set_arguments('op{}|'.format(i), [['a', {'dest': 'a'}]])
+            self.assertFalse(save_mock.called)
+            index.save()
+            index.save()
+        save_mock.assert_called_once_with()
+
+    def test_command_index_shared_and_stamped_once(self):
+        from azure.cli.core.commands import _command_index
+        _command_index.reset_installed_version()
+        self.addCleanup(_command_index.reset_installed_version)
+        with mock.patch('azure.cli.core.commands._command_index.get_installed_command_modules',
+                        return_value={'vm': 1.0}) as modules_mock, \
+                mock.patch('azure.cli.core.commands._command_index.INDEX', self.session):
+            index = _command_index.get_command_index()
+            self.assertIs(_command_index.get_command_index(), index)
+            self.assertEqual(index.version['modules'], {'vm': 1.0})
+            self.assertEqual(CommandIndex(self.session).version['modules'], {'vm': 1.0})
+            self.assertEqual(modules_mock.call_count, 1)
+
+    def test_session_save_replaces_file(self):
+        self.session.data = {'groups': {'vm': {}}}
+        self.session.save()
+        self.session.data = {'groups': {}}
+        with mock.patch('json.dump', side_effect=ValueError('interrupted')):
+            with self.assertRaises(ValueError):
+                self.session.save()
+
+        # a failed save leaves the previous file in place and no temporary file behind
+        self.assertEqual(os.listdir(self.tempdir), ['commandIndex.json'])
+        session = Session()
+        session.load(self.session.filename)
+        self.assertEqual(session.data, {'groups': {'vm': {}}})
+
+    def test_command_index_argument_cache_requires_file(self):
+        self.session.filename = None
+        self._get_index().set_arguments('op|', [['a', {'dest': 'a'}]])
+        self.assertIsNone(self._get_index().get_arguments('op|'))
+
+    def test_command_index_module_edits_change_version(self):
+        from azure.cli.core.commands._command_index import _get_package_mtime
+        source = os.path.join(self.tempdir, 'custom.py')
+        with open(source, 'w') as f:
+            f.write('')
+        os.utime(source, (1000, 1000))
+        os.utime(self.tempdir, (1000, 1000))
+        self.assertEqual(_get_package_mtime(self.tempdir), 1000)
+        os.utime(source, (2000, 2000))
+        self.assertEqual(_get_package_mtime(self.tempdir), 2000)
+
+    def test_extract_cached_args_from_signature(self):
+        operation = 'azure.cli.core.tests.test_command_index#_sample_operation'
+        with mock.patch('azure.cli.core.commands._command_index.INDEX', self.session):
+            arguments = dict(extract_cached_args_from_signature(operation))
+            with mock.patch('azure.cli.core.commands.get_op_handler') as get_op_handler_mock:
+                cached_arguments = dict(extract_cached_args_from_signature(operation))
+                self.assertFalse(get_op_handler_mock.called)
+
+        self.assertEqual(sorted(arguments), ['force', 'resource_group_name', 'vm_name'])
+        for name, argument in arguments.items():
+            self.assertEqual(argument.type.settings, cached_arguments[name].type.settings)
+        self.assertEqual(cached_arguments['vm_name'].options['help'], 'The name of the VM.')
+        self.assertEqual(cached_arguments['force'].options['action'], 'store_true')
+
+
+if __name__ == '__main__':
+    unittest.main()
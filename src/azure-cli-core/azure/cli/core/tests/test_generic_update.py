@@ -7,6 +7,7 @@ import logging
 import unittest
 import shlex
 import sys
+import mock
 from azure.cli.core.application import APPLICATION, Application, Configuration
 from azure.cli.core.commands import CliArgumentType, register_cli_argument
 from azure.cli.core.commands.arm import cli_generic_update_command
@@ -310,6 +311,36 @@ class GenericUpdateTest(unittest.TestCase):
         self.assertEqual(my_obj['dict3']['g'], 'h', 'verify object added to empty dict')
         self.assertEqual(len(my_obj['dict3']), 1, 'verify only one object added to empty dict')
 
+    def test_generic_update_resolves_arguments_once(self):
+        my_obj = TestObject()
+
+        def my_get(resource_group_name, name, option_a=None, option_b=None):  # pylint:disable=unused-argument
+            return my_obj
+
+        def my_set(resource_group_name, name, parameters, option_a=None):  # pylint:disable=unused-argument
+            return my_obj
+
+        config = Configuration()
+        app = Application()
+        app.initialize(config)
+
+        setattr(sys.modules[__name__], my_get.__name__, my_get)
+        setattr(sys.modules[__name__], my_set.__name__, my_set)
+        import azure.cli.core.commands.arm as arm
+        with mock.patch.object(arm, 'extract_cached_args_from_signature',
+                               wraps=arm.extract_cached_args_from_signature) as extract_mock:
+            cli_generic_update_command(None, 'update-resolve', '{}#{}'.format(__name__, my_get.__name__),
+                                       '{}#{}'.format(__name__, my_set.__name__))
+            counts = []
+            for value in ['a', 'b', 'c']:
+                app.execute('update-resolve --resource-group-name rg --name n --set myProp={}'.format(value).split())
+                counts.append(extract_mock.call_count)
+
+        self.assertEqual(my_obj.my_prop, 'c')
+        # after the first run only building the parser extracts the arguments of the getter and the setter
+        self.assertEqual(counts[2] - counts[1], 2)
+        self.assertEqual(counts[1] - counts[0], 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import unittest
+
+import mock
+
+import azure.cli.core.commands as commands
+from azure.cli.core.commands import LongRunningOperation
+
+
+class _Response(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, correlation_id, retry_after=None):
+        self._content = json.dumps({'properties': {'correlationId': correlation_id}}).encode()
+        self.headers = {'retry-after': retry_after} if retry_after else {}
+
+
+class _Poller(object):
+
+    def __init__(self, polls, result=None, exception=None, correlation_id='c1'):
+        self._response = _Response(correlation_id)
+        self._polls = polls
+        self._result = result
+        self._exception = exception
+        self.wait_timeouts = []
+
+    def wait(self, timeout=None):
+        self.wait_timeouts.append(timeout)
+        self._polls -= 1
+
+    def done(self):
+        return self._polls <= 0
+
+    def result(self):
+        if self._exception:
+            raise self._exception
+        return self._result
+
+
+class TestLongRunningOperation(unittest.TestCase):
+
+    def _operation(self):
+        return LongRunningOperation(progress_controller=mock.MagicMock(), poller_done_interval_ms=500.0)
+
+    def test_long_running_operation_waits_on_poller(self):
+        poller = _Poller(3, result='done')
+        with mock.patch('azure.cli.core.commands._get_correlation_id',
+                        wraps=commands._get_correlation_id) as correlation_mock:
+            self.assertEqual(self._operation()(poller), 'done')
+        self.assertEqual(poller.wait_timeouts, [0.5, 0.5, 0.5])
+        # parsed once rather than on every poll
+        self.assertEqual(correlation_mock.call_count, 1)
+        self.assertEqual(commands._get_correlation_id(poller), 'c1')
+
+    def test_long_running_operation_without_wait_delays(self):
+        poller = mock.MagicMock(spec=['done', 'result'])
+        poller.done.side_effect = [False, False, True]
+        poller.result.return_value = 'done'
+        operation = self._operation()
+        with mock.patch.object(operation, '_delay') as delay_mock:
+            self.assertEqual(operation(poller), 'done')
+        self.assertEqual(delay_mock.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,8 @@ import unittest
 from collections import OrderedDict
 from six import StringIO
 
-from azure.cli.core._output import OutputProducer, format_json, format_table, format_tsv, CommandResultItem
+from azure.cli.core._output import (OutputProducer, format_json, format_json_color, format_table, format_tsv,
+                                    CommandResultItem, StreamingResult, TableOutput)
 import azure.cli.core.util as util
 
 
@@ -176,6 +177,47 @@ qwerty  0b1f6472qwerty  True
         result = format_tsv(CommandResultItem([obj1, obj2]))
         self.assertEqual(result, '1\t2\n3\t4\n')
 
+    def _out_streamed(self, formatter, items, **kwargs):
+        output_producer = OutputProducer(formatter=formatter, file=self.io)
+        output_producer.out(CommandResultItem(StreamingResult(iter(items)), **kwargs))
+        return self.io.getvalue()
+
+    def test_out_streamed_same_as_list(self):
+        items = [{'name': 'a', 'count': 1, 'tags': {'x': 'y'}}, {'name': 'b', 'count': 20, 'tags': None}]
+        for formatter in (format_json, format_tsv, format_table):
+            for data in (items, items[:1], []):
+                self.io = StringIO()
+                streamed = self._out_streamed(formatter, data)
+                self.assertEqual(streamed, formatter(CommandResultItem(data)))
+
+    def test_out_streamed_converters_applied_per_item(self):
+        result = StreamingResult(iter([1, 2]))
+        result.add_converter(lambda x: x * 10)
+        result.add_converter(lambda x: {'value': x})
+        self.assertEqual(list(result), [{'value': 10}, {'value': 20}])
+
+    def test_out_streamed_without_stream_formatter(self):
+        self.assertEqual(self._out_streamed(format_json_color, [{'a': 1}]),
+                         format_json_color(CommandResultItem([{'a': 1}])))
+
+    def test_out_streamed_table_transformer(self):
+        items = [{'name': 'a', 'location': 'westus'}, {'name': 'b', 'location': 'eastus'}]
+        for transformer in ('[].{Name:name}', lambda r: [{'Name': i['name']} for i in r]):
+            self.io = StringIO()
+            self.assertEqual(self._out_streamed(format_table, items, table_transformer=transformer),
+                             format_table(CommandResultItem(items, table_transformer=transformer)))
+
+    def test_out_streamed_table_rows_after_buffer(self):
+        items = [OrderedDict([('name', 'a'), ('count', 1)]), OrderedDict([('name', 'bbbbbbbb'), ('count', 2)]),
+                 OrderedDict([('name', 'c'), ('count', 300)])]
+        chunks = list(TableOutput().dump_stream(items, buffer_size=2))
+        self.assertEqual(''.join(chunks), util.normalize_newlines("""Name        Count
+--------  -------
+a               1
+bbbbbbbb        2
+c             300
+"""))
+
 
 if __name__ == '__main__':
     unittest.main()
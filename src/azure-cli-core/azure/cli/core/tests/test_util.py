@@ -5,12 +5,14 @@
 
 # pylint: disable=line-too-long
 from collections import namedtuple
+from datetime import datetime
+from enum import Enum
 import unittest
 import tempfile
 
 from azure.cli.core.util import \
     (get_file_json, todict, to_snake_case, truncate_text, shell_safe_json_parse, b64_to_hex,
-     hash_string, random_string)
+     hash_string, random_string, get_retry_after)
 
 
 class TestUtils(unittest.TestCase):
@@ -54,6 +56,24 @@ class TestUtils(unittest.TestCase):
         expected = {'a': {'a': 'x', 'b': 'y'}}
         self.assertEqual(actual, expected)
 
+    def test_application_todict_model(self):
+        class Color(str, Enum):
+            red = 'Red'
+
+        class MyModel(object):  # pylint: disable=too-few-public-methods
+            _attribute_map = {'provisioning_state': {}, 'child_model': {}}
+
+            def __init__(self, child=None):
+                self.provisioning_state = Color.red
+                self.child_model = child
+                self.created_time = datetime(2017, 9, 1)
+                self._private = 'hidden'
+                self.handler = len
+
+        actual = todict([MyModel(MyModel()), MyModel()])
+        expected = {'provisioningState': 'Red', 'childModel': None, 'createdTime': '2017-09-01T00:00:00'}
+        self.assertEqual(actual, [dict(expected, childModel=expected), expected])
+
     def test_load_json_from_file(self):
         _, pathname = tempfile.mkstemp()
 
@@ -174,6 +194,14 @@ class TestUtils(unittest.TestCase):
         # Test force_lower
         _run_test(16, True)
 
+    def test_get_retry_after(self):
+        response = namedtuple('Response', 'headers')
+        self.assertEqual(get_retry_after(response({'Retry-After': '17'})), 17)
+        self.assertEqual(get_retry_after(response({'retry-after': '5'})), 5)
+        self.assertEqual(get_retry_after(response({'Retry-After': '-1'})), 0)
+        self.assertIsNone(get_retry_after(response({'Retry-After': 'Fri, 31 Dec 1999 23:59:59 GMT'})))
+        self.assertIsNone(get_retry_after(response({})))
+        self.assertIsNone(get_retry_after(None))
 
 class TestBase64ToHex(unittest.TestCase):
 
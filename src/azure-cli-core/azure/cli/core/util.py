@@ -29,6 +29,15 @@ class CLIError(Exception):
     pass
 
 
+class PartialResultError(CLIError):
+    """Raised by a command which completed only in part, e.g. for some of the resources it was given.
+    The result is output before the error is reported.
+    """
+    def __init__(self, message, result):
+        super(PartialResultError, self).__init__(message)
+        self.result = result
+
+
 def handle_exception(ex):
     # For error code, follow guidelines at https://docs.python.org/2/library/sys.html#sys.exit,
     from msrestazure.azure_exceptions import CloudError
@@ -162,9 +171,30 @@ def shell_safe_json_parse(json_or_dict_string, preserve_order=False):
             raise CLIError(json_ex)
 
 
-def todict(obj):  # pylint: disable=too-many-return-statements
+# types returned by todict as they are; subclasses (e.g. str based enums) take the slow path
+_TODICT_PRIMITIVE_TYPES = frozenset((six.text_type, six.binary_type, float, bool, type(None)) + six.integer_types)
+
+# per-class mapping of instance attribute name -> output key (None for private attributes)
+_TODICT_KEY_MAPS = {}
+
+
+def _get_todict_key_map(obj_type):
+    try:
+        return _TODICT_KEY_MAPS[obj_type]
+    except KeyError:
+        # msrest models declare their attributes up front
+        key_map = {}
+        for name in getattr(obj_type, '_attribute_map', None) or {}:
+            key_map[name] = None if name.startswith('_') else to_camel_case(name)
+        _TODICT_KEY_MAPS[obj_type] = key_map
+        return key_map
+
 
-    if isinstance(obj, dict):
+def todict(obj):  # pylint: disable=too-many-return-statements
+    obj_type = type(obj)
+    if obj_type in _TODICT_PRIMITIVE_TYPES:
+        return obj
+    elif isinstance(obj, dict):
         return {k: todict(v) for (k, v) in obj.items()}
     elif isinstance(obj, list):
         return [todict(a) for a in obj]
@@ -177,9 +207,16 @@ def todict(obj):  # pylint: disable=too-many-return-statements
     elif hasattr(obj, '_asdict'):
         return todict(obj._asdict())
     elif hasattr(obj, '__dict__'):
-        return dict([(to_camel_case(k), todict(v))
-                     for k, v in obj.__dict__.items()
-                     if not callable(v) and not k.startswith('_')])
+        key_map = _get_todict_key_map(obj_type)
+        result = {}
+        for k, v in obj.__dict__.items():
+            try:
+                key = key_map[k]
+            except KeyError:
+                key = key_map[k] = None if k.startswith('_') else to_camel_case(k)
+            if key is not None and not callable(v):
+                result[key] = todict(v)
+        return result
     return obj
 
 
@@ -195,6 +232,16 @@ def to_snake_case(s):
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
 
 
+def get_retry_after(response):
+    """ Returns the seconds to wait given by the Retry-After header of a response, if any. """
+    headers = getattr(response, 'headers', None) or {}
+    value = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
 def b64encode(s):
     """
     Encodes a string to base64 on 2.x and 3.x
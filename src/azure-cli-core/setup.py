@@ -73,6 +73,9 @@ DEPENDENCIES = [
 if sys.version_info < (3, 4):
     DEPENDENCIES.append('enum34')
 
+if sys.version_info < (3, 2):
+    DEPENDENCIES.append('futures')
+
 if sys.version_info < (2, 7, 9):
     DEPENDENCIES.append('pyopenssl')
     DEPENDENCIES.append('ndg-httpsclient')
@@ -6,8 +6,14 @@
 import sys
 import os
 
-import azure.cli.main
-import azure.cli.core.telemetry as telemetry
+if os.environ.get('AZURE_CLI_DAEMON'):
+    from azure.cli.daemon import run_with_daemon
+    daemon_exit_code = run_with_daemon(sys.argv[1:])
+    if daemon_exit_code is not None:
+        sys.exit(daemon_exit_code)
+
+import azure.cli.main  # pylint: disable=wrong-import-position
+import azure.cli.core.telemetry as telemetry  # pylint: disable=wrong-import-position
 
 try:
     telemetry.start()
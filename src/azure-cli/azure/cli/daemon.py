@@ -0,0 +1,426 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+'''Opt-in daemon mode for script-heavy workloads.
+
+The daemon imports the CLI and loads the command table once, then serves each request from a
+forked child, so every invocation starts warm. Requests go through a local Unix socket: the
+client forwards its argv, environment, working directory and stdin/stdout/stderr file
+descriptors and relays the exit code. Each child reloads the profile, config and token cache
+from disk exactly as a regular invocation does, so `az login`/`az account set` are picked up.
+
+Enable with `AZURE_CLI_DAEMON=1` (the daemon is started on first use) or manage it with
+`python -m azure.cli.daemon start|stop|status|serve`. This module only imports the standard
+library at the top level so the client stays cheap.
+'''
+
+from __future__ import print_function
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+
+DAEMON_ENV_NAME = 'AZURE_CLI_DAEMON'
+DAEMON_SOCKET_ENV_NAME = 'AZURE_CLI_DAEMON_SOCKET'
+DAEMON_IDLE_TIMEOUT_ENV_NAME = 'AZURE_CLI_DAEMON_IDLE_TIMEOUT'
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# The on-disk state baked into the warm process is checked again on the first request after the
+# daemon was idle for this many seconds, and at least this often during a burst of requests.
+_STATE_CHECK_IDLE_TIME = 1
+_STATE_CHECK_MAX_AGE = 60
+
+# Environment variables that are read when the CLI is imported. A request whose values differ
+# from the daemon's is run by the client itself.
+_IMPORT_TIME_ENV_PREFIXES = ('AZURE_', 'ADAL_', 'REQUESTS_CA_BUNDLE', 'HTTP_PROXY', 'HTTPS_PROXY', 'NO_PROXY',
+                             '_ARGCOMPLETE')
+
+_DAEMON_ENV_NAMES = (DAEMON_ENV_NAME, DAEMON_SOCKET_ENV_NAME, DAEMON_IDLE_TIMEOUT_ENV_NAME)
+
+_LENGTH_FORMAT = '!I'
+_REPLY_FORMAT = '!ci'
+_REPLY_RUNNING = b'R'
+_REPLY_EXIT = b'X'
+_REPLY_FALLBACK = b'F'
+_REQUEST_TIMEOUT = 10
+_MAX_FDS = 3
+
+
+def get_socket_path():
+    socket_path = os.environ.get(DAEMON_SOCKET_ENV_NAME)
+    if socket_path:
+        return socket_path
+    config_dir = os.getenv('AZURE_CONFIG_DIR', None) or os.path.expanduser(os.path.join('~', '.azure'))
+    return os.path.join(config_dir, 'az.sock')
+
+
+def is_supported():
+    return hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'sendmsg')
+
+
+def _get_import_time_env(env):
+    # the daemon's own settings are only in the environment of the daemon, or of the client
+    return {k: v for k, v in env.items()
+            if k.upper().startswith(_IMPORT_TIME_ENV_PREFIXES) and k not in _DAEMON_ENV_NAMES}
+
+
+def _send_frame(sock, payload, fds=None):
+    data = struct.pack(_LENGTH_FORMAT, len(payload)) + payload
+    if fds:
+        import array
+        sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+    else:
+        sock.sendall(data)
+
+
+def _recv_exact(sock, size, data=b''):
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError('Connection closed by peer.')
+        data += chunk
+    return data
+
+
+def _recv_frame(sock):
+    import array
+    fds = array.array('i')
+    data, ancdata, _, _ = sock.recvmsg(65536, socket.CMSG_LEN(_MAX_FDS * fds.itemsize))
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+    if not data:
+        raise EOFError('Connection closed by peer.')
+    header_size = struct.calcsize(_LENGTH_FORMAT)
+    data = _recv_exact(sock, header_size, data)
+    length = struct.unpack(_LENGTH_FORMAT, data[:header_size])[0]
+    payload = _recv_exact(sock, header_size + length, data)[header_size:]
+    return json.loads(payload.decode('utf-8')), list(fds)
+
+
+def _send_reply(sock, kind, value=0):
+    sock.sendall(struct.pack(_REPLY_FORMAT, kind, value))
+
+
+def _recv_reply(sock):
+    size = struct.calcsize(_REPLY_FORMAT)
+    return struct.unpack(_REPLY_FORMAT, _recv_exact(sock, size))
+
+
+# Client
+
+def run_with_daemon(args, autostart=True):
+    ''' Runs the command through the daemon and returns its exit code. Returns None if the
+    command must be run in-process (daemon unavailable, environment mismatch, ...). '''
+    if not is_supported() or os.environ.get('_ARGCOMPLETE'):
+        return None
+    try:
+        fds = [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()]
+    except (AttributeError, ValueError, OSError):
+        return None
+    socket_path = get_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (OSError, IOError):
+        sock.close()
+        if autostart:
+            start_daemon(socket_path)
+        return None
+
+    try:
+        request = {'command': 'run', 'args': args, 'cwd': os.getcwd(), 'env': dict(os.environ)}
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _send_frame(sock, json.dumps(request).encode('utf-8'), fds=fds)
+        kind, value = _recv_reply(sock)
+        if kind == _REPLY_FALLBACK:
+            return None
+        child_pid = value
+        while True:
+            try:
+                kind, value = _recv_reply(sock)
+                return value
+            except KeyboardInterrupt:
+                # the command runs outside of our process group, forward the interrupt
+                os.kill(child_pid, signal.SIGINT)
+    except (EOFError, OSError, IOError, ValueError):
+        return 1
+    finally:
+        sock.close()
+
+
+def start_daemon(socket_path=None):
+    ''' Starts the daemon in the background. '''
+    import subprocess
+    socket_path = socket_path or get_socket_path()
+    env = dict(os.environ)
+    env.pop(DAEMON_ENV_NAME, None)
+    env[DAEMON_SOCKET_ENV_NAME] = socket_path
+    with open(os.devnull, 'r+b') as devnull:
+        subprocess.Popen([sys.executable, '-m', 'azure.cli.daemon', 'serve'],  # pylint: disable=subprocess-popen-preexec-fn
+                         stdin=devnull, stdout=devnull, stderr=devnull, env=env,
+                         close_fds=True, preexec_fn=os.setsid)
+
+
+def _control(command, socket_path=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or get_socket_path())
+        _send_frame(sock, json.dumps({'command': command}).encode('utf-8'))
+        return _recv_reply(sock)
+    except (OSError, IOError, EOFError):
+        return None
+    finally:
+        sock.close()
+
+
+def stop_daemon(socket_path=None):
+    return _control('stop', socket_path) is not None
+
+
+def get_daemon_pid(socket_path=None):
+    reply = _control('status', socket_path)
+    return reply[1] if reply else None
+
+
+# Server
+
+def _get_state_stamp():
+    ''' Identifies the on-disk state that is baked into the warm process at import time. '''
+    from azure.cli.core._config import GLOBAL_CONFIG_PATH
+    from azure.cli.core.cloud import CLOUD_CONFIG_FILE
+    from azure.cli.core.commands._command_index import get_installed_version, reset_installed_version
+
+    def _mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    reset_installed_version()
+    return [_mtime(GLOBAL_CONFIG_PATH), _mtime(CLOUD_CONFIG_FILE), get_installed_version()]
+
+
+class _StateChecker(object):  # pylint: disable=too-few-public-methods
+    ''' Tells whether the on-disk state changed since the daemon started. The state is only
+    checked again on the first request after an idle period, so a burst of requests doesn't pay
+    for it on every connection. '''
+
+    def __init__(self):
+        self.stamp = _get_state_stamp()
+        self.last_check = self.last_request = time.time()
+
+    def is_stale(self):
+        now = time.time()
+        idle_time = now - self.last_request
+        self.last_request = now
+        if idle_time < _STATE_CHECK_IDLE_TIME and now - self.last_check < _STATE_CHECK_MAX_AGE:
+            return False
+        self.last_check = now
+        return _get_state_stamp() != self.stamp
+
+
+def _preload():
+    import azure.cli.main  # pylint: disable=unused-variable
+    from azure.cli.core.commands import get_command_table
+    import azure.cli.core._output  # pylint: disable=unused-variable
+    import azure.cli.core.commands.client_factory  # pylint: disable=unused-variable
+    for mod in ('msrest', 'msrestazure.azure_operation', 'adal', 'requests', 'jmespath'):
+        try:
+            __import__(mod)
+        except ImportError:
+            pass
+    get_command_table()
+
+
+def _run_request(request, fds):
+    ''' Runs in the forked child: adopt the client's stdio, environment and working directory
+    and execute the command as `python -m azure.cli` would. Never returns. '''
+    exit_code = 1
+    try:
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        from azure.cli.core._config import az_config, get_config_parser, GLOBAL_CONFIG_PATH
+        import azure.cli.main
+        import azure.cli.core.telemetry as telemetry
+
+        az_config.config_parser = get_config_parser()
+        az_config.config_parser.read(GLOBAL_CONFIG_PATH)
+        try:
+            telemetry.start()
+            exit_code = azure.cli.main.main(request['args'])
+            if exit_code and exit_code != 0:
+                telemetry.set_failure()
+            else:
+                telemetry.set_success()
+        except KeyboardInterrupt:
+            telemetry.set_user_fault('keyboard interrupt')
+            exit_code = 1
+        finally:
+            telemetry.conclude()
+    except SystemExit as ex:
+        exit_code = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+    except BaseException:  # pylint: disable=broad-except
+        import traceback
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except (OSError, IOError, ValueError):
+            pass
+    return exit_code or 0
+
+
+def _reap_children(*_):
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] > 0:
+            pass
+    except OSError:
+        pass
+
+
+def serve(socket_path=None, idle_timeout=None):
+    ''' Runs the daemon in the foreground until stopped, idle for `idle_timeout` seconds, or
+    the configuration baked into the warm process changes. '''
+    socket_path = socket_path or get_socket_path()
+    if idle_timeout is None:
+        idle_timeout = int(os.environ.get(DAEMON_IDLE_TIMEOUT_ENV_NAME, DEFAULT_IDLE_TIMEOUT))
+
+    _preload()
+    state_checker = _StateChecker()
+    import_time_env = _get_import_time_env(os.environ)
+
+    if os.path.exists(socket_path):
+        if get_daemon_pid(socket_path):
+            raise RuntimeError('A daemon is already listening on {}'.format(socket_path))
+        os.remove(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+    listener.settimeout(idle_timeout or None)
+    signal.signal(signal.SIGCHLD, _reap_children)
+
+    try:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                break
+            except (OSError, IOError) as ex:
+                import errno
+                if ex.errno == errno.EINTR:
+                    continue
+                raise
+            if not _handle_connection(conn, listener, state_checker, import_time_env):
+                break
+    finally:
+        listener.close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def _handle_connection(conn, listener, state_checker, import_time_env):
+    ''' Dispatches a client connection. Returns False when the daemon should shut down. '''
+    fds = []
+    try:
+        conn.settimeout(_REQUEST_TIMEOUT)
+        request, fds = _recv_frame(conn)
+        command = request.get('command')
+        if command == 'status':
+            _send_reply(conn, _REPLY_EXIT, os.getpid())
+            return True
+        elif command == 'stop':
+            _send_reply(conn, _REPLY_EXIT, 0)
+            return False
+        elif command != 'run' or len(fds) != _MAX_FDS:
+            _send_reply(conn, _REPLY_FALLBACK)
+            return True
+
+        if state_checker.is_stale():
+            # the warm process is out of date: let the client run the command and go away so
+            # the next client starts a fresh daemon
+            _send_reply(conn, _REPLY_FALLBACK)
+            return False
+        if _get_import_time_env(request['env']) != import_time_env:
+            _send_reply(conn, _REPLY_FALLBACK)
+            return True
+
+        pid = os.fork()
+        if pid == 0:
+            listener.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            exit_code = 1
+            try:
+                conn.settimeout(None)
+                _send_reply(conn, _REPLY_RUNNING, os.getpid())
+                exit_code = _run_request(request, fds)
+                _send_reply(conn, _REPLY_EXIT, exit_code)
+            finally:
+                os._exit(exit_code)  # pylint: disable=protected-access
+        return True
+    except (EOFError, OSError, IOError, ValueError, KeyError):
+        return True
+    finally:
+        for fd in fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        conn.close()
+
+
+def main(args):
+    if not is_supported():
+        print('The daemon is not supported on this platform.', file=sys.stderr)
+        return 1
+    command = args[0] if args else 'status'
+    if command == 'serve':
+        serve()
+    elif command == 'start':
+        if get_daemon_pid():
+            print('The daemon is already running.', file=sys.stderr)
+            return 0
+        start_daemon()
+        for _ in range(100):
+            time.sleep(0.1)
+            if get_daemon_pid():
+                break
+        else:
+            print('The daemon did not start.', file=sys.stderr)
+            return 1
+    elif command == 'stop':
+        if not stop_daemon():
+            print('The daemon is not running.', file=sys.stderr)
+    elif command == 'status':
+        pid = get_daemon_pid()
+        print('The daemon is running (pid {}) on {}.'.format(pid, get_socket_path()) if pid
+              else 'The daemon is not running.')
+    else:
+        print('usage: python -m azure.cli.daemon [start|stop|status|serve]', file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
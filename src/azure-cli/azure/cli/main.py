@@ -8,7 +8,7 @@ import sys
 
 from azure.cli.core import configure_logging, get_az_logger
 from azure.cli.core.application import APPLICATION, Configuration
-from azure.cli.core._session import ACCOUNT, CONFIG, SESSION
+from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX
 from azure.cli.core.util import (show_version_info_exit, handle_exception)
 from azure.cli.core._environment import get_config_dir
 import azure.cli.core.telemetry as telemetry
@@ -29,6 +29,11 @@ def main(args, output=sys.stdout, logging_stream=None):
     ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
     CONFIG.load(os.path.join(azure_folder, 'az.json'))
     SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
+    try:
+        INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
+    except ValueError:
+        # an unreadable index is treated as empty and rebuilt by the next full command table load
+        logger.debug('Ignoring the corrupted command index %s', INDEX.filename)
 
     APPLICATION.initialize(Configuration())
 
@@ -41,6 +46,8 @@ def main(args, output=sys.stdout, logging_stream=None):
             from azure.cli.core._output import OutputProducer
             formatter = OutputProducer.get_formatter(APPLICATION.configuration.output_format)
             OutputProducer(formatter=formatter, file=output).out(cmd_result)
+        if cmd_result and cmd_result.error:
+            raise cmd_result.error
 
     except Exception as ex:  # pylint: disable=broad-except
 
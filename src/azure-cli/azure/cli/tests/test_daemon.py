@@ -0,0 +1,120 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+
+from azure.cli import daemon
+
+
+def _run_request(request, fds):
+    # runs in the forked child instead of the command
+    os.write(fds[1], ' '.join(request['args']).encode('utf-8'))
+    return 3
+
+
+@unittest.skipUnless(daemon.is_supported() and hasattr(os, 'fork'), 'requires Unix sockets and fork')
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.addCleanup(signal.signal, signal.SIGCHLD, signal.SIG_DFL)
+        # the default socket is in the config directory
+        self.socket_path = os.path.join(self.temp_dir, 'az.sock')
+        self.stamps = [['config', 'cloud', {'modules': {'vm': 1.0}}]]
+        self.results = []
+        for patcher in [mock.patch('azure.cli.daemon._preload'),
+                        mock.patch('azure.cli.daemon._run_request', side_effect=_run_request),
+                        mock.patch('azure.cli.daemon._get_state_stamp', side_effect=lambda: self.stamps[-1]),
+                        mock.patch.dict('os.environ', {'AZURE_CONFIG_DIR': self.temp_dir})]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self, args, env=None):
+        stdio = [open(os.path.join(self.temp_dir, name), 'w+') for name in ('stdin', 'stdout', 'stderr')]
+        try:
+            with mock.patch('sys.stdin', stdio[0]), mock.patch('sys.stdout', stdio[1]), \
+                    mock.patch('sys.stderr', stdio[2]), mock.patch.dict('os.environ', env or {}):
+                exit_code = daemon.run_with_daemon(args, autostart=False)
+            stdio[1].seek(0)
+            return exit_code, stdio[1].read()
+        finally:
+            for f in stdio:
+                f.close()
+
+    def _serve(self, client):
+        """ Serves in the main thread, which handles the signals, while the client runs in another. """
+        def _client():
+            try:
+                for _ in range(100):
+                    if os.path.exists(self.socket_path):
+                        break
+                    time.sleep(0.05)
+                client()
+            finally:
+                daemon.stop_daemon(self.socket_path)
+
+        thread = threading.Thread(target=_client)
+        # the daemon is started with its socket and idle timeout in its environment, unlike its clients
+        with mock.patch.dict('os.environ', {daemon.DAEMON_SOCKET_ENV_NAME: self.socket_path,
+                                            daemon.DAEMON_IDLE_TIMEOUT_ENV_NAME: '30'}):
+            thread.start()
+            daemon.serve()
+        thread.join()
+
+    def test_daemon_import_time_env(self):
+        env = {'AZURE_CONFIG_DIR': '/tmp/az', 'PATH': '/usr/bin', daemon.DAEMON_ENV_NAME: '1',
+               daemon.DAEMON_SOCKET_ENV_NAME: '/tmp/az.sock', daemon.DAEMON_IDLE_TIMEOUT_ENV_NAME: '60'}
+        self.assertEqual(daemon._get_import_time_env(env), {'AZURE_CONFIG_DIR': '/tmp/az'})
+
+    def test_daemon_serves_requests(self):
+        def _client():
+            with mock.patch.dict('os.environ'):
+                os.environ.pop(daemon.DAEMON_SOCKET_ENV_NAME)
+                os.environ.pop(daemon.DAEMON_IDLE_TIMEOUT_ENV_NAME)
+                self.results.append(self._run(['vm', 'list'], env={daemon.DAEMON_ENV_NAME: '1'}))
+                self.results.append(self._run(['group', 'list']))
+
+        self._serve(_client)
+        self.assertEqual(self.results, [(3, 'vm list'), (3, 'group list')])
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_daemon_falls_back_on_env_mismatch(self):
+        def _client():
+            self.results.append(self._run(['vm', 'list'], env={'AZURE_CORE_OUTPUT': 'table'}))
+            self.results.append(daemon.get_daemon_pid(self.socket_path))
+
+        self._serve(_client)
+        # the client runs the command itself, and the daemon keeps serving the others
+        self.assertEqual(self.results, [(None, ''), os.getpid()])
+
+    def test_daemon_falls_back_when_state_changes(self):
+        def _client():
+            self.results.append(self._run(['vm', 'list']))
+            self.results.append(self._run(['vm', 'show']))
+            # the state is only checked again after the daemon was idle
+            self.stamps.append(['config', 'cloud', {'modules': {'vm': 2.0}}])
+            self.results.append(self._run(['vm', 'list']))
+            time.sleep(0.7)
+            self.results.append(self._run(['vm', 'list']))
+
+        with mock.patch('azure.cli.daemon._STATE_CHECK_IDLE_TIME', 0.5):
+            self._serve(_client)
+        # the out of date daemon lets the client run the command and exits
+        self.assertEqual(self.results, [(3, 'vm list'), (3, 'vm show'), (3, 'vm list'), (None, '')])
+        self.assertEqual(daemon._get_state_stamp.call_count, 2)
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@
 # --------------------------------------------------------------------------------------------
 
 from __future__ import print_function
+from collections import OrderedDict
 from importlib import import_module
 
 import json
@@ -11,13 +12,19 @@ import os
 import pkgutil
 import yaml
 
-from azure.cli.core.application import APPLICATION, Configuration
-from azure.cli.core.commands import _update_command_definitions, BLACKLISTED_MODS
+from azure.cli.core.commands import (_update_command_definitions, BLACKLISTED_MODS, command_module_map,
+                                     mod_to_ext_map)
 from azure.cli.core.help_files import helps
 from azure.cli.core.commands.arm import add_id_parameters
+from azure.cli.core.commands._command_index import get_command_index
 
+from azclishell import __version__
 import azclishell.configuration as config
 
+COMMAND_MODULE_PREFIX = 'azure.cli.command_modules.'
+EXTENSION_CACHE_PREFIX = 'extension-'
+CACHE_INDEX_FILE = 'index.json'
+
 
 class LoadFreshTable(object):
     """
@@ -27,16 +34,20 @@ class LoadFreshTable(object):
     def __init__(self):
         self.command_table = None
 
-    def install_modules(self):
+    def install_modules(self, modules=None):
+        """ loads the arguments of the commands of the modules, all the installed modules by default """
         installed_command_modules = []
         for cmd in self.command_table:
+            if modules is not None and get_command_owner(cmd) not in modules:
+                continue
             try:
                 self.command_table[cmd].load_arguments()
             except (ImportError, ValueError):
                 pass
-            mods_ns_pkg = import_module('azure.cli.command_modules')
+        get_command_index().save()
+        mods_ns_pkg = import_module('azure.cli.command_modules')
         for _, modname, _ in pkgutil.iter_modules(mods_ns_pkg.__path__):
-            if modname not in BLACKLISTED_MODS:
+            if modname not in BLACKLISTED_MODS and (modules is None or modname in modules):
                 installed_command_modules.append(modname)
 
         for mod in installed_command_modules:
@@ -49,10 +60,10 @@ class LoadFreshTable(object):
                 print("Error loading: {}".format(mod))
         _update_command_definitions(self.command_table)
 
-    def load_help_files(self, data):
-        """ loads all the extra information from help files """
-        for cmd in helps:
-            diction_help = yaml.load(helps[cmd])
+    def load_help_files(self, data, commands=None):
+        """ loads all the extra information from help files, of the given commands or of all of them """
+        for cmd in helps if commands is None else commands:
+            diction_help = yaml.safe_load(helps[cmd])
             # extra descriptions
             if "short-summary" in diction_help:
                 if cmd in data:
@@ -93,16 +104,34 @@ class LoadFreshTable(object):
                 data[cmd]['examples'] = examples
 
     def dump_command_table(self):
-        """ dumps the command table """
+        """ updates the cached commands of the modules and extensions which changed since they were
+        cached, returns the names of those which changed """
+
+        cache_dir = get_command_cache_dir()
+        index = load_cache_index()
+        stamps = get_cache_stamps()
 
-        self.command_table = APPLICATION.configuration.get_command_table()
-        command_file = config.CONFIGURATION.get_help_files()
+        removed = set(index) - set(stamps)
+        for name in removed:
+            try:
+                os.remove(os.path.join(cache_dir, name + '.json'))
+            except OSError:
+                pass
+            del index[name]
+        changed = [name for name in stamps if index.get(name) != stamps[name]]
+        if not changed:
+            if removed:
+                save_cache_index(index)
+            return []
 
-        self.install_modules()
+        self.command_table = load_command_table(changed)
+        self.install_modules(changed)
         add_id_parameters(self.command_table)
 
         data = {}
         for cmd in self.command_table:
+            if get_command_owner(cmd) not in changed:
+                continue
             com_descrip = {}  # commands to their descriptions, examples, and parameter info
             param_descrip = {}  # parameters to their aliases, required, and descriptions
 
@@ -142,11 +171,80 @@ class LoadFreshTable(object):
             except (ImportError, ValueError):
                 pass
 
-        self.load_help_files(data)
+        group_owners = self._get_group_owners()
+        self.load_help_files(data, [cmd for cmd in helps if (
+            get_command_owner(cmd) if cmd in self.command_table else group_owners.get(cmd)) in changed])
+
+        # dump the commands of every changed module into its cache file
+        modules_data = dict((name, {}) for name in changed)
+        for cmd in data:
+            owner = get_command_owner(cmd) if cmd in self.command_table else group_owners.get(cmd)
+            if owner in modules_data:
+                modules_data[owner][cmd] = data[cmd]
+        for name in changed:
+            with open(os.path.join(cache_dir, name + '.json'), 'w') as help_file:
+                json.dump(modules_data[name], help_file)
+            index[name] = stamps[name]
+        save_cache_index(index)
+        return changed
+
+    def _get_group_owners(self):
+        """ the module or extension of the first command of each group """
+        group_owners = {}
+        for cmd in sorted(self.command_table):
+            words = cmd.split()
+            for i in range(1, len(words)):
+                group_owners.setdefault(' '.join(words[:i]), get_command_owner(cmd))
+        return group_owners
+
+
+def get_command_owner(cmd):
+    """ the name of the module, or extension, whose commands are cached together with the command """
+    module_name = command_module_map.get(cmd) or ''
+    if module_name.startswith(COMMAND_MODULE_PREFIX):
+        return module_name[len(COMMAND_MODULE_PREFIX):].split('.')[0]
+    extension = mod_to_ext_map.get(module_name.split('.')[0])
+    return EXTENSION_CACHE_PREFIX + extension if extension else None
+
 
-        # dump into the cache file
-        with open(os.path.join(get_cache_dir(), command_file), 'w') as help_file:
-            json.dump(data, help_file)
+def load_command_table(names):
+    """ loads the commands of the given modules and extensions only """
+    from azure.cli.core.commands import (_get_command_table_from_extensions, _load_command_modules,
+                                         command_table)
+    _load_command_modules([name for name in names if not name.startswith(EXTENSION_CACHE_PREFIX)])
+    _get_command_table_from_extensions([name[len(EXTENSION_CACHE_PREFIX):] for name in names
+                                        if name.startswith(EXTENSION_CACHE_PREFIX)])
+    _update_command_definitions(command_table)
+    return OrderedDict(command_table)
+
+
+def get_cache_stamps():
+    """ what the cached commands of each module and extension depend on """
+    from azure.cli.core import __version__ as core_version
+    from azure.cli.core.commands._command_index import get_installed_command_modules
+    from azure.cli.core.extension import get_extension_names, get_extension_path
+    extensions = dict((name, os.path.getmtime(get_extension_path(name))) for name in get_extension_names())
+    stamps = {}
+    for name, mtime in get_installed_command_modules(BLACKLISTED_MODS).items():
+        stamps[name] = [core_version, __version__, mtime, sorted(extensions)]
+    for name, mtime in extensions.items():
+        stamps[EXTENSION_CACHE_PREFIX + name] = [core_version, __version__, mtime, sorted(extensions)]
+    return stamps
+
+
+def load_cache_index():
+    """ the stamps of the cached modules and extensions """
+    try:
+        with open(os.path.join(get_command_cache_dir(), CACHE_INDEX_FILE), 'r') as index_file:
+            return json.load(index_file)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_cache_index(index):
+    """ saves the stamps of the cached modules and extensions """
+    with open(os.path.join(get_command_cache_dir(), CACHE_INDEX_FILE), 'w') as index_file:
+        json.dump(index, index_file)
 
 
 def get_cache_dir():
@@ -160,4 +258,12 @@ def get_cache_dir():
     return cache_path
 
 
+def get_command_cache_dir():
+    """ gets the location of the cached commands of each module """
+    cache_path = os.path.join(get_cache_dir(), 'commands')
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path)
+    return cache_path
+
+
 FRESH_TABLE = LoadFreshTable()
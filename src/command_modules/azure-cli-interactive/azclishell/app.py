@@ -317,6 +317,9 @@ class Shell(object):
             'progress': Buffer(is_multiline=False)
         }
 
+        if self.completer:
+            self.completer.dynamic_completions.on_ready = self.restart_completion
+
         writing_buffer = Buffer(
             history=self.history,
             auto_suggest=AutoSuggestFromHistory(),
@@ -341,6 +344,12 @@ class Shell(object):
             application=self.create_application(),
             eventloop=create_eventloop())
 
+    def restart_completion(self):
+        """ completes again once the values of an argument were listed in the background """
+        cli = self._cli
+        if cli:
+            cli.eventloop.call_from_executor(cli.start_completion)
+
     def set_prompt(self, prompt_command="", position=0):
         """ writes the prompt line """
         self.description_docs = u'{}'.format(prompt_command)
@@ -633,6 +642,8 @@ class Shell(object):
                         self.app.configuration.output_format)
                     OutputProducer(formatter=formatter).out(result)
                     self.last = result
+            if result and result.error:
+                raise result.error
 
         except Exception as ex:  # pylint: disable=broad-except
             self.last_exit = handle_exception(ex)
@@ -11,6 +11,7 @@ from azclishell._dump_commands import FRESH_TABLE
 import azclishell.configuration
 from azclishell.argfinder import ArgsFinder
 from azclishell.command_tree import in_tree
+from azclishell.completion_cache import CompletionCache
 from azclishell.layout import get_scope
 from azclishell.util import parse_quotes
 
@@ -76,6 +77,26 @@ def gen_dyn_completion(comp, started_param, prefix, text):
         yield Completion(completion, -len(prefix))
 
 
+def get_subscription_id():
+    """ the subscription the completers list the values of """
+    from azure.cli.core._profile import Profile
+    try:
+        return Profile().get_subscription_id()
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def call_completer(completer, parsed_args):
+    """ gets all the values of an argument completer, of any of the 3 formats the cli uses """
+    try:
+        return completer(prefix='', action=None, parsed_args=parsed_args)
+    except TypeError:
+        try:
+            return completer(prefix='')
+        except TypeError:
+            return completer()
+
+
 def sort_completions(completions_gen):
     """ sorts the completions """
 
@@ -124,6 +145,8 @@ class AzCompleter(Completer):
         self.global_parser.add_argument_group('global', 'Global Arguments')
         self.parser = AzCliCommandParser(parents=[self.global_parser])
         self.cmdtab = None
+        # the values of the argument completers, which can take seconds to list
+        self.dynamic_completions = CompletionCache()
 
     def validate_completion(self, param, words, text_before_cursor, check_double=True):
         """ validates that a param should be completed """
@@ -160,6 +183,8 @@ class AzCompleter(Completer):
             yield cmd
 
         if self.cmdtab:
+            # values requested for a previous text are no longer needed
+            self.dynamic_completions.cancel()
             for val in sort_completions(self.gen_dynamic_completions(text)):
                 yield val
 
@@ -219,35 +244,15 @@ class AzCompleter(Completer):
 
                 parse_args = self.mute_parse_args(text)
 
-                # there are 3 formats for completers the cli uses
-                # this try catches which format it is
-                if self.cmdtab[self.curr_command].arguments[arg_name].completer:
-                    try:
-                        for comp in self.cmdtab[self.curr_command].arguments[arg_name].completer(
-                                prefix=prefix, action=None, parsed_args=parse_args):
-
-                            for comp in gen_dyn_completion(
-                                    comp, started_param, prefix, text):
-                                yield comp
-                    except TypeError:
-                        try:
-                            for comp in self.cmdtab[self.curr_command].\
-                                    arguments[arg_name].completer(prefix=prefix):
-
-                                for comp in gen_dyn_completion(
-                                        comp, started_param, prefix, text):
-                                    yield comp
-                        except TypeError:
-                            try:
-                                for comp in self.cmdtab[self.curr_command].\
-                                        arguments[arg_name].completer():
-
-                                    for comp in gen_dyn_completion(
-                                            comp, started_param, prefix, text):
-                                        yield comp
-
-                            except TypeError:
-                                pass  # other completion method used
+                # the values are listed in the background and completed once they are cached
+                completer = self.cmdtab[self.curr_command].arguments[arg_name].completer
+                if completer:
+                    key = (self.curr_command, arg_name, get_subscription_id(),
+                           getattr(parse_args, 'resource_group_name', None))
+                    values = self.dynamic_completions.get(key, lambda: call_completer(completer, parse_args))
+                    for value in values or []:
+                        for comp in gen_dyn_completion(value, started_param, prefix, text):
+                            yield comp
 
         # if the user isn't logged in
         except Exception:  # pylint: disable=broad-except
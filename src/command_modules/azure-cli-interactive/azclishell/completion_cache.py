@@ -0,0 +1,84 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import timeit
+
+import azure.cli.core.azlogging as azlogging
+
+logger = azlogging.get_az_logger(__name__)
+
+# seconds the values of an argument completer are reused for
+COMPLETION_TTL = 60
+
+
+class CompletionCache(object):
+    """ fetches the values of argument completers on a background worker and caches them """
+    def __init__(self, ttl=COMPLETION_TTL, on_ready=None):
+        self.ttl = ttl
+        # called from the worker when the values which were asked for last are fetched
+        self.on_ready = on_ready
+        # key to the seconds the last fetch took
+        self.latencies = {}
+        self._values = {}
+        self._wanted = None
+        self._queued = None
+        self._running = None
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def get(self, key, fetch):
+        """ returns the cached values, or None after asking the worker to fetch them """
+        with self._condition:
+            entry = self._values.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                return entry[1]
+            self._wanted = key
+            # a request the worker hasn't started is stale as soon as another one is made
+            self._queued = (key, fetch) if key != self._running else None
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work)
+                self._worker.daemon = True
+                self._worker.start()
+            self._condition.notify()
+        return None
+
+    def cancel(self):
+        """ drops the request the worker hasn't started, the values are no longer wanted """
+        with self._condition:
+            self._wanted = None
+            self._queued = None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while self._queued is None:
+                    self._condition.wait()
+                key, fetch = self._queued
+                self._queued = None
+                self._running = key
+            self._fetch(key, fetch)
+
+    def _fetch(self, key, fetch):
+        start_time = timeit.default_timer()
+        try:
+            values = list(fetch())
+        except Exception as ex:  # pylint: disable=broad-except
+            # like when the user isn't logged in, retried once the values expire
+            logger.debug('Completer for %s failed: %s', key, ex)
+            values = []
+        elapsed_time = timeit.default_timer() - start_time
+        logger.debug('Completer for %s returned %d values in %.3f seconds.', key, len(values), elapsed_time)
+
+        with self._condition:
+            self._values[key] = (time.time(), values)
+            self._running = None
+            self.latencies[key] = elapsed_time
+            ready = key == self._wanted
+            if ready:
+                self._wanted = None
+        if ready and self.on_ready:
+            self.on_ready()
@@ -68,6 +68,46 @@ def add_new_lines(long_phrase, line_min=None, tolerance=TOLERANCE):
     return long_phrase + "\n"
 
 
+class WrappedDescriptions(dict):
+    """ descriptions which are only broken into lines for the screen when they are shown """
+    def __init__(self, line_min=None):
+        super(WrappedDescriptions, self).__init__()
+        self.line_min = line_min
+        self._wrapped = set()
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if key not in self._wrapped:
+            value = add_new_lines(value, line_min=self.line_min)
+            dict.__setitem__(self, key, value)
+            self._wrapped.add(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._wrapped.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def load_command_cache(cache_path):
+    """ loads the cached commands of every module, raises IOError if none are cached """
+    try:
+        with open(os.path.join(cache_path, 'index.json'), 'r') as index_file:
+            modules = json.load(index_file)
+    except ValueError:
+        raise IOError('The command cache is corrupted')
+    data = {}
+    for module in modules:
+        try:
+            with open(os.path.join(cache_path, module + '.json'), 'r') as help_file:
+                data.update(json.load(help_file))
+        except (IOError, ValueError):
+            continue
+    return data
+
+
 # pylint: disable=too-many-instance-attributes
 class GatherCommands(object):
     """ grabs all the cached commands from files """
@@ -109,19 +149,22 @@ class GatherCommands(object):
 
     def gather_from_files(self):
         """ gathers from the files in a way that is convienent to use """
-        command_file = CONFIGURATION.get_help_files()
-        cache_path = os.path.join(azclishell.configuration.get_config_dir(), 'cache')
+        cache_path = os.path.join(azclishell.configuration.get_config_dir(), 'cache', 'commands')
         cols = _get_window_columns()
+        line_min = int(cols) - 2 * TOLERANCE
 
-        with open(os.path.join(cache_path, command_file), 'r') as help_file:
-            data = json.load(help_file)
+        data = load_command_cache(cache_path)
         self.add_exit()
         commands = data.keys()
+        self.param_descript = WrappedDescriptions(line_min)
+        completable = set(self.completable)
+        completable_param = set(self.completable_param)
 
         for command in commands:
             branch = self.command_tree
             for word in command.split():
-                if word not in self.completable:
+                if word not in completable:
+                    completable.add(word)
                     self.completable.append(word)
                 if branch.children is None:
                     branch.children = []
@@ -154,11 +197,10 @@ class GatherCommands(object):
                         param_aliases.add(par)
 
                         self.param_descript[command + " " + par] =  \
-                            add_new_lines(
-                                data[command]['parameters'][param]['required'] +
-                                " " + data[command]['parameters'][param]['help'],
-                                line_min=int(cols) - 2 * TOLERANCE)
-                        if par not in self.completable_param:
+                            data[command]['parameters'][param]['required'] + \
+                            " " + data[command]['parameters'][param]['help']
+                        if par not in completable_param:
+                            completable_param.add(par)
                             self.completable_param.append(par)
                         all_params.append(par)
                     if len(param_aliases) > 1:
@@ -18,9 +18,12 @@ class LoadCommandTableThread(threading.Thread):
         from azclishell._dump_commands import FRESH_TABLE
         from azclishell.az_completer import initialize_command_table_attributes
 
+        changed = True
         try:
-            FRESH_TABLE.dump_command_table()
+            changed = FRESH_TABLE.dump_command_table()
         except KeyboardInterrupt:
             pass
-        self.initialize_function(self.shell)
+        # the cached commands the shell started with are still current otherwise
+        if changed or self.shell.completer is None:
+            self.initialize_function(self.shell)
         initialize_command_table_attributes(self.shell.completer)
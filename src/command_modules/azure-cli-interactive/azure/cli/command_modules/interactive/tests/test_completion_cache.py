@@ -0,0 +1,81 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import unittest
+
+from azclishell.completion_cache import CompletionCache
+
+
+class CompletionCacheTest(unittest.TestCase):
+    """ tests the values of the argument completers are listed in the background """
+
+    def setUp(self):
+        self.ready = threading.Event()
+        self.cache = CompletionCache(on_ready=self.ready.set)
+
+    def test_completion_cache_fetches_in_background(self):
+        release = threading.Event()
+        calls = []
+
+        def _list_groups():
+            calls.append('groups')
+            release.wait(5)
+            return ['group1', 'group2']
+
+        key = ('vm create', 'resource_group_name', 'sub', None)
+        self.assertIsNone(self.cache.get(key, _list_groups))
+        # asking again while the values are listed doesn't list them again
+        self.assertIsNone(self.cache.get(key, _list_groups))
+        release.set()
+        self.assertTrue(self.ready.wait(5))
+
+        self.assertEqual(self.cache.get(key, _list_groups), ['group1', 'group2'])
+        self.assertEqual(calls, ['groups'])
+        self.assertIn(key, self.cache.latencies)
+
+        # values expire
+        self.ready.clear()
+        self.cache.ttl = 0
+        self.assertIsNone(self.cache.get(key, _list_groups))
+        self.assertTrue(self.ready.wait(5))
+        self.assertEqual(calls, ['groups', 'groups'])
+
+    def test_completion_cache_drops_stale_requests(self):
+        release = threading.Event()
+        calls = []
+
+        def _fetch(name):
+            def _list():
+                calls.append(name)
+                release.wait(5)
+                return [name]
+            return _list
+
+        self.cache.get('first', _fetch('first'))
+        self.cache.get('second', _fetch('second'))
+        # only the latest request waiting for the worker is kept
+        self.cache.get('third', _fetch('third'))
+        release.set()
+        self.assertTrue(self.ready.wait(5))
+        self.assertEqual(self.cache.get('third', _fetch('third')), ['third'])
+        self.assertNotIn('second', calls)
+
+        self.ready.clear()
+        self.cache.get('fourth', _fetch('fourth'))
+        self.cache.cancel()
+        self.assertFalse(self.ready.wait(0.2))
+
+    def test_completion_cache_failing_completer(self):
+        def _fail():
+            raise ValueError('Please run az login')
+
+        self.assertIsNone(self.cache.get('key', _fail))
+        self.assertTrue(self.ready.wait(5))
+        self.assertEqual(self.cache.get('key', _fail), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+import azclishell._dump_commands as dump
+
+
+def _command(description):
+    command = mock.MagicMock(description=description, arguments={})
+    return command
+
+
+class DumpCommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_path)
+        command_table = {
+            'vm create': _command('Create a VM'),
+            'network vnet create': _command('Create a vnet'),
+            'network vnet list': _command('List vnets'),
+        }
+        self.stamps = {'vm': ['2.0.16', '0.3.5', 1.0, []], 'network': ['2.0.16', '0.3.5', 1.0, []]}
+        patches = [
+            mock.patch.object(dump, 'load_command_table', side_effect=lambda names: dict(
+                (cmd, command_table[cmd]) for cmd in command_table if cmd.split()[0] in names)),
+            mock.patch.object(dump, 'get_command_cache_dir', return_value=self.cache_path),
+            mock.patch.object(dump, 'get_cache_stamps', side_effect=lambda: dict(self.stamps)),
+            mock.patch.object(dump, 'add_id_parameters'),
+            mock.patch.object(dump, 'helps', {'network': 'short-summary: Manage networks.'}),
+            mock.patch.dict(dump.command_module_map, {
+                'vm create': 'azure.cli.command_modules.vm.custom',
+                'network vnet create': 'azure.cli.command_modules.network.custom',
+                'network vnet list': 'azure.cli.command_modules.network.custom'})
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _load(self, name):
+        with open(os.path.join(self.cache_path, name + '.json'), 'r') as f:
+            return json.load(f)
+
+    def test_dump_command_table_incremental(self):
+        table = dump.LoadFreshTable()
+        with mock.patch.object(table, 'install_modules') as install_mock:
+            self.assertEqual(sorted(table.dump_command_table()), ['network', 'vm'])
+            self.assertEqual(sorted(install_mock.call_args[0][0]), ['network', 'vm'])
+            self.assertEqual(sorted(dump.load_command_table.call_args[0][0]), ['network', 'vm'])
+            self.assertEqual(sorted(self._load('network')), ['network', 'network vnet create', 'network vnet list'])
+            self.assertEqual(self._load('network')['network']['help'], 'Manage networks.')
+            self.assertEqual(self._load('vm')['vm create']['help'], 'Create a VM')
+
+            # nothing is loaded or regenerated while the modules don't change
+            install_mock.reset_mock()
+            dump.load_command_table.reset_mock()
+            self.assertEqual(table.dump_command_table(), [])
+            self.assertFalse(install_mock.called)
+            self.assertFalse(dump.load_command_table.called)
+
+            self.stamps['vm'] = ['2.0.16', '0.3.5', 2.0, []]
+            self.assertEqual(table.dump_command_table(), ['vm'])
+            install_mock.assert_called_once_with(['vm'])
+            dump.load_command_table.assert_called_once_with(['vm'])
+            self.assertEqual(sorted(self._load('network')), ['network', 'network vnet create', 'network vnet list'])
+
+            del self.stamps['network']
+            self.assertEqual(table.dump_command_table(), [])
+            self.assertFalse(os.path.exists(os.path.join(self.cache_path, 'network.json')))
+            self.assertEqual(list(dump.load_cache_index()), ['vm'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,20 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import json
+import os
+import shutil
+import tempfile
 import unittest
+
+import mock
+
 from azclishell.gather_commands import add_new_lines as nl
+from azclishell.gather_commands import GatherCommands, WrappedDescriptions, load_command_cache
+
+
+def _params(*names):
+    return dict((name, {'name': [name], 'required': '', 'help': 'The ' + name}) for name in names)
 
 
 class GatherTest(unittest.TestCase):
@@ -55,6 +67,41 @@ class GatherTest(unittest.TestCase):
             nl(phrase3, 1, tolerance=6)
         )
 
+    def test_wrapped_descriptions(self):
+        descriptions = WrappedDescriptions(line_min=5)
+        descriptions['vm --name'] = 'Hello World'
+        self.assertTrue('vm --name' in descriptions)
+        self.assertEqual(descriptions['vm --name'], 'Hello \nWorld\n')
+        self.assertEqual(descriptions.get('vm --name'), 'Hello \nWorld\n')
+        self.assertIsNone(descriptions.get('vm --size'))
+
+    def test_gather_from_module_caches(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        cache_path = os.path.join(config_dir, 'cache', 'commands')
+        os.makedirs(cache_path)
+        modules = {
+            'vm': {'vm': {'help': 'Manage VMs', 'parameters': {}},
+                   'vm create': {'help': 'Create a VM', 'parameters': _params('--name', '--size')}},
+            'network': {'network vnet create': {'help': 'Create a vnet', 'parameters': _params('--name')}}
+        }
+        for module, data in modules.items():
+            with open(os.path.join(cache_path, module + '.json'), 'w') as f:
+                json.dump(data, f)
+        with open(os.path.join(cache_path, 'index.json'), 'w') as f:
+            json.dump({'vm': [], 'network': [], 'removed': []}, f)
+
+        self.assertEqual(sorted(load_command_cache(cache_path)), ['network vnet create', 'vm', 'vm create'])
+        with mock.patch('azclishell.configuration.get_config_dir', return_value=config_dir), \
+                mock.patch('azclishell.gather_commands._get_window_columns', return_value=80):
+            commands = GatherCommands()
+        self.assertEqual(sorted(commands.completable), ['create', 'exit', 'network', 'quit', 'vm', 'vnet'])
+        self.assertEqual(sorted(commands.completable_param), ['--name', '--size'])
+        self.assertEqual(commands.param_descript['vm create --size'], ' The --size\n')
+
+        with self.assertRaises(IOError):
+            load_command_cache(os.path.join(config_dir, 'missing'))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -10,9 +10,9 @@ from azure.cli.core.commands import (command_table,
                                      command_module_map,
                                      CliCommand,
                                      LongRunningOperation,
-                                     get_op_handler)
-from azure.cli.core.commands._introspection import \
-    (extract_full_summary_from_signature, extract_args_from_signature)
+                                     get_op_handler,
+                                     extract_cached_args_from_signature)
+from azure.cli.core.commands._introspection import extract_full_summary_from_signature
 
 from azure.cli.core.util import CLIError
 
@@ -100,7 +100,7 @@ def _create_key_vault_command(module_name, name, operation, transform_result, ta
     name = ' '.join(name.split())
 
     def arguments_loader():
-        return extract_args_from_signature(get_op_handler(operation))
+        return extract_cached_args_from_signature(operation)
 
     def description_loader():
         return extract_full_summary_from_signature(get_op_handler(operation))
@@ -0,0 +1,225 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Adds and removes many DNS records, reading and writing every record set they belong to once, with
+several record sets at a time.
+"""
+
+from collections import OrderedDict
+import csv
+import json
+import re
+import sys
+
+import azure.cli.core.azlogging as azlogging
+from azure.cli.core.util import CLIError
+
+from azure.cli.command_modules.network._dns_sync import (
+    call_with_retry, run_concurrently, DEFAULT_MAX_WORKERS, MAX_ATTEMPTS)
+from azure.cli.command_modules.network._dns_util import type_to_property_name
+
+logger = azlogging.get_az_logger(__name__)
+
+ACTION_ADD = 'add'
+ACTION_REMOVE = 'remove'
+
+STATUS_SUCCEEDED = 'Succeeded'
+STATUS_UNCHANGED = 'Unchanged'
+STATUS_FAILED = 'Failed'
+
+# the fields of the records of each type, named like the arguments of 'az network dns record-set'
+RECORD_FIELDS = {
+    'a': ['ipv4_address'],
+    'aaaa': ['ipv6_address'],
+    'cname': ['cname'],
+    'mx': ['preference', 'exchange'],
+    'ns': ['nsdname'],
+    'ptr': ['ptrdname'],
+    'srv': ['priority', 'weight', 'port', 'target'],
+    'txt': ['value']
+}
+_INT_FIELDS = ['preference', 'priority', 'weight', 'port']
+
+# the fields of a change by their name without case or separators, so they can also be named like in
+# the output of the commands or in a CSV header, like 'ipv4Address', 'IPv4Address' or 'TTL'
+_FIELD_NAMES = dict((f.replace('_', ''), f) for f in
+                    ['action', 'name', 'type', 'ttl'] + [f for fields in RECORD_FIELDS.values() for f in fields])
+
+
+def _parse_changes(text):
+    text = text.strip()
+    if not text:
+        return []
+    if text[0] in '[{':
+        try:
+            changes = json.loads(text)
+        except ValueError as ex:
+            raise CLIError('Unable to parse the record changes: {}'.format(ex))
+        return [changes] if isinstance(changes, dict) else changes
+    # CSV with a header row naming the fields
+    return [dict((k, v) for k, v in row.items() if k and v not in (None, ''))
+            for row in csv.DictReader(text.splitlines())]
+
+
+def _get_field_name(key):
+    return _FIELD_NAMES.get(re.sub('[_ -]', '', str(key)).lower(), key)
+
+
+def _validate_change(index, change):
+    if not isinstance(change, dict):
+        raise CLIError('Record change {}: expected an object with the fields of the change'.format(index))
+    change = dict((_get_field_name(k), v) for k, v in change.items())
+    action = str(change.get('action', ACTION_ADD)).lower()
+    record_type = str(change.get('type', '')).rsplit('/', 1)[-1].lower()
+    name = change.get('name')
+    if action not in (ACTION_ADD, ACTION_REMOVE):
+        raise CLIError("Record change {}: action must be '{}' or '{}'".format(index, ACTION_ADD, ACTION_REMOVE))
+    if record_type not in RECORD_FIELDS:
+        raise CLIError('Record change {}: type must be one of {}'.format(index, ', '.join(sorted(RECORD_FIELDS))))
+    if not name:
+        raise CLIError('Record change {}: name is required'.format(index))
+
+    record = {}
+    for field in RECORD_FIELDS[record_type]:
+        value = change.get(field)
+        if value is None:
+            raise CLIError('Record change {}: {} records need the field {}'.format(index, record_type, field))
+        try:
+            record[field] = int(value) if field in _INT_FIELDS else value
+        except ValueError:
+            raise CLIError("Record change {}: {} must be a number, not '{}'".format(index, field, value))
+    try:
+        ttl = int(change['ttl']) if change.get('ttl') is not None else None
+    except ValueError:
+        raise CLIError("Record change {}: ttl must be a number, not '{}'".format(index, change['ttl']))
+    return {'action': action, 'name': name, 'type': record_type, 'ttl': ttl, 'record': record}
+
+
+def load_record_changes(source):
+    """
+    Reads the record changes from a file, or from stdin for '-'. The changes are a JSON list, or CSV
+    with a header row, of the action ('add' or 'remove'), name, type, optional ttl and the fields of
+    the record.
+    """
+    from azure.cli.core.util import read_file_content
+    text = sys.stdin.read() if source == '-' else read_file_content(source)
+    changes = [_validate_change(i + 1, c) for i, c in enumerate(_parse_changes(text))]
+    if not changes:
+        raise CLIError('No record changes found in {}'.format('stdin' if source == '-' else source))
+    return changes
+
+
+def group_record_changes(changes):
+    """ Groups the changes in order by their record set, as (name, type) to the changes. """
+    groups = OrderedDict()
+    for change in changes:
+        groups.setdefault((change['name'].lower(), change['type']), []).append(change)
+    return groups
+
+
+def _get_records(record_set, record_type):
+    records = getattr(record_set, type_to_property_name(record_type), None) if record_set else None
+    if records is None:
+        return []
+    return list(records) if isinstance(records, list) else [records]
+
+
+def _apply_changes_to_records(records, changes, build_record):
+    """ Returns the records with the changes applied, records added twice or removed but missing are ignored. """
+    from azure.cli.core.util import todict
+    records = list(records)
+    for change in changes:
+        record = build_record(change['type'], change['record'])
+        matches = [r for r in records if todict(r) == todict(record)]
+        if change['action'] == ACTION_ADD:
+            if change['type'] == 'cname':
+                records = [record]
+            elif not matches:
+                records.append(record)
+        elif matches:
+            records.remove(matches[0])
+        else:
+            logger.warning("Record to remove not found in the %s record set '%s': %s", change['type'],
+                           change['name'], change['record'])
+    return records
+
+
+def _apply_record_set_changes(client, resource_group_name, zone_name, changes, build_record, new_record_set,
+                              keep_empty_record_set):
+    from msrestazure.azure_exceptions import CloudError
+    from azure.cli.core.util import todict
+    name, record_type = changes[0]['name'], changes[0]['type']
+    ttl = next((c['ttl'] for c in reversed(changes) if c['ttl'] is not None), None)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            record_set = call_with_retry(client.record_sets.get, resource_group_name, zone_name, name, record_type)
+        except CloudError as ex:
+            if ex.status_code != 404:
+                raise
+            record_set = None
+
+        current = _get_records(record_set, record_type)
+        records = _apply_changes_to_records(current, changes, build_record)
+        if record_set is None and not records:
+            return STATUS_UNCHANGED
+        if todict(records) == todict(current) and (ttl is None or record_set is None or ttl == record_set.ttl):
+            return STATUS_UNCHANGED
+
+        try:
+            if not records and record_set is not None and not keep_empty_record_set:
+                call_with_retry(client.record_sets.delete, resource_group_name, zone_name, name, record_type,
+                                if_match=record_set.etag)
+                return STATUS_SUCCEEDED
+            if record_set is None:
+                record_set = new_record_set(ttl or 3600)
+            elif ttl is not None:
+                record_set.ttl = ttl
+            setattr(record_set, type_to_property_name(record_type),
+                    records if record_type != 'cname' else (records[0] if records else None))
+            # the record set is written only if it didn't change since it was read, otherwise read it again
+            if record_set.etag:
+                call_with_retry(client.record_sets.create_or_update, resource_group_name, zone_name, name,
+                                record_type, record_set, if_match=record_set.etag)
+            else:
+                call_with_retry(client.record_sets.create_or_update, resource_group_name, zone_name, name,
+                                record_type, record_set, if_none_match='*')
+            return STATUS_SUCCEEDED
+        except CloudError as ex:
+            if ex.status_code != 412 or attempt == MAX_ATTEMPTS:
+                raise
+            logger.debug("The %s record set '%s' changed while it was updated, attempt %d of %d",
+                         record_type, name, attempt + 1, MAX_ATTEMPTS)
+
+
+def apply_record_changes(client, resource_group_name, zone_name, changes, build_record, new_record_set,
+                         keep_empty_record_set=False, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Applies the changes with one read and one write of every record set they belong to, up to max_workers
+    record sets at a time. build_record(type, fields) makes a record and new_record_set(ttl) a record set.
+    Returns the report of every record set in the order of the changes.
+    """
+    groups = group_record_changes(changes)
+
+    def _apply(key):
+        return _apply_record_set_changes(client, resource_group_name, zone_name, groups[key], build_record,
+                                         new_record_set, keep_empty_record_set)
+
+    reports = {}
+    for key, status, error in run_concurrently(_apply, list(groups), max_workers):
+        changes = groups[key]
+        report = {'name': changes[0]['name'], 'type': key[1],
+                  'added': len([c for c in changes if c['action'] == ACTION_ADD]),
+                  'removed': len([c for c in changes if c['action'] == ACTION_REMOVE]),
+                  'status': STATUS_FAILED if error else status, 'error': str(error) if error else None}
+        if error:
+            logger.warning("Failed to change the %s record set '%s': %s", key[1], report['name'], error)
+        reports[key] = report
+
+    failed = len([r for r in reports.values() if r['status'] == STATUS_FAILED])
+    if failed:
+        logger.error('%d of %d record sets were not changed', failed, len(groups))
+    return [reports[key] for key in groups]
@@ -0,0 +1,114 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Writes the record sets of a DNS zone to a zone file as they are listed, so the zone is never held in memory.
+"""
+
+import os
+import sys
+
+import azure.cli.core.azlogging as azlogging
+from azure.cli.core.util import CLIError
+
+from azure.cli.command_modules.network._dns_util import get_record_set_type, type_to_property_name
+from azure.cli.command_modules.network.zone_file.make_zone_file import write_zone_file_header, write_records
+
+logger = azlogging.get_az_logger(__name__)
+
+
+# pylint: disable=too-many-return-statements
+def _get_zone_file_record(record, record_type, ttl):
+    if record_type == 'aaaa':
+        return {'ttl': ttl, 'ip': record.ipv6_address}
+    elif record_type == 'a':
+        return {'ttl': ttl, 'ip': record.ipv4_address}
+    elif record_type == 'cname':
+        return {'ttl': ttl, 'alias': record.cname}
+    elif record_type == 'mx':
+        return {'ttl': ttl, 'preference': record.preference, 'host': record.exchange}
+    elif record_type == 'ns':
+        return {'ttl': ttl, 'host': record.nsdname}
+    elif record_type == 'ptr':
+        return {'ttl': ttl, 'host': record.ptrdname}
+    elif record_type == 'soa':
+        return {
+            'ttl': ttl,
+            'mname': record.host.rstrip('.') + '.',
+            'rname': record.email.rstrip('.') + '.',
+            'serial': record.serial_number, 'refresh': record.refresh_time,
+            'retry': record.retry_time, 'expire': record.expire_time,
+            'minimum': record.minimum_ttl
+        }
+    elif record_type == 'srv':
+        return {'ttl': ttl, 'priority': record.priority, 'weight': record.weight,
+                'port': record.port, 'target': record.target}
+    elif record_type == 'txt':
+        return {'ttl': ttl, 'txt': ' '.join(record.value)}
+    return {'ttl': ttl}
+
+
+def get_zone_file_records(record_set):
+    """ Returns the records of a record set as the dictionaries the zone file record processors take. """
+    record_type = get_record_set_type(record_set)
+    record_data = getattr(record_set, type_to_property_name(record_type), None)
+    if not record_data:
+        return []
+    if not isinstance(record_data, list):
+        record_data = [record_data]
+    return [_get_zone_file_record(r, record_type, record_set.ttl) for r in record_data]
+
+
+def get_split_file_name(file_name, record_type):
+    """ Returns the name of the zone file of a record type, like 'zone.a.txt' for 'zone.txt'. """
+    root, ext = os.path.splitext(file_name)
+    return '{}.{}{}'.format(root, record_type, ext)
+
+
+def export_zone_file(soa_record_set, record_sets, header, file_name=None, split_by_type=False):
+    """
+    Writes the SOA record set and the record sets, as they are listed, to the zone file or to stdout. When
+    split by type, the record sets of each type go to a zone file of their own, which also holds the SOA record
+    so it can be imported on its own. Returns the names of the files written.
+    """
+    if split_by_type and not file_name:
+        raise CLIError('usage error: --split-by-type requires --file-name')
+
+    soa_records = get_zone_file_records(soa_record_set)
+    zone_files = {}
+
+    def _get_zone_file(record_type):
+        key = record_type if split_by_type else None
+        zone_file = zone_files.get(key)
+        if zone_file is None:
+            if file_name:
+                zone_file = open(get_split_file_name(file_name, record_type) if split_by_type else file_name, 'w')
+            else:
+                zone_file = sys.stdout
+            zone_files[key] = zone_file
+            write_zone_file_header(zone_file, ttl=soa_records[0]['minimum'], **header)
+            write_records(zone_file, '@', 'soa', soa_records)
+        return zone_file
+
+    try:
+        if not split_by_type:
+            _get_zone_file('soa')
+        for record_set in record_sets:
+            record_type = get_record_set_type(record_set)
+            records = get_zone_file_records(record_set)
+            # the SOA record is written first, and empty record sets are left out
+            if record_type != 'soa' and records:
+                write_records(_get_zone_file(record_type), record_set.name, record_type, records)
+        if not zone_files:
+            _get_zone_file('soa')
+    finally:
+        for zone_file in zone_files.values():
+            if zone_file is not sys.stdout:
+                zone_file.close()
+
+    written = sorted(f.name for f in zone_files.values() if f is not sys.stdout)
+    for name in written:
+        logger.info("Exported zone file '%s'", name)
+    return written
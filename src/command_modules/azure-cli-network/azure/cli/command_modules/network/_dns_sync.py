@@ -0,0 +1,150 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Brings the record sets of a DNS zone in line with those of a zone file, changing only the record sets
+which differ, with several requests at a time.
+"""
+
+from __future__ import print_function
+
+from collections import OrderedDict
+import json
+import sys
+import time
+
+import azure.cli.core.azlogging as azlogging
+
+from azure.cli.command_modules.network._dns_util import type_to_property_name, get_record_set_type
+
+logger = azlogging.get_az_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 10
+
+# attempts of a request the service throttles, waiting as long as it asks for or twice as long as before
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 1
+
+CHANGE_CREATE = 'Created'
+CHANGE_UPDATE = 'Updated'
+CHANGE_DELETE = 'Deleted'
+
+# the record sets at the apex of a zone which the service creates with it
+_ZONE_RECORD_SETS = [('@', 'soa'), ('@', 'ns')]
+
+
+def get_record_count(record_set):
+    records = getattr(record_set, type_to_property_name(get_record_set_type(record_set)), None)
+    return len(records) if isinstance(records, list) else 1
+
+
+def _get_key(record_set):
+    return record_set.name.lower(), get_record_set_type(record_set)
+
+
+def _get_records(record_set):
+    from azure.cli.core.util import todict
+    records = todict(getattr(record_set, type_to_property_name(get_record_set_type(record_set)), None))
+    if isinstance(records, list):
+        # the order of the records of a record set doesn't matter
+        records = sorted(records, key=lambda r: json.dumps(r, sort_keys=True))
+    return records
+
+
+def get_record_set_changes(record_sets, existing_record_sets, prune=False):
+    """
+    Compares the record sets of a zone file with the record sets of the zone. Returns the changes, as
+    (change, record set) tuples, and the number of record sets which are already up to date. Record
+    sets which are only in the zone are deleted when prune is set.
+    """
+    existing = OrderedDict((_get_key(r), r) for r in existing_record_sets)
+    changes = []
+    unchanged = 0
+    for record_set in record_sets:
+        key = _get_key(record_set)
+        current = existing.pop(key, None)
+        if current is None:
+            changes.append((CHANGE_CREATE, record_set))
+            continue
+
+        if key == ('@', 'soa'):
+            # the host of the SOA record is assigned by the service
+            record_set.soa_record.host = current.soa_record.host
+        elif key == ('@', 'ns'):
+            # so are the name servers of the zone, only their TTL is imported
+            record_set.ns_records = current.ns_records
+
+        if record_set.ttl == current.ttl and _get_records(record_set) == _get_records(current):
+            unchanged += 1
+        else:
+            record_set.metadata = current.metadata
+            record_set.etag = current.etag
+            changes.append((CHANGE_UPDATE, record_set))
+
+    if prune:
+        changes.extend((CHANGE_DELETE, r) for key, r in existing.items() if key not in _ZONE_RECORD_SETS)
+    return changes, unchanged
+
+
+def call_with_retry(operation, *args, **kwargs):
+    """ Calls the operation, calling it again when the service throttles the request. """
+    from msrestazure.azure_exceptions import CloudError
+    from azure.cli.core.util import get_retry_after
+    delay = RETRY_DELAY
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return operation(*args, **kwargs)
+        except CloudError as ex:
+            if getattr(ex, 'status_code', None) != 429 or attempt == MAX_ATTEMPTS:
+                raise
+            retry_after = get_retry_after(getattr(ex, 'response', None))
+            wait = max(retry_after or 0, delay)
+            logger.debug('Request throttled, attempt %d of %d in %d seconds', attempt + 1, MAX_ATTEMPTS, wait)
+            time.sleep(wait)
+            delay *= 2
+
+
+def run_concurrently(action, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Runs action(item) with up to max_workers at a time. Yields every item with its result and its error, if any,
+    once done.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = dict((executor.submit(action, item), item) for item in items)
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], None if error else future.result(), error
+
+
+def apply_record_set_changes(client, resource_group_name, zone_name, changes, max_workers=DEFAULT_MAX_WORKERS):
+    """ Applies the changes to the zone, printing the progress. Returns the number of changes which failed. """
+    def _apply(change):
+        change_type, record_set = change
+        record_type = get_record_set_type(record_set)
+        if change_type == CHANGE_DELETE:
+            call_with_retry(client.record_sets.delete, resource_group_name, zone_name, record_set.name,
+                            record_type, if_match=record_set.etag)
+        elif change_type == CHANGE_UPDATE:
+            # fails rather than overwriting a record set which changed since the zone was listed
+            call_with_retry(client.record_sets.create_or_update, resource_group_name, zone_name,
+                            record_set.name, record_type, record_set, if_match=record_set.etag)
+        else:
+            call_with_retry(client.record_sets.create_or_update, resource_group_name, zone_name,
+                            record_set.name, record_type, record_set, if_none_match='*')
+
+    done = 0
+    failed = 0
+    for (change_type, record_set), _, error in run_concurrently(_apply, changes, max_workers):
+        if error:
+            failed += 1
+            logger.error("Unable to apply the change to the record set of type '%s' and name '%s': %s",
+                         get_record_set_type(record_set), record_set.name, error)
+            continue
+        done += 1
+        print("({}/{}) {} {} records of type '{}' and name '{}'"
+              .format(done, len(changes), change_type, get_record_count(record_set),
+                      get_record_set_type(record_set), record_set.name), file=sys.stderr)
+    return failed
@@ -0,0 +1,26 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+
+def type_to_property_name(key):
+    """ Returns the name of the property of a record set holding the records of the type, like 'arecords'. """
+    type_dict = {
+        'a': 'arecords',
+        'aaaa': 'aaaa_records',
+        'cname': 'cname_record',
+        'mx': 'mx_records',
+        'ns': 'ns_records',
+        'ptr': 'ptr_records',
+        'soa': 'soa_record',
+        'spf': 'txt_records',
+        'srv': 'srv_records',
+        'txt': 'txt_records',
+    }
+    return type_dict[key.lower()]
+
+
+def get_record_set_type(record_set):
+    """ Returns the type of a record set without its namespace, like 'a' for 'Microsoft.Network/dnszones/A'. """
+    return record_set.type.rsplit('/', 1)[-1].lower()
@@ -572,6 +572,28 @@ helps['network dns record-set'] = """
     short-summary: Manage DNS records and record sets.
 """
 
+helps['network dns record-set change-batch'] = """
+    type: command
+    short-summary: Add and remove many DNS records at once.
+    long-summary: >
+        The changes are read from a JSON list, or CSV with a header row, of objects with the action
+        (add or remove, add by default), the name and type of the record set, an optional TTL and the
+        fields of the record, named like the arguments of the add-record commands, for example
+        ipv4_address or preference and exchange. Field names are not case sensitive and may leave out
+        the underscores, like IPv4Address or TTL. Every record set is read and written once, and the
+        write fails if the record set changed since it was read, in which case it is read again. Record
+        sets are changed concurrently, and a record set that cannot be changed does not stop the others.
+        The command reports the status of every record set.
+    examples:
+        - name: Add and remove A records listed in a JSON file.
+          text: >
+            az network dns record-set change-batch -g MyResourceGroup -z www.mysite.com --changes changes.json
+        - name: Add records listed in CSV read from stdin.
+          text: >
+            printf "name,type,ipv4_address\\nwww,a,10.0.0.4\\n" |
+            az network dns record-set change-batch -g MyResourceGroup -z www.mysite.com --changes -
+"""
+
 # endregion
 
 # region DNS records
@@ -686,15 +708,29 @@ helps['network dns zone delete'] = """
 helps['network dns zone export'] = """
     type: command
     short-summary: Export a DNS zone as a DNS zone file.
+    long-summary: The record sets are written as they are listed, so large zones are exported without holding them in memory.
+    examples:
+        - name: Export a DNS zone to a local zone file.
+          text: >
+            az network dns zone export -g MyResourceGroup -n MyZone -f /path/to/zone/file
+        - name: Export a DNS zone to a zone file for each record type.
+          text: >
+            az network dns zone export -g MyResourceGroup -n MyZone -f /path/to/zone/file --split-by-type
 """
 
 helps['network dns zone import'] = """
     type: command
     short-summary: Create a DNS zone using a DNS zone file.
+    long-summary: >
+        When the zone exists, only the record sets which differ from those in the zone file are
+        created or updated, so importing an unchanged zone file doesn't change the zone.
     examples:
         - name: Import a local zone file into a DNS zone resource.
           text: >
             az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file
+        - name: Make a DNS zone match a zone file, deleting the record sets which aren't in the file.
+          text: >
+            az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file --prune
 """
 
 helps['network dns zone list'] = """
@@ -725,12 +725,18 @@ register_cli_argument('network dns zone', 'zone_name', name_arg_type)
 register_cli_argument('network dns zone', 'location', ignore_type)
 
 register_cli_argument('network dns zone import', 'file_name', options_list=('--file-name', '-f'), type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to import')
-register_cli_argument('network dns zone export', 'file_name', options_list=('--file-name', '-f'), type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to save')
+register_cli_argument('network dns zone import', 'prune', action='store_true', help='Delete the record sets of the zone which are not in the zone file. The SOA and NS record sets at the apex of the zone are kept.')
+register_cli_argument('network dns zone import', 'max_workers', type=int, help='The maximum number of record sets changed at the same time. Default: 10.')
+register_cli_argument('network dns zone export', 'file_name', options_list=('--file-name', '-f'), type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to save. Default: the zone file is written to stdout.')
+register_cli_argument('network dns zone export', 'split_by_type', action='store_true', help='Save the record sets of each type to a zone file of their own, named like the file given with the type added, for example zone.a.txt for zone.txt. Each file also has the SOA record.')
 register_cli_argument('network dns zone update', 'if_none_match', ignore_type)
 
 for item in ['record_type', 'record_set_type']:
     register_cli_argument('network dns record-set', item, ignore_type, validator=validate_dns_record_type)
 
+register_cli_argument('network dns record-set change-batch', 'changes', options_list=('--changes',), help='Path to a JSON or CSV file with the records to add or remove, or \'-\' to read them from stdin. Every change has an action (add or remove), the name and type of the record set, an optional TTL and the fields of the record, named like the arguments of the add-record commands.')
+register_cli_argument('network dns record-set change-batch', 'keep_empty_record_set', action='store_true', help='Keep the record sets whose last record is removed.')
+register_cli_argument('network dns record-set change-batch', 'max_workers', type=int, help='The maximum number of record sets changed at the same time. Default: 10.')
 register_cli_argument('network dns record-set create', 'ttl', help='Record set TTL (time-to-live)')
 register_cli_argument('network dns record-set create', 'if_none_match', help='Create the record set only if it does not already exist.', action='store_true')
 
@@ -18,6 +18,7 @@ from azure.cli.core.commands.validators import DefaultStr
 from azure.cli.core.util import CLIError
 from azure.cli.command_modules.network._client_factory import _network_client_factory
 from azure.cli.command_modules.network._util import _get_property, _set_param
+from azure.cli.command_modules.network._dns_util import type_to_property_name
 
 from azure.mgmt.dns import DnsManagementClient
 from azure.mgmt.dns.operations import RecordSetsOperations
@@ -25,7 +26,6 @@ from azure.mgmt.dns.models import (RecordSet, AaaaRecord, ARecord, CnameRecord,
                                    NsRecord, PtrRecord, SoaRecord, SrvRecord, TxtRecord, Zone)
 
 from azure.cli.command_modules.network.zone_file.parse_zone_file import parse_zone_file
-from azure.cli.command_modules.network.zone_file.make_zone_file import make_zone_file
 from azure.cli.core.profiles import get_sdk, supported_api_version, ResourceType
 
 logger = azlogging.get_az_logger(__name__)
@@ -2624,87 +2624,21 @@ def update_dns_record_set(instance, metadata=None):
     return instance
 
 
-def _type_to_property_name(key):
-    type_dict = {
-        'a': 'arecords',
-        'aaaa': 'aaaa_records',
-        'cname': 'cname_record',
-        'mx': 'mx_records',
-        'ns': 'ns_records',
-        'ptr': 'ptr_records',
-        'soa': 'soa_record',
-        'spf': 'txt_records',
-        'srv': 'srv_records',
-        'txt': 'txt_records',
-    }
-    return type_dict[key.lower()]
-
-
-def export_zone(resource_group_name, zone_name):
+def export_zone(resource_group_name, zone_name, file_name=None, split_by_type=False):
     from time import localtime, strftime
+    from azure.cli.command_modules.network._dns_export import export_zone_file
 
     client = get_mgmt_service_client(DnsManagementClient)
-    record_sets = client.record_sets.list_by_dns_zone(resource_group_name, zone_name)
-
-    zone_obj = OrderedDict({
-        '$origin': zone_name.rstrip('.') + '.',
-        'resource-group': resource_group_name,
-        'zone-name': zone_name.rstrip('.'),
+    header = {
+        'origin': zone_name.rstrip('.') + '.',
+        'resource_group': resource_group_name,
+        'zone_name': zone_name.rstrip('.'),
         'datetime': strftime('%a, %d %b %Y %X %z', localtime())
-    })
-
-    for record_set in record_sets:
-        record_type = record_set.type.rsplit('/', 1)[1].lower()
-        record_set_name = record_set.name
-        record_data = getattr(record_set, _type_to_property_name(record_type), None)
-
-        # ignore empty record sets
-        if not record_data:
-            continue
-
-        if not isinstance(record_data, list):
-            record_data = [record_data]
-
-        if record_set_name not in zone_obj:
-            zone_obj[record_set_name] = OrderedDict()
-
-        for record in record_data:
-
-            record_obj = {'ttl': record_set.ttl}
-
-            if record_type not in zone_obj[record_set_name]:
-                zone_obj[record_set_name][record_type] = []
-
-            if record_type == 'aaaa':
-                record_obj.update({'ip': record.ipv6_address})
-            elif record_type == 'a':
-                record_obj.update({'ip': record.ipv4_address})
-            elif record_type == 'cname':
-                record_obj.update({'alias': record.cname})
-            elif record_type == 'mx':
-                record_obj.update({'preference': record.preference, 'host': record.exchange})
-            elif record_type == 'ns':
-                record_obj.update({'host': record.nsdname})
-            elif record_type == 'ptr':
-                record_obj.update({'host': record.ptrdname})
-            elif record_type == 'soa':
-                record_obj.update({
-                    'mname': record.host.rstrip('.') + '.',
-                    'rname': record.email.rstrip('.') + '.',
-                    'serial': record.serial_number, 'refresh': record.refresh_time,
-                    'retry': record.retry_time, 'expire': record.expire_time,
-                    'minimum': record.minimum_ttl
-                })
-                zone_obj['$ttl'] = record.minimum_ttl
-            elif record_type == 'srv':
-                record_obj.update({'priority': record.priority, 'weight': record.weight,
-                                   'port': record.port, 'target': record.target})
-            elif record_type == 'txt':
-                record_obj.update({'txt': ' '.join(record.value)})
-
-            zone_obj[record_set_name][record_type].append(record_obj)
-
-    print(make_zone_file(zone_obj))
+    }
+    # the SOA record gives the default TTL at the top of the file, the other record sets are written page by page
+    soa_record_set = client.record_sets.get(resource_group_name, zone_name, '@', 'SOA')
+    record_sets = client.record_sets.list_by_dns_zone(resource_group_name, zone_name)
+    export_zone_file(soa_record_set, record_sets, header, file_name, split_by_type)
 
 
 # pylint: disable=too-many-return-statements
@@ -2736,15 +2670,16 @@ def _build_record(data):
                        .format(record_type, data['name'], ke))
 
 
-# pylint: disable=too-many-statements
-def import_zone(resource_group_name, zone_name, file_name):
+def import_zone(resource_group_name, zone_name, file_name, prune=False, max_workers=None):
     from azure.cli.core.util import read_file_content
+    from azure.cli.command_modules.network._dns_sync import (
+        get_record_set_changes, apply_record_set_changes, DEFAULT_MAX_WORKERS)
     import sys
     file_text = read_file_content(file_name)
     zone_obj = parse_zone_file(file_text, zone_name)
 
     origin = zone_name
-    record_sets = {}
+    record_sets = OrderedDict()
     for record_set_name in zone_obj:
         for record_set_type in zone_obj[record_set_name]:
             record_set_obj = zone_obj[record_set_name][record_set_type]
@@ -2772,7 +2707,9 @@ def import_zone(resource_group_name, zone_name, file_name):
                             'imported at this time. Skipping...', relative_record_set_name)
                         continue
 
-                    if record_set_type != 'soa' and relative_record_set_name != origin:
+                    if relative_record_set_name == origin:
+                        relative_record_set_name = '@'
+                    else:
                         relative_record_set_name = record_set_name[:-(len(origin) + 2)]
 
                     record_set = RecordSet(
@@ -2781,47 +2718,25 @@ def import_zone(resource_group_name, zone_name, file_name):
                 _add_record(record_set, record, record_set_type,
                             is_list=record_set_type.lower() not in ['soa', 'cname'])
 
-    total_records = 0
-    for rs in record_sets.values():
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs.type)))
-        except TypeError:
-            record_count = 1
-        total_records += record_count
-    cum_records = 0
-
     client = get_mgmt_service_client(DnsManagementClient)
-    print('== BEGINNING ZONE IMPORT: {} ==\n'.format(zone_name), file=sys.stderr)
-    client.zones.create_or_update(resource_group_name, zone_name, Zone('global'))
-    for rs in record_sets.values():
+    try:
+        client.zones.get(resource_group_name, zone_name)
+    except CloudError as ex:
+        if ex.status_code != 404:
+            raise
+        client.zones.create_or_update(resource_group_name, zone_name, Zone('global'))
 
-        rs.type = rs.type.lower()
-        rs.name = '@' if rs.name == origin else rs.name
+    # only the record sets which differ from those of the zone are written
+    existing_record_sets = client.record_sets.list_by_dns_zone(resource_group_name, zone_name)
+    changes, unchanged = get_record_set_changes(record_sets.values(), existing_record_sets, prune)
 
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs.type)))
-        except TypeError:
-            record_count = 1
-        if rs.name == '@' and rs.type == 'soa':
-            root_soa = client.record_sets.get(resource_group_name, zone_name, '@', 'SOA')
-            rs.soa_record.host = root_soa.soa_record.host
-            rs.name = '@'
-        elif rs.name == '@' and rs.type == 'ns':
-            root_ns = client.record_sets.get(resource_group_name, zone_name, '@', 'NS')
-            root_ns.ttl = rs.ttl
-            rs = root_ns
-            rs.type = rs.type.rsplit('/', 1)[1]
-        try:
-            client.record_sets.create_or_update(
-                resource_group_name, zone_name, rs.name, rs.type, rs)
-            cum_records += record_count
-            print("({}/{}) Imported {} records of type '{}' and name '{}'"
-                  .format(cum_records, total_records, record_count, rs.type, rs.name),
-                  file=sys.stderr)
-        except CloudError as ex:
-            logger.error(ex)
-    print("\n== {}/{} RECORDS IMPORTED SUCCESSFULLY: '{}' =="
-          .format(cum_records, total_records, zone_name), file=sys.stderr)
+    print('== BEGINNING ZONE IMPORT: {} ==\n'.format(zone_name), file=sys.stderr)
+    failed = apply_record_set_changes(client, resource_group_name, zone_name, changes,
+                                      max_workers or DEFAULT_MAX_WORKERS)
+    print("\n== {}/{} RECORD SET CHANGES APPLIED, {} RECORD SETS UNCHANGED: '{}' =="
+          .format(len(changes) - failed, len(changes), unchanged, zone_name), file=sys.stderr)
+    if failed:
+        raise CLIError('{} of {} record set changes failed.'.format(failed, len(changes)))
 
 
 def add_dns_aaaa_record(resource_group_name, zone_name, record_set_name, ipv6_address):
@@ -2891,9 +2806,8 @@ def add_dns_srv_record(resource_group_name, zone_name, record_set_name, priority
     return _add_save_record(record, record_type, record_set_name, resource_group_name, zone_name)
 
 
-def add_dns_txt_record(resource_group_name, zone_name, record_set_name, value):
+def _build_txt_record(value):
     record = TxtRecord(value=value)
-    record_type = 'txt'
     long_text = ''.join(x for x in record.value)
     long_text = long_text.replace('\\', '')
     original_len = len(long_text)
@@ -2905,6 +2819,12 @@ def add_dns_txt_record(resource_group_name, zone_name, record_set_name, value):
     final_str = ''.join(record.value)
     final_len = len(final_str)
     assert original_len == final_len
+    return record
+
+
+def add_dns_txt_record(resource_group_name, zone_name, record_set_name, value):
+    record = _build_txt_record(value)
+    record_type = 'txt'
     return _add_save_record(record, record_type, record_set_name, resource_group_name, zone_name)
 
 
@@ -2972,8 +2892,40 @@ def remove_dns_txt_record(resource_group_name, zone_name, record_set_name, value
                           keep_empty_record_set=keep_empty_record_set)
 
 
+def _build_dns_record(record_type, fields):  # pylint: disable=too-many-return-statements
+    if record_type == 'aaaa':
+        return AaaaRecord(ipv6_address=fields['ipv6_address'])
+    elif record_type == 'a':
+        return ARecord(ipv4_address=fields['ipv4_address'])
+    elif record_type == 'cname':
+        return CnameRecord(cname=fields['cname'])
+    elif record_type == 'mx':
+        return MxRecord(preference=fields['preference'], exchange=fields['exchange'])
+    elif record_type == 'ns':
+        return NsRecord(nsdname=fields['nsdname'])
+    elif record_type == 'ptr':
+        return PtrRecord(ptrdname=fields['ptrdname'])
+    elif record_type == 'srv':
+        return SrvRecord(priority=fields['priority'], weight=fields['weight'], port=fields['port'],
+                         target=fields['target'])
+    elif record_type == 'txt':
+        value = fields['value']
+        return _build_txt_record(value if isinstance(value, list) else [value])
+    raise CLIError('Unsupported record type {}'.format(record_type))
+
+
+def change_dns_record_batch(resource_group_name, zone_name, changes, keep_empty_record_set=False,
+                            max_workers=None):
+    from azure.cli.command_modules.network._dns_batch import (
+        load_record_changes, apply_record_changes, DEFAULT_MAX_WORKERS)
+    client = get_mgmt_service_client(DnsManagementClient)
+    return apply_record_changes(client, resource_group_name, zone_name, load_record_changes(changes),
+                                _build_dns_record, lambda ttl: RecordSet(ttl=ttl), keep_empty_record_set,
+                                max_workers or DEFAULT_MAX_WORKERS)
+
+
 def _add_record(record_set, record, record_type, is_list=False):
-    record_property = _type_to_property_name(record_type)
+    record_property = type_to_property_name(record_type)
 
     if is_list:
         record_list = getattr(record_set, record_property)
@@ -3003,7 +2955,7 @@ def _remove_record(record, record_type, record_set_name, resource_group_name, zo
                    keep_empty_record_set, is_list=True):
     ncf = get_mgmt_service_client(DnsManagementClient).record_sets
     record_set = ncf.get(resource_group_name, zone_name, record_set_name, record_type)
-    record_property = _type_to_property_name(record_type)
+    record_property = type_to_property_name(record_type)
 
     if is_list:
         record_list = getattr(record_set, record_property)
@@ -0,0 +1,25 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import mock
+from msrestazure.azure_exceptions import CloudError
+
+ZONE_TYPE = 'Microsoft.Network/dnszones/'
+
+
+class Model(object):  # pylint: disable=too-few-public-methods
+    """ Stands in for the models of the DNS SDK. """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def record_set(name, record_type, ttl, etag=None, **records):
+    return Model(name=name, type=record_type, ttl=ttl, etag=etag, metadata=None, **records)
+
+
+def cloud_error(status_code, retry_after=None):
+    response = mock.MagicMock(status_code=status_code, headers={'Retry-After': retry_after} if retry_after else {})
+    return CloudError(response, error='error {}'.format(status_code))
@@ -0,0 +1,212 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import mock
+from six import StringIO
+
+from azure.cli.core.util import CLIError
+from azure.cli.command_modules.network._dns_batch import (
+    load_record_changes, group_record_changes, apply_record_changes, STATUS_SUCCEEDED, STATUS_UNCHANGED,
+    STATUS_FAILED)
+from azure.cli.command_modules.network.tests.dns_test_util import Model, cloud_error
+
+
+def _build_record(record_type, fields):
+    return Model(**fields) if record_type != 'txt' else Model(value=[fields['value']])
+
+
+def _new_record_set(ttl):
+    return Model(ttl=ttl, etag=None, arecords=None, cname_record=None)
+
+
+def _change(action, name, record_type, ttl=None, **record):
+    return {'action': action, 'name': name, 'type': record_type, 'ttl': ttl, 'record': record}
+
+
+class TestDnsBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def _write(self, text):
+        file_name = os.path.join(self.temp_dir, 'changes')
+        with open(file_name, 'w') as f:
+            f.write(text)
+        return file_name
+
+    def test_dns_batch_load_changes(self):
+        changes = [
+            {'name': 'www', 'type': 'A', 'ipv4Address': '10.0.0.4', 'ttl': 300},
+            {'action': 'Remove', 'name': 'mail', 'type': 'Microsoft.Network/dnszones/MX', 'preference': '10',
+             'exchange': 'mx.contoso.com'}
+        ]
+        expected = [_change('add', 'www', 'a', 300, ipv4_address='10.0.0.4'),
+                    _change('remove', 'mail', 'mx', preference=10, exchange='mx.contoso.com')]
+        self.assertEqual(load_record_changes(self._write(json.dumps(changes))), expected)
+
+        csv_text = 'action,name,type,ttl,ipv4_address,preference,exchange\n' \
+                   'add,www,a,300,10.0.0.4,,\n' \
+                   'remove,mail,mx,,,10,mx.contoso.com\n'
+        self.assertEqual(load_record_changes(self._write(csv_text)), expected)
+
+        with mock.patch('sys.stdin', StringIO(json.dumps(changes[0]))):
+            self.assertEqual(load_record_changes('-'), expected[:1])
+
+    def test_dns_batch_load_changes_field_names(self):
+        expected = [_change('add', 'www', 'a', 300, ipv4_address='10.0.0.4'),
+                    _change('add', 'www', 'aaaa', 60, ipv6_address='::1'),
+                    _change('add', 'srv', 'srv', priority=1, weight=2, port=80, target='t.contoso.com')]
+        csv_text = 'Name,Type,TTL,IPv4Address,IPv6Address,Priority,Weight,Port,Target\n' \
+                   'www,A,300,10.0.0.4,,,,,\n' \
+                   'www,AAAA,60,,::1,,,,\n' \
+                   'srv,SRV,,,,1,2,80,t.contoso.com\n'
+        self.assertEqual(load_record_changes(self._write(csv_text)), expected)
+
+        changes = [{'Name': 'www', 'Type': 'A', 'TTL': 300, 'IPV4_ADDRESS': '10.0.0.4'},
+                   {'name': 'www', 'type': 'AAAA', 'Ttl': 60, 'ipv6Address': '::1'},
+                   {'name': 'srv', 'type': 'SRV', 'priority': 1, 'weight': 2, 'port': 80, 'target': 't.contoso.com'}]
+        self.assertEqual(load_record_changes(self._write(json.dumps(changes))), expected)
+
+    def test_dns_batch_load_invalid_changes(self):
+        for changes, message in [
+                ([{'name': 'www', 'type': 'soa'}], 'Record change 1: type must be one of a, aaaa'),
+                ([{'name': 'www', 'type': 'a', 'ipv4_address': '10.0.0.4'}, {'action': 'update'}],
+                 "Record change 2: action must be 'add' or 'remove'"),
+                ([{'type': 'a', 'ipv4_address': '10.0.0.4'}], 'Record change 1: name is required'),
+                ([{'name': 'mail', 'type': 'mx', 'exchange': 'mx.contoso.com'}],
+                 'Record change 1: mx records need the field preference'),
+                ([{'name': 'srv', 'type': 'srv', 'priority': 'high', 'weight': 1, 'port': 80, 'target': 't'}],
+                 "Record change 1: priority must be a number, not 'high'"),
+                ([], 'No record changes found')]:
+            with self.assertRaisesRegexp(CLIError, message):
+                load_record_changes(self._write(json.dumps(changes)))
+        with self.assertRaisesRegexp(CLIError, 'Unable to parse the record changes'):
+            load_record_changes(self._write('[{"name": '))
+
+    def test_dns_batch_group_changes(self):
+        changes = [_change('add', 'www', 'a', ipv4_address='10.0.0.4'),
+                   _change('add', 'mail', 'mx', preference=10, exchange='mx.contoso.com'),
+                   _change('remove', 'WWW', 'a', ipv4_address='10.0.0.5'),
+                   _change('add', 'www', 'aaaa', ipv6_address='::1')]
+        groups = group_record_changes(changes)
+        self.assertEqual(list(groups), [('www', 'a'), ('mail', 'mx'), ('www', 'aaaa')])
+        self.assertEqual(groups[('www', 'a')], [changes[0], changes[2]])
+
+    def test_dns_batch_apply_changes(self):
+        lock = threading.Lock()
+        state = {'conflict': True}
+        record_sets = {
+            'www': Model(ttl=3600, etag='1', arecords=[Model(ipv4_address='10.0.0.1')]),
+            'old': Model(ttl=3600, etag='2', arecords=[Model(ipv4_address='10.0.0.2')]),
+            'same': Model(ttl=3600, etag='3', arecords=[Model(ipv4_address='10.0.0.3')]),
+            'busy': Model(ttl=3600, etag='4', arecords=[]),
+        }
+
+        def _get(resource_group_name, zone_name, name, record_type):  # pylint: disable=unused-argument
+            if name not in record_sets:
+                raise cloud_error(404)
+            return copy.deepcopy(record_sets[name])
+
+        def _create_or_update(resource_group_name, zone_name, name, *args, **kwargs):  # pylint: disable=unused-argument
+            with lock:
+                # another client changes the record set between the first read and write
+                if name == 'www' and state['conflict']:
+                    state['conflict'] = False
+                    raise cloud_error(412)
+            if name == 'busy':
+                raise cloud_error(412)
+
+        client = mock.MagicMock()
+        client.record_sets.get.side_effect = _get
+        client.record_sets.create_or_update.side_effect = _create_or_update
+        changes = [_change('add', 'www', 'a', 300, ipv4_address='10.0.0.4'),
+                   _change('remove', 'old', 'a', ipv4_address='10.0.0.2'),
+                   _change('add', 'www', 'a', ipv4_address='10.0.0.5'),
+                   _change('remove', 'www', 'a', ipv4_address='10.0.0.1'),
+                   _change('add', 'same', 'a', ipv4_address='10.0.0.3'),
+                   _change('add', 'new', 'cname', cname='contoso.com'),
+                   _change('add', 'busy', 'a', ipv4_address='10.0.0.6')]
+        reports = apply_record_changes(client, 'rg', 'example.com', changes, _build_record, _new_record_set,
+                                       max_workers=3)
+
+        self.assertEqual([(r['name'], r['added'], r['removed'], r['status']) for r in reports],
+                         [('www', 2, 1, STATUS_SUCCEEDED), ('old', 0, 1, STATUS_SUCCEEDED),
+                          ('same', 1, 0, STATUS_UNCHANGED), ('new', 1, 0, STATUS_SUCCEEDED),
+                          ('busy', 1, 0, STATUS_FAILED)])
+        self.assertIsNotNone(reports[4]['error'])
+
+        # the record set is read again when it changed since it was read, and written once per attempt
+        self.assertEqual(len([c for c in client.record_sets.get.call_args_list if c[0][2] == 'www']), 2)
+        www = [c for c in client.record_sets.create_or_update.call_args_list if c[0][2] == 'www'][-1]
+        self.assertEqual((www[0][4].ttl, [r.ipv4_address for r in www[0][4].arecords], www[1]),
+                         (300, ['10.0.0.4', '10.0.0.5'], {'if_match': '1'}))
+        self.assertEqual(len([c for c in client.record_sets.create_or_update.call_args_list if c[0][2] == 'busy']), 5)
+
+        # the record sets which become empty are deleted, and new ones are only created if they don't exist
+        client.record_sets.delete.assert_called_once_with('rg', 'example.com', 'old', 'a', if_match='2')
+        new = [c for c in client.record_sets.create_or_update.call_args_list if c[0][2] == 'new'][0]
+        self.assertEqual((new[0][4].ttl, new[0][4].cname_record.cname, new[1]), (3600, 'contoso.com',
+                                                                                 {'if_none_match': '*'}))
+
+    def test_dns_batch_keep_empty_record_set(self):
+        record_set = Model(ttl=3600, etag='1', arecords=[Model(ipv4_address='10.0.0.1')])
+        client = mock.MagicMock()
+        client.record_sets.get.return_value = record_set
+        changes = [_change('remove', 'www', 'a', ipv4_address='10.0.0.1')]
+        reports = apply_record_changes(client, 'rg', 'example.com', changes, _build_record, _new_record_set,
+                                       keep_empty_record_set=True)
+        self.assertEqual(reports[0]['status'], STATUS_SUCCEEDED)
+        self.assertFalse(client.record_sets.delete.called)
+        client.record_sets.create_or_update.assert_called_once_with('rg', 'example.com', 'www', 'a', record_set,
+                                                                    if_match='1')
+        self.assertEqual(record_set.arecords, [])
+
+    def test_dns_batch_apply_changes_with_sdk_records(self):
+        from azure.mgmt.dns.models import RecordSet, ARecord, MxRecord, TxtRecord
+        from azure.cli.command_modules.network.custom import _build_dns_record
+
+        record_set = RecordSet(ttl=3600, arecords=[ARecord(ipv4_address='10.0.0.1')])
+        record_set.etag = '1'
+
+        def _get(resource_group_name, zone_name, name, record_type):  # pylint: disable=unused-argument
+            if name != 'www':
+                raise cloud_error(404)
+            return copy.deepcopy(record_set)
+
+        client = mock.MagicMock()
+        client.record_sets.get.side_effect = _get
+        long_text = 'a' * 300
+        changes = load_record_changes(self._write(
+            'Action,Name,Type,TTL,IPv4Address,Preference,Exchange,Value\n'
+            'Add,www,A,,10.0.0.2,,,\n'
+            'Remove,www,A,,10.0.0.1,,,\n'
+            'Add,mail,MX,300,,10,mx.contoso.com,\n'
+            'Add,txt,TXT,,,,,{}\n'.format(long_text)))
+        reports = apply_record_changes(client, 'rg', 'example.com', changes, _build_dns_record,
+                                       lambda ttl: RecordSet(ttl=ttl))
+        self.assertEqual([r['status'] for r in reports], [STATUS_SUCCEEDED] * 3)
+
+        written = dict((c[0][2], c[0][4]) for c in client.record_sets.create_or_update.call_args_list)
+        self.assertEqual([(type(r), r.ipv4_address) for r in written['www'].arecords], [(ARecord, '10.0.0.2')])
+        self.assertEqual(written['www'].ttl, 3600)
+        self.assertEqual([(type(r), r.preference, r.exchange) for r in written['mail'].mx_records],
+                         [(MxRecord, 10, 'mx.contoso.com')])
+        self.assertEqual(written['mail'].ttl, 300)
+        # long text values are split into strings of at most 255 characters
+        self.assertEqual([(type(r), r.value) for r in written['txt'].txt_records],
+                         [(TxtRecord, [long_text[:255], long_text[255:]])])
+
+
+if __name__ == '__main__':
+    unittest.main()
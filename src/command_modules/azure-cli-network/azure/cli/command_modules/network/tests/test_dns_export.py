@@ -0,0 +1,74 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from six import StringIO
+
+from azure.cli.core.util import CLIError
+from azure.cli.command_modules.network._dns_export import export_zone_file
+from azure.cli.command_modules.network.zone_file import parse_zone_file
+from azure.cli.command_modules.network.tests.dns_test_util import Model, ZONE_TYPE, record_set
+
+HEADER = {'origin': 'example.com.', 'resource_group': 'rg', 'zone_name': 'example.com',
+          'datetime': 'Mon, 18 Sep 2017 10:00:00 +0000'}
+
+SOA = record_set('@', ZONE_TYPE + 'SOA', 3600, soa_record=Model(
+    host='ns1-01.azure-dns.com.', email='azuredns-hostmaster.microsoft.com', serial_number=1,
+    refresh_time=3600, retry_time=300, expire_time=2419200, minimum_ttl=300))
+
+
+def _list_record_sets(count):
+    yield SOA
+    yield record_set('@', ZONE_TYPE + 'NS', 172800, ns_records=[Model(nsdname='ns1-01.azure-dns.com.')])
+    for i in range(count):
+        yield record_set('www{}'.format(i), ZONE_TYPE + 'A', 3600,
+                         arecords=[Model(ipv4_address='10.0.0.{}'.format(i)), Model(ipv4_address='10.0.1.{}'.format(i))])
+        yield record_set('mail{}'.format(i), ZONE_TYPE + 'MX', 300,
+                         mx_records=[Model(preference=10, exchange='mx.contoso.com.')])
+    yield record_set('txt', ZONE_TYPE + 'TXT', 60, txt_records=[Model(value=['v=spf1 -all'])])
+    yield record_set('empty', ZONE_TYPE + 'AAAA', 60, aaaa_records=[])
+
+
+class TestDnsExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_dns_export_stdout(self):
+        with mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            self.assertEqual(export_zone_file(SOA, _list_record_sets(3), HEADER), [])
+        zone = parse_zone_file(stdout.getvalue(), 'example.com')
+
+        self.assertEqual(zone['example.com.']['soa']['email'], 'azuredns-hostmaster.microsoft.com.')
+        self.assertEqual(zone['example.com.']['soa']['minimum'], 300)
+        self.assertEqual([r['ip'] for r in zone['www2.example.com.']['a']], ['10.0.0.2', '10.0.1.2'])
+        self.assertEqual(zone['mail0.example.com.']['mx'][0]['ttl'], 300)
+        self.assertEqual(zone['txt.example.com.']['txt'][0]['txt'], ['v=spf1 -all'])
+        self.assertNotIn('empty.example.com.', zone)
+
+    def test_dns_export_split_by_type(self):
+        file_name = os.path.join(self.temp_dir, 'zone.txt')
+        written = export_zone_file(SOA, _list_record_sets(2), HEADER, file_name, split_by_type=True)
+        self.assertEqual([os.path.basename(f) for f in written],
+                         ['zone.a.txt', 'zone.mx.txt', 'zone.ns.txt', 'zone.txt.txt'])
+
+        # every file can be imported on its own
+        with open(os.path.join(self.temp_dir, 'zone.a.txt')) as f:
+            zone = parse_zone_file(f, 'example.com')
+        self.assertEqual(list(zone), ['example.com.', 'www0.example.com.', 'www1.example.com.'])
+        self.assertEqual(list(zone['example.com.']), ['soa'])
+
+        with self.assertRaisesRegexp(CLIError, '--split-by-type requires --file-name'):
+            export_zone_file(SOA, [], HEADER, split_by_type=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import unittest
+
+import mock
+from msrestazure.azure_exceptions import CloudError
+
+from azure.cli.command_modules.network._dns_sync import (
+    get_record_set_changes, apply_record_set_changes, call_with_retry, CHANGE_CREATE, CHANGE_UPDATE,
+    CHANGE_DELETE)
+from azure.cli.command_modules.network.tests.dns_test_util import Model, ZONE_TYPE, record_set, cloud_error
+
+
+def _a(*ips):
+    return [Model(ipv4_address=ip) for ip in ips]
+
+
+def _fail_for(name, failing_name):
+    if name == failing_name:
+        raise cloud_error(400)
+
+
+class TestDnsSync(unittest.TestCase):
+
+    def _get_existing(self):
+        return [
+            record_set('@', ZONE_TYPE + 'SOA', 3600, etag='1', soa_record=Model(host='ns1-01.azure-dns.com.',
+                                                                                serial_number=1)),
+            record_set('@', ZONE_TYPE + 'NS', 172800, etag='2', ns_records=[Model(nsdname='ns1-01.azure-dns.com.')]),
+            record_set('www', ZONE_TYPE + 'A', 3600, etag='3', arecords=_a('1.2.3.4', '2.3.4.5')),
+            record_set('Mail', ZONE_TYPE + 'A', 3600, etag='4', arecords=_a('3.4.5.6')),
+            record_set('old', ZONE_TYPE + 'A', 3600, etag='5', arecords=_a('4.5.6.7')),
+        ]
+
+    def test_dns_sync_unchanged_zone(self):
+        record_sets = [
+            record_set('@', 'soa', 3600, soa_record=Model(host='ns1.example.com.', serial_number=1)),
+            record_set('@', 'ns', 172800, ns_records=[Model(nsdname='ns1.example.com.')]),
+            record_set('www', 'a', 3600, arecords=_a('2.3.4.5', '1.2.3.4')),
+            record_set('mail', 'a', 3600, arecords=_a('3.4.5.6')),
+        ]
+        changes, unchanged = get_record_set_changes(record_sets, self._get_existing())
+        self.assertEqual(changes, [])
+        self.assertEqual(unchanged, 4)
+
+    def test_dns_sync_changes(self):
+        record_sets = [
+            record_set('@', 'ns', 3600, ns_records=[Model(nsdname='ns1.example.com.')]),
+            record_set('www', 'a', 3600, arecords=_a('1.2.3.4')),
+            record_set('mail', 'a', 300, arecords=_a('3.4.5.6')),
+            record_set('new', 'a', 3600, arecords=_a('5.6.7.8')),
+        ]
+        changes, unchanged = get_record_set_changes(record_sets, self._get_existing())
+        self.assertEqual(unchanged, 0)
+        self.assertEqual([(c, r.name, r.etag) for c, r in changes],
+                         [(CHANGE_UPDATE, '@', '2'), (CHANGE_UPDATE, 'www', '3'), (CHANGE_UPDATE, 'mail', '4'),
+                          (CHANGE_CREATE, 'new', None)])
+        # the name servers of the zone are kept
+        self.assertEqual(changes[0][1].ns_records[0].nsdname, 'ns1-01.azure-dns.com.')
+
+        changes, _ = get_record_set_changes(record_sets, self._get_existing(), prune=True)
+        self.assertEqual([(c, r.name, r.etag) for c, r in changes if c == CHANGE_DELETE], [(CHANGE_DELETE, 'old', '5')])
+
+    def test_dns_sync_apply_changes(self):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0, 'throttled': False}
+        client = mock.MagicMock()
+
+        def _create_or_update(resource_group_name, zone_name, name, *args, **kwargs):  # pylint: disable=unused-argument
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+                throttle = name == 'r3' and not state['throttled']
+                state['throttled'] = state['throttled'] or throttle
+            with lock:
+                state['active'] -= 1
+            if throttle:
+                raise cloud_error(429, '1')
+            if name == 'r5':
+                raise cloud_error(412)
+
+        client.record_sets.create_or_update.side_effect = _create_or_update
+        changes = [(CHANGE_CREATE, record_set('r{}'.format(i), 'a', 3600, arecords=_a('1.2.3.4')))
+                   for i in range(10)]
+        changes.append((CHANGE_DELETE, record_set('old', ZONE_TYPE + 'A', 3600, etag='5', arecords=_a('4.5.6.7'))))
+        with mock.patch('time.sleep') as sleep_mock:
+            failed = apply_record_set_changes(client, 'rg', 'example.com', changes, max_workers=3)
+
+        self.assertEqual(failed, 1)
+        sleep_mock.assert_called_once_with(1)
+        self.assertLessEqual(state['peak'], 3)
+        self.assertEqual(client.record_sets.create_or_update.call_count, 11)
+        client.record_sets.create_or_update.assert_any_call('rg', 'example.com', 'r0', 'a', changes[0][1],
+                                                            if_none_match='*')
+        client.record_sets.delete.assert_called_once_with('rg', 'example.com', 'old', 'a', if_match='5')
+
+    def test_dns_sync_import_zone_fails_when_changes_fail(self):
+        import os
+        import tempfile
+        from azure.cli.core.util import CLIError
+        from azure.cli.command_modules.network.custom import import_zone
+
+        client = mock.MagicMock()
+        client.record_sets.list_by_dns_zone.return_value = []
+        client.record_sets.create_or_update.side_effect = \
+            lambda rg, zone, name, record_type, *args, **kwargs: _fail_for(name, 'www')
+        fd, zone_file = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write('$ORIGIN example.com.\n$TTL 3600\n@ IN SOA ns1.example.com. admin.example.com. 1 3600 600 86400 300\n'
+                    'www IN A 1.2.3.4\nmail IN A 2.3.4.5\n')
+        try:
+            with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client',
+                            return_value=client):
+                with self.assertRaisesRegexp(CLIError, '1 of 3 record set changes failed.'):
+                    import_zone('rg', 'example.com', zone_file)
+        finally:
+            os.remove(zone_file)
+        self.assertEqual(client.record_sets.create_or_update.call_count, 3)
+
+    def test_dns_sync_call_with_retry(self):
+        operation = mock.MagicMock(side_effect=[cloud_error(429)] * 5)
+        with mock.patch('time.sleep') as sleep_mock:
+            with self.assertRaises(CloudError):
+                call_with_retry(operation, 'rg')
+        self.assertEqual([c[0][0] for c in sleep_mock.call_args_list], [1, 2, 4, 8])
+
+        operation = mock.MagicMock(side_effect=[cloud_error(404)])
+        with self.assertRaises(CloudError):
+            call_with_retry(operation, 'rg')
+        self.assertEqual(operation.call_count, 1)
+
+        # the Retry-After delay is honoured, but doesn't retry faster than the backoff
+        operation = mock.MagicMock(side_effect=[cloud_error(429, '0'), cloud_error(429, '5'), 'done'])
+        with mock.patch('time.sleep') as sleep_mock:
+            self.assertEqual(call_with_retry(operation, 'rg'), 'done')
+        self.assertEqual([c[0][0] for c in sleep_mock.call_args_list], [1, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -287,6 +287,50 @@ class TestDnsZoneImport(unittest.TestCase):
         self._check_cname(zone, 'record.' + zn, 3600, 'bar.foo.com.')
         self._check_a(zone, 'test.' + zn, [(3600, '7.8.9.0')])
 
+    def test_zone_file_single_pass(self):
+        zn = 'example.com.'
+        lines = [
+            '$TTL 1h\n',
+            '@ IN SOA ns1 hostmaster (2017 12h 15m 3w 3h)\n',
+            'a 60 A 1.2.3.4 ; the name matches a record type\n',
+            '  IN 30 A 2.3.4.5\n',
+            'ns NS (ns1\n',
+            '       ) ; closed on the next line\n',
+            '$ORIGIN sub.example.com.\n',
+            'txt TXT "a\\"b" c\\;d (e)\n',
+            'srv SRV 1 2 3 target.com.\n'
+        ]
+        # an open file is parsed as it is read
+        zone = parse_zone_file(iter(lines), zn)
+        self._check_soa(zone, zn, 3600, 2017, 43200, 900, 1814400, 10800)
+        self._check_a(zone, 'a.' + zn, [(30, '1.2.3.4'), (30, '2.3.4.5')])
+        self._check_ns(zone, 'ns.' + zn, [(3600, 'ns1.example.com.')])
+        self._check_txt(zone, 'txt.sub.' + zn, [(3600, None, 'a"bc;de')])
+        self._check_srv(zone, 'srv.sub.' + zn, [(3600, 1, 2, 3, 'target.com.')])
+
+    def test_zone_file_invalid_records(self):
+        from azure.cli.core.util import CLIError
+        zn = 'example.com.'
+        soa = '@ SOA ns1 hostmaster 1 2 3 4 5\n'
+        for text, error in [(soa + 'a A\n', 'expected 1 fields'),
+                            (soa + 'a 10 CH A 1.2.3.4\n', 'unsupported record type or class CH'),
+                            (soa + 'srv SRV one 2 3 target.com.\n', "invalid priority 'one'"),
+                            (soa + '$INCLUDE other.txt\n', 'unsupported directive'),
+                            (soa + 'a A (1.2.3.4\n', 'missing closing parenthesis'),
+                            (soa + 'a A 1.2.3.4)\n', 'unbalanced parentheses'),
+                            (soa + 't TXT "abc\n', 'unterminated quoted string')]:
+            with self.assertRaisesRegexp(CLIError, error):
+                parse_zone_file(text, zn)
+
+        zone = parse_zone_file(soa + 'a A\nb A 1.2.3.4\n', zn, ignore_invalid=True)
+        self.assertNotIn('a.' + zn, zone)
+        self._check_a(zone, 'b.' + zn, [(3600, '1.2.3.4')])
+
+        # an indented record belongs to the name of the previous record, even an invalid one
+        zone = parse_zone_file(soa + 'good A 1.1.1.1\nbad A\n   A 2.2.2.2\n', zn, ignore_invalid=True)
+        self._check_a(zone, 'good.' + zn, [(3600, '1.1.1.1')])
+        self._check_a(zone, 'bad.' + zn, [(3600, '2.2.2.2')])
+
     def test_zone_import_errors(self):
         from azure.cli.core.util import CLIError
         for f in ['fail1', 'fail2', 'fail3', 'fail4', 'fail5']:
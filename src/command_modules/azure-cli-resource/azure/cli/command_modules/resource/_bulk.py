@@ -0,0 +1,164 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Runs an operation on many resources given by id concurrently, deleting children before their parents.
+"""
+
+import json
+import sys
+
+from azure.cli.core.util import CLIError, PartialResultError
+from azure.cli.core.commands.arm import is_valid_resource_id, parse_resource_id
+import azure.cli.core.azlogging as azlogging
+
+logger = azlogging.get_az_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 10
+
+STATUS_SUCCEEDED = 'Succeeded'
+STATUS_FAILED = 'Failed'
+STATUS_SKIPPED = 'Skipped'
+
+
+def _parse_values(value):
+    value = value.strip()
+    if not value:
+        return []
+    if value[0] in '[{':
+        try:
+            items = json.loads(value)
+        except ValueError as ex:
+            raise CLIError('Unable to parse the list of resources: {}'.format(ex))
+        if isinstance(items, dict):
+            items = [items]
+        ids = []
+        for item in items:
+            item_id = item.get('id') if isinstance(item, dict) else item
+            if not item_id:
+                raise CLIError('Unable to parse the list of resources: every resource needs an id')
+            ids.append(item_id)
+        return ids
+    return value.split()
+
+
+def get_resource_ids(values):
+    """
+    Returns the unique resource ids given as ids, JSON lists of ids or of resources with an id (like
+    the output of 'az resource list') from '@file', or '-' to read such a list from stdin.
+    """
+    ids = []
+    seen = set()
+    for value in values:
+        for resource_id in _parse_values(sys.stdin.read() if value == '-' else value):
+            if not is_valid_resource_id(resource_id):
+                raise CLIError('Invalid id "{}", as it has no group or subscription field'.format(resource_id))
+            if resource_id.lower() not in seen:
+                seen.add(resource_id.lower())
+                ids.append(resource_id)
+    if not ids:
+        raise CLIError('No resources were given.')
+    return ids
+
+
+def _get_parent_ids(resource_id):
+    """ Returns the lowercase ids of the resources the resource is nested under, closest first. """
+    parts = resource_id.strip('/').lower().split('/')
+    # the shortest id of a resource is subscriptions/{}/resourceGroups/{}/providers/{}/{type}/{name}
+    while len(parts) > 8:
+        parts = parts[:-2]
+        if parts[-2] != 'providers':
+            yield '/' + '/'.join(parts)
+
+
+def get_delete_waves(ids):
+    """
+    Splits the ids into waves which can each be deleted concurrently: a resource is in a later wave
+    than every resource nested under it.
+    """
+    heights = {}
+    given = set(i.lower() for i in ids)
+    for resource_id in sorted(ids, key=lambda i: i.count('/'), reverse=True):
+        height = heights.setdefault(resource_id.lower(), 0)
+        for parent_id in _get_parent_ids(resource_id):
+            if parent_id in given:
+                heights[parent_id] = max(heights.get(parent_id, 0), height + 1)
+                break
+    waves = [[] for _ in range(max(heights.values()) + 1)] if heights else []
+    for resource_id in ids:
+        waves[heights[resource_id.lower()]].append(resource_id)
+    return waves
+
+
+def _get_api_version_key(resource_id):
+    parts = parse_resource_id(resource_id)
+    return tuple(parts.get(k, '').lower() for k in ('namespace', 'type', 'child_namespace', 'child_type',
+                                                    'grandchild_type'))
+
+
+def resolve_api_versions(ids, resolve):
+    """
+    Resolves the api-version of each resource once per resource type. Returns a dictionary of the ids
+    to their api-version, or to the error resolving it.
+    """
+    resolved = {}
+    api_versions = {}
+    for resource_id in ids:
+        key = _get_api_version_key(resource_id)
+        if key not in resolved:
+            try:
+                resolved[key] = resolve(resource_id)
+            except CLIError as ex:
+                resolved[key] = ex
+        api_versions[resource_id] = resolved[key]
+    return api_versions
+
+
+def run_bulk(action, ids, api_versions, max_workers=DEFAULT_MAX_WORKERS, ordered=False):
+    """
+    Runs action(resource_id, api_version) on every resource, with up to max_workers at a time.
+    When ordered, a resource runs after the resources nested under it, and is skipped when one of
+    them fails. Returns the report of every resource in the order given, or raises a
+    PartialResultError with it when any resource did not succeed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _run(resource_id):
+        api_version = api_versions[resource_id]
+        if isinstance(api_version, Exception):
+            return _report(resource_id, STATUS_FAILED, api_version)
+        try:
+            action(resource_id, api_version)
+            return _report(resource_id, STATUS_SUCCEEDED)
+        except Exception as ex:  # pylint: disable=broad-except
+            return _report(resource_id, STATUS_FAILED, ex)
+
+    reports = {}
+    failed = set()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for wave in get_delete_waves(ids) if ordered else [ids]:
+            runnable = []
+            for resource_id in wave:
+                failed_child = next((i for i in failed if i.startswith(resource_id.lower() + '/')), None)
+                if failed_child:
+                    reports[resource_id] = _report(resource_id, STATUS_SKIPPED,
+                                                   'The nested resource {} failed'.format(failed_child))
+                    failed.add(resource_id.lower())
+                else:
+                    runnable.append(resource_id)
+            for report in executor.map(_run, runnable):
+                reports[report['id']] = report
+                if report['status'] == STATUS_FAILED:
+                    logger.warning("Failed '%s': %s", report['id'], report['error'])
+                    failed.add(report['id'].lower())
+
+    reports = [reports[i] for i in ids]
+    if failed:
+        raise PartialResultError('{} of {} resources did not succeed.'.format(len(failed), len(ids)), reports)
+    return reports
+
+
+def _report(resource_id, status, error=None):
+    return {'id': resource_id, 'status': status, 'error': str(error) if error else None}
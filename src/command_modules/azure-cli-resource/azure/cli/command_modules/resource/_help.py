@@ -223,6 +223,9 @@ helps['resource'] = """
 helps['resource list'] = """
     type: command
     short-summary: List resources.
+    long-summary: >
+        Repeated queries can be answered from a local snapshot of the resources. Enable it by setting the number of seconds a snapshot is used for
+        with `[resource] inventory_ttl` in the configuration file or the AZURE_RESOURCE_INVENTORY_TTL environment variable.
     examples:
         - name: List all resources in the West US region.
           text: >
@@ -239,6 +242,9 @@ helps['resource list'] = """
         - name: List all resources with the tag 'test' that have the value 'example'.
           text: >
             az resource list --tag test=example
+        - name: List the resources in the West US region with the tag 'test'.
+          text: >
+            az resource list --tag test --location westus
 """
 
 helps['resource show'] = """
@@ -289,6 +295,28 @@ helps['resource tag'] = """
             az resource tag --tags vmlist=vm1 --id /subscriptions/{SubID}/resourceGroups/{MyRG}/providers/Microsoft.Web/sites/{MyWebApp}
 """
 
+helps['resource delete-batch'] = """
+    type: command
+    short-summary: Delete many resources concurrently.
+    long-summary: Nested resources are deleted before their parents. A parent is skipped when one of its nested resources could not be deleted.
+    examples:
+        - name: Delete all the resources tagged with 'env=test'.
+          text: >
+            az resource list --tag env=test > resources.json && az resource delete-batch --ids @resources.json
+        - name: Delete the resources listed by another command.
+          text: >
+            az resource list -g MyResourceGroup | az resource delete-batch --ids -
+"""
+
+helps['resource tag-batch'] = """
+    type: command
+    short-summary: Tag many resources concurrently.
+    examples:
+        - name: Tag all the resources of a resource group with the key 'env' and value 'test'.
+          text: >
+            az resource list -g MyResourceGroup | az resource tag-batch --tags env=test --ids -
+"""
+
 helps['resource create'] = """
     type: command
     short-summary: create a resource.
@@ -0,0 +1,109 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Keeps a snapshot of the resources of a subscription on disk, per resource group, so repeated
+queries of 'az resource list' can be answered without listing the resources again.
+"""
+
+import os
+import threading
+import time
+
+from azure.cli.core.commands.arm import parse_resource_id
+import azure.cli.core.azlogging as azlogging
+
+from ._provider_cache import get_cache_scope
+
+logger = azlogging.get_az_logger(__name__)
+
+_INVENTORY_FILE_NAME = 'resourceInventory.json'
+_inventory = None
+_lock = threading.Lock()
+
+
+def _get_inventory():
+    global _inventory  # pylint: disable=global-statement
+    if _inventory is None:
+        from azure.cli.core._environment import get_config_dir
+        from azure.cli.core._session import Session
+        inventory = Session()
+        try:
+            inventory.load(os.path.join(get_config_dir(), _INVENTORY_FILE_NAME))
+        except ValueError:
+            logger.debug('Ignoring the corrupted resource inventory %s', inventory.filename)
+            inventory.data = {}
+        _inventory = inventory
+    return _inventory
+
+
+def _save():
+    try:
+        _get_inventory().save_with_retry()
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to save the resource inventory: %s', ex)
+
+
+def get_inventory_ttl():
+    """ Returns the seconds a snapshot is used for, 0 when the inventory isn't used. """
+    from azure.cli.core._config import az_config
+    try:
+        return max(0, az_config.getint('resource', 'inventory_ttl', fallback=0))
+    except ValueError:
+        return 0
+
+
+def _get_resource_group(resource):
+    return parse_resource_id(resource['id'])['resource_group'].lower()
+
+
+def get_resources(rcf, resource_group_name, ttl):
+    """
+    Returns the resources of the resource group, or of the subscription, as dictionaries from the
+    snapshot, listing only the resource groups whose snapshot is older than ttl seconds again.
+    """
+    from azure.cli.core.util import todict
+    scope = get_cache_scope(rcf)
+    now = time.time()
+    with _lock:
+        snapshot = _get_inventory().get(scope, {}) if scope else {}
+        groups = snapshot.get('groups', {})
+    if resource_group_name:
+        group = groups.get(resource_group_name.lower())
+        if group and now - group['timestamp'] < ttl:
+            return group['resources']
+        resources = [todict(r) for r in rcf.resources.list_by_resource_group(resource_group_name)]
+        groups = {resource_group_name.lower(): {'timestamp': now, 'resources': resources}}
+    else:
+        if snapshot.get('timestamp') and now - snapshot['timestamp'] < ttl:
+            return [r for g in groups.values() for r in g['resources']]
+        resources = [todict(r) for r in rcf.resources.list()]
+        groups = {}
+        for r in resources:
+            groups.setdefault(_get_resource_group(r), {'timestamp': now, 'resources': []})['resources'].append(r)
+
+    if scope:
+        with _lock:
+            snapshot = _get_inventory().data.setdefault(scope, {'timestamp': None, 'groups': {}})
+            if not resource_group_name:
+                snapshot['timestamp'] = now
+                snapshot['groups'] = {}
+            snapshot['groups'].update(groups)
+            _save()
+    return resources
+
+
+def invalidate_resource_groups(rcf, resource_group_names):
+    """ Drops the resource groups from the snapshot, so they are listed again. """
+    scope = get_cache_scope(rcf)
+    with _lock:
+        snapshot = _get_inventory().get(scope) if scope else None
+        if not snapshot:
+            return
+        dropped = [snapshot['groups'].pop(name.lower(), None) for name in resource_group_names]
+        if snapshot['timestamp'] is None and not any(dropped):
+            return
+        snapshot['timestamp'] = None
+        _save()
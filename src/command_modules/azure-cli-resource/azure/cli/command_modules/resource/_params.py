@@ -41,6 +41,9 @@ register_cli_argument('resource', 'tags', tags_type)
 
 register_cli_argument('resource list', 'name', resource_name_type)
 register_cli_argument('resource move', 'ids', nargs='+')
+for command in ['delete-batch', 'tag-batch']:
+    register_cli_argument('resource {}'.format(command), 'ids', nargs='+', options_list=('--ids',), help='One or more resource IDs (space delimited), \'@<file>\' with a JSON list of IDs or of resources such as the output of \'az resource list\', or \'-\' to read that list from stdin.')
+    register_cli_argument('resource {}'.format(command), 'max_workers', type=int, help='The maximum number of resources processed at the same time. Default: 10.')
 
 register_cli_argument('resource create', 'resource_id', options_list=['--id'], help='Resource ID.', action=None)
 register_cli_argument('resource create', 'properties', options_list=('--properties', '-p'),
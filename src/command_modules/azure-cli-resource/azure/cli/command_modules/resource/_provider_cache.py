@@ -0,0 +1,125 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Caches the api-versions of the resource types of resource providers on disk, per cloud and
+subscription, so resolving the api-version of a resource doesn't need a provider lookup each time.
+"""
+
+import os
+import threading
+import time
+
+from six import string_types
+
+import azure.cli.core.azlogging as azlogging
+
+logger = azlogging.get_az_logger(__name__)
+
+# seconds a cached provider is used before it is looked up again
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+# error codes of requests made with an api-version the resource provider doesn't accept (anymore)
+STALE_API_VERSION_ERROR_CODES = ('NoRegisteredProviderFound', 'InvalidApiVersionParameter')
+
+_CACHE_FILE_NAME = 'resourceProviders.json'
+_cache = None
+_lock = threading.Lock()
+
+
+def _get_cache():
+    global _cache  # pylint: disable=global-statement
+    if _cache is None:
+        from azure.cli.core._environment import get_config_dir
+        from azure.cli.core._session import Session
+        cache = Session()
+        try:
+            cache.load(os.path.join(get_config_dir(), _CACHE_FILE_NAME))
+        except ValueError:
+            logger.debug('Ignoring the corrupted resource provider cache %s', cache.filename)
+            cache.data = {}
+        _cache = cache
+    return _cache
+
+
+def _get_cache_ttl():
+    from azure.cli.core._config import az_config
+    try:
+        return az_config.getint('resource', 'api_version_cache_ttl', fallback=DEFAULT_CACHE_TTL)
+    except ValueError:
+        return DEFAULT_CACHE_TTL
+
+
+def get_cache_scope(rcf):
+    """ Returns the key of the cloud and subscription of the client, None if it has no subscription. """
+    subscription_id = getattr(rcf.config, 'subscription_id', None)
+    if not isinstance(subscription_id, string_types):
+        return None
+    from azure.cli.core.cloud import get_active_cloud
+    return '{}|{}'.format(get_active_cloud().name, subscription_id)
+
+
+def _save_cache(cache):
+    try:
+        cache.save_with_retry()
+    except (OSError, IOError) as ex:
+        logger.debug('Unable to save the resource provider cache: %s', ex)
+
+
+def _fetch_api_versions(rcf, namespace, scope):
+    provider = rcf.providers.get(namespace)
+    api_versions = {}
+    for t in provider.resource_types:
+        # a resource type listed more than once can't be resolved, like when it isn't found
+        api_versions[t.resource_type.lower()] = None if t.resource_type.lower() in api_versions \
+            else list(t.api_versions or [])
+
+    if scope:
+        with _lock:
+            cache = _get_cache()
+            cache.data.setdefault(scope, {})[namespace.lower()] = {'timestamp': time.time(),
+                                                                   'apiVersions': api_versions}
+            _save_cache(cache)
+    return api_versions
+
+
+def get_resource_type_api_versions(rcf, namespace, resource_type):
+    """
+    Returns the api-versions of the resource type of the provider namespace, the cached ones if they
+    are recent enough. Raises KeyError if the provider doesn't have the resource type.
+    """
+    scope = get_cache_scope(rcf)
+    ttl = _get_cache_ttl()
+    if scope and ttl > 0:
+        with _lock:
+            entry = _get_cache().get(scope, {}).get(namespace.lower())
+        if entry and time.time() - entry['timestamp'] < ttl and resource_type.lower() in entry['apiVersions']:
+            return entry['apiVersions'][resource_type.lower()]
+    # missing, expired or without the resource type, which may have been added since
+    return _fetch_api_versions(rcf, namespace, scope)[resource_type.lower()]
+
+
+def is_stale_api_version_error(ex):
+    """ Returns whether the error is the service rejecting the api-version of the request. """
+    code = getattr(getattr(ex, 'error', None), 'error', None)
+    return code in STALE_API_VERSION_ERROR_CODES
+
+
+def invalidate_api_versions(rcf, namespace):
+    """
+    Removes the cached api-versions of the provider namespace, so they are looked up again. Returns
+    whether there were any.
+    """
+    scope = get_cache_scope(rcf)
+    if not scope:
+        return False
+    with _lock:
+        cache = _get_cache()
+        if namespace.lower() not in cache.get(scope, {}):
+            return False
+        logger.debug("Removing the cached api-versions of '%s'", namespace)
+        del cache.data[scope][namespace.lower()]
+        _save_cache(cache)
+    return True
@@ -495,6 +495,51 @@ def tag_resource(tags,
     return res.tag(tags)
 
 
+def _run_bulk_resource_operation(ids, operation, max_workers, ordered=False):
+    from msrestazure.azure_operation import AzureOperationPoller
+    from ._bulk import get_resource_ids, resolve_api_versions, run_bulk
+    from ._inventory import invalidate_resource_groups
+    rcf = _resource_client_factory()
+    ids = get_resource_ids(ids)
+    api_versions = resolve_api_versions(
+        ids, lambda i: _ResourceUtils._resolve_api_version_by_id(rcf, i))  # pylint: disable=protected-access
+
+    def _action(resource_id, api_version):
+        res = _ResourceUtils(resource_id=resource_id, api_version=api_version, rcf=rcf, api_version_resolved=True)
+        result = operation(res)
+        if isinstance(result, AzureOperationPoller):
+            result.result()
+
+    try:
+        return run_bulk(_action, ids, api_versions, max_workers, ordered)
+    finally:
+        invalidate_resource_groups(rcf, [parse_resource_id(i)['resource_group'] for i in ids])
+
+
+def delete_resources(ids, max_workers=None):
+    """ Deletes many resources concurrently, deleting nested resources before their parents.
+
+    :param ids: the resource ids, '@file' with a JSON list of ids or resources (like the output of
+    'az resource list'), or '-' to read such a list from stdin
+    :param max_workers: the maximum number of resources deleted at the same time
+    """
+    from ._bulk import DEFAULT_MAX_WORKERS
+    return _run_bulk_resource_operation(ids, lambda res: res.delete(), max_workers or DEFAULT_MAX_WORKERS,
+                                        ordered=True)
+
+
+def tag_resources(ids, tags, max_workers=None):
+    """ Updates the tags of many resources concurrently. To clear tags, specify the --tags option
+    without anything else.
+
+    :param ids: the resource ids, '@file' with a JSON list of ids or resources (like the output of
+    'az resource list'), or '-' to read such a list from stdin
+    :param max_workers: the maximum number of resources tagged at the same time
+    """
+    from ._bulk import DEFAULT_MAX_WORKERS
+    return _run_bulk_resource_operation(ids, lambda res: res.tag(tags), max_workers or DEFAULT_MAX_WORKERS)
+
+
 def get_deployment_operations(client, resource_group_name, deployment_name, operation_ids):
     """get a deployment's operation.
     """
@@ -508,16 +553,73 @@ def get_deployment_operations(client, resource_group_name, deployment_name, oper
 def list_resources(resource_group_name=None,
                    resource_provider_namespace=None, resource_type=None, name=None, tag=None,
                    location=None):
+    from azure.cli.core.commands import stream_result
+    from ._inventory import get_inventory_ttl, get_resources
     rcf = _resource_client_factory()
 
-    if resource_group_name is not None:
-        rcf.resource_groups.get(resource_group_name)
+    inventory_ttl = get_inventory_ttl()
+    if inventory_ttl:
+        # only to validate the resource type
+        _list_resources_odata_filter_builder(None, resource_provider_namespace, resource_type)
+        resources = get_resources(rcf, resource_group_name, inventory_ttl)
+        predicate = _get_list_resources_predicate(resource_provider_namespace, resource_type, name, tag,
+                                                  location)
+    else:
+        odata_filter, predicate = _plan_list_resources(resource_provider_namespace, resource_type, name,
+                                                       tag, location)
+        # listing the resources of a group which doesn't exist fails, like getting the group
+        if resource_group_name:
+            resources = rcf.resources.list_by_resource_group(resource_group_name, filter=odata_filter)
+        else:
+            resources = rcf.resources.list(filter=odata_filter)
+    if predicate:
+        return stream_result(r for r in resources if predicate(r))
+    return resources
+
+
+def _plan_list_resources(resource_provider_namespace=None, resource_type=None, name=None, tag=None,
+                         location=None):
+    """Splits the filters into the OData filter and a predicate for the filters the service
+    can't apply along with the others, None if there are none.
+    """
+    if tag and (name or location):
+        # the tag filter can only be combined with the resource type filter
+        odata_filter = _list_resources_odata_filter_builder(None, resource_provider_namespace,
+                                                            resource_type, tag=tag)
+        return odata_filter, _get_list_resources_predicate(name=name, location=location)
+    return _list_resources_odata_filter_builder(None, resource_provider_namespace, resource_type, name,
+                                                tag, location), None
+
+
+def _get_list_resources_predicate(resource_provider_namespace=None, resource_type=None, name=None,
+                                  tag=None, location=None):
+    """Returns a function telling whether a resource, a model or a dictionary, matches the filters,
+    compared the way the service does.
+    """
+    def _get(resource, key):
+        return resource.get(key) if isinstance(resource, dict) else getattr(resource, key, None)
+
+    def _normalize(value):
+        return (value or '').replace(' ', '').lower()
+
+    if resource_type and resource_provider_namespace:
+        resource_type = '{}/{}'.format(resource_provider_namespace, resource_type)
+    tag_name = list(tag.keys())[0] if isinstance(tag, dict) else tag
+    tag_value = tag[tag_name] if isinstance(tag, dict) else ''
+    tag_name = (tag_name or '').lower()
+
+    def _has_tag(resource):
+        tags = dict((k.lower(), v) for k, v in (_get(resource, 'tags') or {}).items())
+        if tag_name.endswith('*'):
+            return any(k.startswith(tag_name[:-1]) for k in tags)
+        return tag_name in tags and (tag_value == '' or (tags[tag_name] or '').lower() == tag_value.lower())
 
-    odata_filter = _list_resources_odata_filter_builder(resource_group_name,
-                                                        resource_provider_namespace,
-                                                        resource_type, name, tag, location)
-    resources = rcf.resources.list(filter=odata_filter)
-    return list(resources)
+    def _matches(resource):
+        return (not name or _normalize(_get(resource, 'name')) == _normalize(name)) and \
+            (not location or _normalize(_get(resource, 'location')) == _normalize(location)) and \
+            (not resource_type or _normalize(_get(resource, 'type')) == _normalize(resource_type)) and \
+            (not tag_name or _has_tag(resource))
+    return _matches
 
 
 def _list_resources_odata_filter_builder(resource_group_name=None,
@@ -638,6 +740,7 @@ def move_resource(ids, destination_group, destination_subscription_id=None):
     :param destination_subscription_id: the destination subscription identifier
     """
     from azure.cli.core.commands.arm import resource_id
+    from ._inventory import invalidate_resource_groups
 
     # verify all resource ids are valid and under the same group
     resources = []
@@ -653,10 +756,15 @@ def move_resource(ids, destination_group, destination_subscription_id=None):
         raise CLIError('All resources should be under the same group')
 
     rcf = _resource_client_factory()
-    target = resource_id(subscription=(destination_subscription_id or rcf.config.subscription_id),
-                         resource_group=destination_group)
+    destination_subscription_id = destination_subscription_id or rcf.config.subscription_id
+    target = resource_id(subscription=destination_subscription_id, resource_group=destination_group)
 
-    return rcf.resources.move_resources(resources[0]['resource_group'], ids, target)
+    try:
+        return rcf.resources.move_resources(resources[0]['resource_group'], ids, target)
+    finally:
+        # the inventory of another subscription is left to expire
+        invalidate_resource_groups(rcf, [resources[0]['resource_group']] + (
+            [destination_group] if destination_subscription_id.lower() == rcf.config.subscription_id.lower() else []))
 
 
 def list_features(client, resource_provider_namespace=None):
@@ -1212,11 +1320,56 @@ def _validate_resource_inputs(resource_group_name, resource_provider_namespace,
         raise CLIError('--namespace is required')
 
 
+def _refresh_stale_api_version(func):
+    """
+    Removes the cached api-versions of the resource provider when the service rejects the api-version,
+    and calls the operation again once with the api-version looked up again if it was resolved. Several
+    operations may be refreshing the same provider at once, so its versions are looked up again even if
+    another one already removed them from the cache.
+    """
+    from functools import wraps
+
+    @wraps(func)
+    def _wrapper(self, *args, **kwargs):  # pylint: disable=protected-access
+        from msrestazure.azure_exceptions import CloudError
+        from ._provider_cache import is_stale_api_version_error, invalidate_api_versions
+        try:
+            return func(self, *args, **kwargs)
+        except CloudError as ex:
+            if not is_stale_api_version_error(ex):
+                raise
+            invalidate_api_versions(self.rcf, self._get_namespace())
+            if not self._api_version_resolved:
+                raise
+            api_version = self._resolve_api_version()
+            if api_version == self.api_version:
+                raise
+            logger.debug("Retrying with api-version '%s' instead of '%s'", api_version, self.api_version)
+            self.api_version = api_version
+            self._api_version_resolved = False
+            return func(self, *args, **kwargs)
+    return _wrapper
+
+
+def _invalidate_inventory(func):
+    """ Drops the resource group of the resource from the resource inventory once the operation is sent. """
+    from functools import wraps
+
+    @wraps(func)
+    def _wrapper(self, *args, **kwargs):  # pylint: disable=protected-access
+        from ._inventory import invalidate_resource_groups
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            invalidate_resource_groups(self.rcf, [self._get_resource_group()])
+    return _wrapper
+
+
 class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
     def __init__(self,
                  resource_group_name=None, resource_provider_namespace=None,
                  parent_resource_path=None, resource_type=None, resource_name=None,
-                 resource_id=None, api_version=None, rcf=None):
+                 resource_id=None, api_version=None, rcf=None, api_version_resolved=False):
         # if the resouce_type is in format 'namespace/type' split it.
         # (we don't have to do this, but commands like 'vm show' returns such values)
         if resource_type and not resource_provider_namespace and not parent_resource_path:
@@ -1226,25 +1379,40 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                 resource_type = parts[1]
 
         self.rcf = rcf or _resource_client_factory()
-        if api_version is None:
-            if resource_id:
-                api_version = _ResourceUtils._resolve_api_version_by_id(self.rcf, resource_id)
-            else:
-                _validate_resource_inputs(resource_group_name, resource_provider_namespace,
-                                          resource_type, resource_name)
-                api_version = _ResourceUtils.resolve_api_version(self.rcf,
-                                                                 resource_provider_namespace,
-                                                                 parent_resource_path,
-                                                                 resource_type)
-
         self.resource_group_name = resource_group_name
         self.resource_provider_namespace = resource_provider_namespace
         self.parent_resource_path = parent_resource_path
         self.resource_type = resource_type
         self.resource_name = resource_name
         self.resource_id = resource_id
+        # a resolved api-version may come from the provider cache, and is resolved again when rejected
+        self._api_version_resolved = api_version is None or api_version_resolved
+        if api_version is None:
+            if not resource_id:
+                _validate_resource_inputs(resource_group_name, resource_provider_namespace,
+                                          resource_type, resource_name)
+            api_version = self._resolve_api_version()
         self.api_version = api_version
 
+    def _resolve_api_version(self):
+        if self.resource_id:
+            return _ResourceUtils._resolve_api_version_by_id(self.rcf, self.resource_id)
+        return _ResourceUtils.resolve_api_version(self.rcf, self.resource_provider_namespace,
+                                                  self.parent_resource_path, self.resource_type)
+
+    def _get_resource_group(self):
+        if self.resource_id:
+            return parse_resource_id(self.resource_id)['resource_group']
+        return self.resource_group_name
+
+    def _get_namespace(self):
+        if self.resource_id:
+            parts = parse_resource_id(self.resource_id)
+            return parts.get('child_namespace', parts['namespace'])
+        return self.resource_provider_namespace
+
+    @_invalidate_inventory
+    @_refresh_stale_api_version
     def create_resource(self, properties, location, is_full_object):
         res = json.loads(properties)
         if not is_full_object:
@@ -1273,6 +1441,7 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                                                            res)
         return resource
 
+    @_refresh_stale_api_version
     def get_resource(self):
         if self.resource_id:
             resource = self.rcf.resources.get_by_id(self.resource_id, self.api_version)
@@ -1285,6 +1454,8 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                                               self.api_version)
         return resource
 
+    @_invalidate_inventory
+    @_refresh_stale_api_version
     def delete(self):
         if self.resource_id:
             return self.rcf.resources.delete_by_id(self.resource_id, self.api_version)
@@ -1295,6 +1466,8 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                                          self.resource_name,
                                          self.api_version)
 
+    @_invalidate_inventory
+    @_refresh_stale_api_version
     def update(self, parameters):
         if self.resource_id:
             return self.rcf.resources.create_or_update_by_id(self.resource_id,
@@ -1308,6 +1481,8 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                                                    self.api_version,
                                                    parameters)
 
+    @_invalidate_inventory
+    @_refresh_stale_api_version
     def tag(self, tags):
         resource = self.get_resource()
         # pylint: disable=no-member
@@ -1334,20 +1509,21 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
 
     @staticmethod
     def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type):
-        provider = rcf.providers.get(resource_provider_namespace)
+        from azure.cli.command_modules.resource._provider_cache import get_resource_type_api_versions
 
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0]
                              if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
-        if not rt:
+        try:
+            api_versions = get_resource_type_api_versions(rcf, resource_provider_namespace,
+                                                          resource_type_str)
+        except KeyError:
             raise IncorrectUsageError('Resource type {} not found.'
                                       .format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
+        if api_versions:
+            npv = [v for v in api_versions if 'preview' not in v.lower()]
+            return npv[0] if npv else api_versions[0]
         else:
             raise IncorrectUsageError(
                 'API version is required and could not be resolved for resource {}'
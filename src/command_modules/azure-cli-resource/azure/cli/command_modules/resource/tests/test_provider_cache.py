@@ -0,0 +1,150 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+import requests
+from msrestazure.azure_exceptions import CloudError
+
+import azure.cli.command_modules.resource._provider_cache as provider_cache
+from azure.cli.command_modules.resource.custom import _ResourceUtils
+from azure.cli.core.util import CLIError
+
+
+def _get_rcf(subscription_id='00000000-0000-0000-0000-000000000000', api_versions=None):
+    resource_type = mock.MagicMock(resource_type='sites', api_versions=api_versions or ['2016-08-01', '2015-08-01'])
+    rcf = mock.MagicMock()
+    rcf.config.subscription_id = subscription_id
+    rcf.providers.get.return_value = mock.MagicMock(resource_types=[resource_type])
+    return rcf
+
+
+def _cloud_error(code):
+    response = requests.Response()
+    response.status_code = 400
+    response.headers['content-type'] = 'application/json'
+    response._content = json.dumps({'error': {'code': code, 'message': code}}).encode()  # pylint: disable=protected-access
+    return CloudError(response)
+
+
+class TestProviderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        patches = [mock.patch('azure.cli.core._environment.get_config_dir', return_value=self.config_dir),
+                   mock.patch.object(provider_cache, '_cache', None),
+                   mock.patch.object(provider_cache, '_get_cache_ttl', return_value=3600)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_provider_cache_one_lookup_per_namespace(self):
+        rcf = _get_rcf()
+        for _ in range(3):
+            self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'Sites'),
+                             '2016-08-01')
+        rcf.providers.get.assert_called_once_with('Microsoft.Web')
+        self.assertTrue(os.path.isfile(os.path.join(self.config_dir, 'resourceProviders.json')))
+
+        # persisted for the next process, per subscription
+        provider_cache._cache = None  # pylint: disable=protected-access
+        rcf = _get_rcf()
+        _ResourceUtils.resolve_api_version(rcf, 'microsoft.web', None, 'sites')
+        self.assertFalse(rcf.providers.get.called)
+        rcf = _get_rcf('11111111-1111-1111-1111-111111111111')
+        _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites')
+        self.assertTrue(rcf.providers.get.called)
+
+    def test_provider_cache_refresh(self):
+        rcf = _get_rcf()
+        _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites')
+
+        # a resource type which isn't cached is looked up before failing
+        with self.assertRaisesRegexp(CLIError, 'Resource type serverFarms not found.'):
+            _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'serverFarms')
+        self.assertEqual(rcf.providers.get.call_count, 2)
+
+        # expired entries are looked up again
+        with mock.patch.object(provider_cache.time, 'time', return_value=time.time() + 7200):
+            _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites')
+        self.assertEqual(rcf.providers.get.call_count, 3)
+
+        # a ttl of 0 always looks up the provider
+        with mock.patch.object(provider_cache, '_get_cache_ttl', return_value=0):
+            _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites')
+        self.assertEqual(rcf.providers.get.call_count, 4)
+
+    def test_provider_cache_corrupted_file(self):
+        with open(os.path.join(self.config_dir, 'resourceProviders.json'), 'w') as f:
+            f.write('{"not json')
+        rcf = _get_rcf()
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites'),
+                         '2016-08-01')
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites'),
+                         '2016-08-01')
+        rcf.providers.get.assert_called_once_with('Microsoft.Web')
+
+    def test_provider_cache_invalidated_when_api_version_rejected(self):
+        rcf = _get_rcf()
+        _ResourceUtils('rg', 'Microsoft.Web', None, 'sites', 'app', rcf=rcf)
+
+        # the provider dropped the cached api-version since
+        rcf.providers.get.return_value = _get_rcf(api_versions=['2017-01-01']).providers.get.return_value
+        rcf.resources.get.side_effect = [_cloud_error('NoRegisteredProviderFound'), 'app']
+        res = _ResourceUtils('rg', 'Microsoft.Web', None, 'sites', 'app', rcf=rcf)
+        self.assertEqual(res.get_resource(), 'app')
+        self.assertEqual([c[0][5] for c in rcf.resources.get.call_args_list], ['2016-08-01', '2017-01-01'])
+        self.assertEqual(rcf.providers.get.call_count, 2)
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites'), '2017-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 2)
+
+        # a given api-version isn't replaced, but the cached ones are looked up again the next time
+        rcf.resources.get.side_effect = _cloud_error('InvalidApiVersionParameter')
+        res = _ResourceUtils('rg', 'Microsoft.Web', None, 'sites', 'app', api_version='2015-01-01', rcf=rcf)
+        with self.assertRaises(CloudError):
+            res.get_resource()
+        self.assertEqual(rcf.resources.get.call_count, 3)
+        _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites')
+        self.assertEqual(rcf.providers.get.call_count, 3)
+
+        # other errors keep the cache
+        rcf.resources.get.side_effect = _cloud_error('ResourceNotFound')
+        with self.assertRaises(CloudError):
+            _ResourceUtils('rg', 'Microsoft.Web', None, 'sites', 'app', rcf=rcf).get_resource()
+        self.assertEqual(rcf.providers.get.call_count, 3)
+
+    def test_provider_cache_invalidated_for_bulk_operations(self):
+        from azure.cli.command_modules.resource.custom import tag_resources
+        rcf = _get_rcf()
+        resource_ids = ['/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg/providers/'
+                        'Microsoft.Web/sites/app{}'.format(i) for i in range(3)]
+        _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Web', None, 'sites')
+
+        # every resource is retried with the api-version looked up again, even though the first one
+        # to be rejected removed the cached api-versions
+        rcf.providers.get.return_value = _get_rcf(api_versions=['2017-01-01']).providers.get.return_value
+        rcf.resources.get_by_id.side_effect = \
+            lambda resource_id, api_version: _raise(_cloud_error('NoRegisteredProviderFound')) \
+            if api_version == '2016-08-01' else mock.MagicMock()
+        with mock.patch('azure.cli.command_modules.resource.custom._resource_client_factory', return_value=rcf):
+            report = tag_resources(resource_ids, {'a': 'b'}, max_workers=3)
+        self.assertEqual([r['status'] for r in report], ['Succeeded'] * 3)
+        self.assertEqual(sorted(c[0][1] for c in rcf.resources.create_or_update_by_id.call_args_list),
+                         ['2017-01-01'] * 3)
+
+
+def _raise(ex):
+    raise ex
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import threading
+import unittest
+
+import mock
+
+from azure.cli.command_modules.resource._bulk import (get_resource_ids, get_delete_waves, resolve_api_versions,
+                                                      run_bulk)
+from azure.cli.core.util import CLIError, PartialResultError
+
+RG = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg/providers/'
+SERVER = RG + 'Microsoft.Sql/servers/s1'
+DATABASE = SERVER + '/databases/d1'
+DIAGNOSTICS = DATABASE + '/providers/Microsoft.Insights/diagnosticSettings/ds1'
+VNET = RG + 'Microsoft.Network/virtualNetworks/v1'
+SUBNET = VNET + '/subnets/sn1'
+SITE = RG + 'Microsoft.Web/sites/w1'
+
+
+class TestResourceBulk(unittest.TestCase):
+
+    def test_get_resource_ids(self):
+        listed = json.dumps([{'id': SITE, 'name': 'w1'}, {'id': VNET.replace('Network', 'NETWORK'), 'name': 'v1'}])
+        self.assertEqual(get_resource_ids([VNET, listed, json.dumps([SUBNET])]), [VNET, SITE, SUBNET])
+
+        with mock.patch('sys.stdin') as stdin:
+            stdin.read.return_value = '{} {}\n'.format(SITE, VNET)
+            self.assertEqual(get_resource_ids(['-']), [SITE, VNET])
+
+        with self.assertRaisesRegexp(CLIError, 'Invalid id'):
+            get_resource_ids(['w1'])
+        with self.assertRaisesRegexp(CLIError, 'every resource needs an id'):
+            get_resource_ids([json.dumps([{'name': 'w1'}])])
+        with self.assertRaisesRegexp(CLIError, 'No resources'):
+            get_resource_ids(['[]'])
+
+    def test_get_delete_waves(self):
+        self.assertEqual(get_delete_waves([SERVER, SITE, DIAGNOSTICS, VNET, SUBNET, DATABASE]),
+                         [[SITE, DIAGNOSTICS, SUBNET], [VNET, DATABASE], [SERVER]])
+        # the parent of a resource which isn't given doesn't hold it back
+        self.assertEqual(get_delete_waves([SERVER, DIAGNOSTICS]), [[DIAGNOSTICS], [SERVER]])
+        self.assertEqual(get_delete_waves([DATABASE.upper(), SUBNET, SITE]), [[DATABASE.upper(), SUBNET, SITE]])
+
+    def test_resolve_api_versions_once_per_type(self):
+        resolve = mock.MagicMock(side_effect=['2017-01-01', CLIError('Resource type sites not found.')])
+        api_versions = resolve_api_versions([SUBNET, SUBNET.replace('sn1', 'sn2'), SITE], resolve)
+        self.assertEqual(resolve.call_count, 2)
+        self.assertEqual(api_versions[SUBNET.replace('sn1', 'sn2')], '2017-01-01')
+        self.assertIsInstance(api_versions[SITE], CLIError)
+
+    def test_run_bulk_deletes_children_first(self):
+        lock = threading.Lock()
+        deleted = []
+
+        def _delete(resource_id, api_version):  # pylint: disable=unused-argument
+            if resource_id == SUBNET:
+                raise CLIError('InUseSubnetCannotBeDeleted')
+            with lock:
+                deleted.append(resource_id)
+
+        ids = [SERVER, SITE, DIAGNOSTICS, VNET, SUBNET, DATABASE]
+        api_versions = dict((i, '2017-01-01') for i in ids)
+        api_versions[SITE] = CLIError('Resource type sites not found.')
+        with self.assertRaisesRegexp(PartialResultError, '3 of 6 resources did not succeed.') as cm:
+            run_bulk(_delete, ids, api_versions, max_workers=3, ordered=True)
+
+        report = cm.exception.result
+        self.assertEqual([(r['id'], r['status']) for r in report],
+                         [(SERVER, 'Succeeded'), (SITE, 'Failed'), (DIAGNOSTICS, 'Succeeded'),
+                          (VNET, 'Skipped'), (SUBNET, 'Failed'), (DATABASE, 'Succeeded')])
+        self.assertEqual(report[1]['error'], 'Resource type sites not found.')
+        self.assertEqual(deleted.index(SERVER), 2)
+        self.assertLess(deleted.index(DIAGNOSTICS), deleted.index(DATABASE))
+        self.assertNotIn(VNET, deleted)
+
+    def test_run_bulk_bounded_workers(self):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def _tag(resource_id, api_version):  # pylint: disable=unused-argument
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            with lock:
+                state['active'] -= 1
+
+        ids = [SITE.replace('w1', 'w{}'.format(i)) for i in range(20)]
+        report = run_bulk(_tag, ids, dict((i, '2016-08-01') for i in ids), max_workers=4)
+        self.assertEqual([r['status'] for r in report], ['Succeeded'] * 20)
+        self.assertLessEqual(state['peak'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
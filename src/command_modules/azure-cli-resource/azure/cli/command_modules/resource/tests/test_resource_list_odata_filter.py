@@ -3,10 +3,30 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import shutil
+import tempfile
 import unittest
+
+import mock
+
+import azure.cli.command_modules.resource._inventory as inventory
 from azure.cli.command_modules.resource.custom import (_list_resources_odata_filter_builder,
-                                                       _find_missing_parameters)
+                                                       _find_missing_parameters, _plan_list_resources,
+                                                       list_resources, move_resource, tag_resource)
+from azure.cli.core.application import APPLICATION
 from azure.cli.core.parser import IncorrectUsageError
+from azure.cli.core._output import StreamingResult
+
+SUBSCRIPTION = '/subscriptions/00000000-0000-0000-0000-000000000000'
+
+
+def _resource(resource_group, name, location='westus', tags=None):
+    resource_id = '{}/resourceGroups/{}/providers/Microsoft.Web/sites/{}'.format(SUBSCRIPTION, resource_group, name)
+    resource = mock.MagicMock(id=resource_id, type='Microsoft.Web/sites', location=location, tags=tags,
+                              _asdict=lambda: {'id': resource_id, 'name': name, 'type': 'Microsoft.Web/sites',
+                                               'location': location, 'tags': tags})
+    resource.name = name
+    return resource
 
 
 class TestDeployResource(unittest.TestCase):
@@ -72,6 +92,62 @@ class TestListResources(unittest.TestCase):
         with self.assertRaises(IncorrectUsageError):
             _list_resources_odata_filter_builder(tag='foo=bar', name='should not work')
 
+    def test_plan_pushes_down_supported_filters(self):
+        self.assertEqual(_plan_list_resources(name='wonky', location='dory'),
+                         ("name eq 'wonky' and location eq 'dory'", None))
+
+        odata_filter, predicate = _plan_list_resources('Microsoft.Web', 'sites', name='Wonky', tag={'foo': 'bar'},
+                                                       location='West US')
+        self.assertEqual(odata_filter, "resourceType eq 'Microsoft.Web/sites' and tagname eq 'foo' and tagvalue eq 'bar'")
+        self.assertTrue(predicate({'name': 'wonky', 'location': 'westus'}))
+        self.assertFalse(predicate({'name': 'wonky', 'location': 'eastus'}))
+        self.assertFalse(predicate(mock.MagicMock(location='westus')))
+
+    @mock.patch('azure.cli.command_modules.resource.custom._resource_client_factory')
+    def test_list_resources_client_side_filters_stream(self, client_factory):
+        rcf = client_factory.return_value
+        rcf.resources.list_by_resource_group.return_value = iter([_resource('rg', 'a'), _resource('rg', 'b')])
+        with mock.patch.dict(APPLICATION.session, {'stream_output': True}):
+            result = list_resources('rg', name='b', tag='foo')
+
+        self.assertFalse(rcf.resource_groups.get.called)
+        rcf.resources.list_by_resource_group.assert_called_once_with('rg', filter="tagname eq 'foo'")
+        self.assertIsInstance(result, StreamingResult)
+        self.assertEqual([r.name for r in result], ['b'])
+
+    @mock.patch('azure.cli.command_modules.resource.custom._resource_client_factory')
+    def test_list_resources_from_inventory(self, client_factory):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        rcf = client_factory.return_value
+        rcf.config.subscription_id = SUBSCRIPTION.split('/')[-1]
+        rcf.resources.list.return_value = [_resource('rg1', 'a', tags={'env': 'test'}), _resource('rg2', 'b')]
+        rcf.resources.list_by_resource_group.return_value = [_resource('rg1', 'c', tags={'Env': 'Test'})]
+
+        with mock.patch('azure.cli.core._environment.get_config_dir', return_value=config_dir), \
+                mock.patch.object(inventory, '_inventory', None), \
+                mock.patch.object(inventory, 'get_inventory_ttl', return_value=3600):
+            self.assertEqual([r['name'] for r in list_resources(tag={'env': 'test'})], ['a'])
+            self.assertEqual([r['name'] for r in list_resources(resource_group_name='rg2')], ['b'])
+            self.assertEqual(rcf.resources.list.call_count, 1)
+            self.assertFalse(rcf.resources.list_by_resource_group.called)
+
+            # only the changed resource group is listed again
+            tag_resource({'env': 'test'}, resource_id=rcf.resources.list.return_value[0].id, api_version='2016-08-01')
+            self.assertEqual([r['name'] for r in list_resources(resource_group_name='rg1', tag='env')], ['c'])
+            self.assertEqual([r['name'] for r in list_resources(resource_group_name='rg2')], ['b'])
+            rcf.resources.list_by_resource_group.assert_called_once_with('rg1')
+            self.assertEqual(rcf.resources.list.call_count, 1)
+            self.assertEqual(sorted(r['name'] for r in list_resources()), ['a', 'b'])
+            self.assertEqual(rcf.resources.list.call_count, 2)
+
+            # both the source and destination groups of moved resources are listed again
+            move_resource([rcf.resources.list.return_value[1].id], 'rg1')
+            list_resources(resource_group_name='rg1')
+            list_resources(resource_group_name='rg2')
+            self.assertEqual([c[0][0] for c in rcf.resources.list_by_resource_group.call_args_list],
+                             ['rg1', 'rg1', 'rg2'])
+
 
 if __name__ == '__main__':
     unittest.main()
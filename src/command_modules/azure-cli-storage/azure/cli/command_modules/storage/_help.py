@@ -239,6 +239,12 @@ helps['storage blob copy start-batch'] = """
         - name: --source-sas
           type: string
           short-summary: The shared access signature for the source storage account.
+        - name: --max-connections
+          type: int
+          short-summary: The maximum number of copy requests sent at the same time.
+        - name: --wait
+          type: bool
+          short-summary: Wait until all the copies are completed, reporting their progress and the failed copies.
 """
 helps['storage container'] = """
     type: group
@@ -464,6 +470,12 @@ helps['storage file copy start-batch'] = """
         - name: --source-sas
           type: string
           short-summary: The shared access signature for the source storage account.
+        - name: --max-connections
+          type: int
+          short-summary: The maximum number of copy requests sent at the same time.
+        - name: --wait
+          type: bool
+          short-summary: Wait until all the copies are completed, reporting their progress and the failed copies.
 """
 
 helps['storage logging'] = """
@@ -456,6 +456,8 @@ register_cli_argument('storage blob download-batch', 'source', options_list=('--
                       validator=process_blob_download_batch_parameters)
 
 register_cli_argument('storage blob download-batch', 'source_container_name', ignore_type)
+register_cli_argument('storage blob download-batch', 'max_connections', type=int)
+register_cli_argument('storage blob download-batch', 'skip_unchanged', action='store_true')
 
 # BLOB UPLOAD-BATCH PARAMETERS
 register_cli_argument('storage blob upload-batch', 'destination', options_list=('--destination', '-d'))
@@ -485,6 +487,7 @@ register_cli_argument('storage blob upload-batch', 'content_type', arg_group='Co
 register_cli_argument('storage blob upload-batch', 'content_cache_control', arg_group='Content Control')
 register_cli_argument('storage blob upload-batch', 'content_language', arg_group='Content Control')
 register_cli_argument('storage blob upload-batch', 'max_connections', type=int)
+register_cli_argument('storage blob upload-batch', 'skip_unchanged', action='store_true')
 
 # BLOB COPY-BATCH PARAMETERS
 
@@ -500,13 +503,17 @@ with CommandContext('storage blob copy start-batch') as c:
         group.reg_arg('source_share')
         group.reg_arg('prefix', validator=process_blob_copy_batch_namespace)
 
+    c.reg_arg('max_connections', type=int)
+    c.reg_arg('wait', action='store_true')
+
 # FILE UPLOAD-BATCH PARAMETERS
 with CommandContext('storage file upload-batch') as c:
     c.reg_arg('source', options_list=('--source', '-s'), validator=process_file_upload_batch_parameters)
     c.reg_arg('destination', options_list=('--destination', '-d'))
 
     with c.arg_group('Download Control') as group:
-        group.reg_arg('max_connections')
+        group.reg_arg('max_connections', type=int,
+                      help='Maximum number of parallel connections used by the whole batch.')
 
         with VersionConstraint(ResourceType.DATA_STORAGE, min_api='2016-05-31') as vc:
             vc.register_cli_argument('storage file upload-batch', 'validate_content')
@@ -520,7 +527,8 @@ with CommandContext('storage file download-batch') as c:
     c.reg_arg('destination', options_list=('--destination', '-d'))
 
     with c.arg_group('Download Control') as group:
-        group.reg_arg('max_connections')
+        group.reg_arg('max_connections', type=int,
+                      help='Maximum number of parallel connections used by the whole batch.')
 
         with VersionConstraint(ResourceType.DATA_STORAGE, min_api='2016-05-31') as vc:
             vc.register_cli_argument('storage file download-batch', 'validate_content')
@@ -537,6 +545,9 @@ with CommandContext('storage file copy start-batch') as c:
         group.reg_arg('source_container')
         group.reg_arg('source_share')
 
+    c.reg_arg('max_connections', type=int)
+    c.reg_arg('wait', action='store_true')
+
 for item in ['file', 'blob']:
     register_cli_argument('storage {} url'.format(item), 'protocol', help='Protocol to use.', default='https', **enum_choice_list(['http', 'https']))
     register_source_uri_arguments('storage {} copy start'.format(item))
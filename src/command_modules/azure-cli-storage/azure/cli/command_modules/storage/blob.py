@@ -15,15 +15,17 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_file_share_from_storage_client,
                                                     create_short_lived_share_sas,
                                                     create_short_lived_container_sas,
-                                                    filter_none, collect_blobs, collect_files,
-                                                    mkdir_p, guess_content_type)
+                                                    collect_blobs, collect_blob_objects,
+                                                    collect_files, mkdir_p, guess_content_type, run_batch,
+                                                    TransferStatistics, TransferManifest, get_timestamp,
+                                                    is_local_file_unchanged, run_copy_batch)
 
 BlobCopyResult = namedtuple('BlobCopyResult', ['name', 'copy_id'])
 
 
 def storage_blob_copy_batch(client, source_client,
                             destination_container=None, source_container=None, source_share=None,
-                            source_sas=None, pattern=None, dryrun=False):
+                            source_sas=None, pattern=None, dryrun=False, max_connections=8, wait=False):
     """Copy a group of blob or files to a blob container."""
     logger = None
     if dryrun:
@@ -36,6 +38,9 @@ def storage_blob_copy_batch(client, source_client,
         logger.warning('    pattern %s', pattern)
         logger.warning(' operations')
 
+    def _get_copy(blob_name):
+        return client.get_blob_properties(destination_container, blob_name).properties.copy
+
     if source_container:
         # copy blobs for blob container
 
@@ -49,16 +54,17 @@ def storage_blob_copy_batch(client, source_client,
                                                           source_client.account_key,
                                                           source_container)
 
-        def action_blob_copy(blob_name):
-            if dryrun:
+        source_blobs = collect_blobs(source_client, source_container, pattern)
+        if dryrun:
+            for blob_name in source_blobs:
                 logger.warning('  - copy blob %s', blob_name)
-            else:
-                return _copy_blob_to_blob_container(client, source_client, destination_container,
-                                                    source_container, source_sas, blob_name)
+            return []
 
-        return list(filter_none(action_blob_copy(blob) for blob in collect_blobs(source_client,
-                                                                                 source_container,
-                                                                                 pattern)))
+        def action_blob_copy(blob_name):
+            return _copy_blob_to_blob_container(client, source_client, destination_container,
+                                                source_container, source_sas, blob_name)
+
+        return run_copy_batch(action_blob_copy, source_blobs, max_connections, wait, _get_copy)
 
     elif source_share:
         # copy blob from file share
@@ -72,23 +78,25 @@ def storage_blob_copy_batch(client, source_client,
                                                       source_client.account_key,
                                                       source_share)
 
+        source_files = collect_files(source_client, source_share, pattern)
+        if dryrun:
+            for dir_name, file_name in source_files:
+                logger.warning('  - copy file %s', os.path.join(dir_name, file_name))
+            return []
+
         def action_file_copy(file_info):
             dir_name, file_name = file_info
-            if dryrun:
-                logger.warning('  - copy file %s', os.path.join(dir_name, file_name))
-            else:
-                return _copy_file_to_blob_container(client, source_client, destination_container,
-                                                    source_share, source_sas, dir_name, file_name)
+            return _copy_file_to_blob_container(client, source_client, destination_container,
+                                                source_share, source_sas, dir_name, file_name)
 
-        return list(filter_none(action_file_copy(file) for file in collect_files(source_client,
-                                                                                 source_share,
-                                                                                 pattern)))
+        return run_copy_batch(action_file_copy, source_files, max_connections, wait, _get_copy)
     else:
         raise ValueError('Fail to find source. Neither blob container or file share is specified')
 
 
 # pylint: disable=unused-argument
-def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False):
+def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
+                                max_connections=2, skip_unchanged=False):
     """
     Download blobs in a container recursively
 
@@ -107,21 +115,60 @@ def storage_blob_download_batch(client, source, destination, source_container_na
     :param str pattern:
         The pattern is used for files globbing. The supported patterns are '*', '?', '[seq]',
         and '[!seq]'.
+
+    :param int max_connections:
+        Maximum number of parallel connections used by the whole batch. Up to this many blobs are
+        downloaded at the same time.
+
+    :param bool skip_unchanged:
+        Skip the blobs whose local file has the same size and either the same modification time,
+        or the same MD5 hash as the blob.
     """
-    source_blobs = list(collect_blobs(client, source_container_name, pattern))
+    source_blobs = list(collect_blob_objects(client, source_container_name, pattern))
+    logger = get_az_logger(__name__)
 
     if dryrun:
-        logger = get_az_logger(__name__)
         logger.warning('download action: from %s to %s', source, destination)
         logger.warning('    pattern %s', pattern)
         logger.warning('  container %s', source_container_name)
         logger.warning('      total %d', len(source_blobs))
         logger.warning(' operations')
         for b in source_blobs or []:
-            logger.warning('  - %s', b)
+            logger.warning('  - %s', b.name)
         return []
 
-    return list(_download_blob(client, source_container_name, destination, blob) for blob in source_blobs)
+    statistics = TransferStatistics()
+    if skip_unchanged:
+        remaining_blobs = []
+        for blob in source_blobs:
+            if is_local_file_unchanged(os.path.join(destination, blob.name), blob.properties):
+                statistics.add_skipped()
+            else:
+                remaining_blobs.append(blob)
+        source_blobs = remaining_blobs
+
+    # create the folders up front, once each, rather than checking them for every blob in the workers
+    created_folders = set()
+    for blob in source_blobs:
+        folder = os.path.dirname(os.path.join(destination, blob.name))
+        if folder not in created_folders:
+            mkdir_p(folder)
+            created_folders.add(folder)
+
+    def _download_action(blob, connections):
+        logger.info('downloading %s', blob.name)
+        return _download_blob(client, source_container_name, destination, blob, connections)
+
+    results, errors = run_batch(_download_action, source_blobs, max_connections, statistics,
+                                get_size=lambda blob: blob.properties.content_length or 0)
+    statistics.report('Downloaded')
+
+    if errors:
+        for blob, ex in errors:
+            logger.error('Failed to download %s: %s', blob.name, ex)
+        raise CLIError('{} of {} blob(s) failed to download. Run the command again with --skip-unchanged to '
+                       'download the remaining blobs.'.format(len(errors), len(source_blobs)))
+    return results
 
 
 def storage_blob_upload_batch(client, source, destination, pattern=None, source_files=None,  # pylint: disable=too-many-locals
@@ -129,7 +176,7 @@ def storage_blob_upload_batch(client, source, destination, pattern=None, source_
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, skip_unchanged=False):
     """
     Upload files to storage container as blobs
 
@@ -148,6 +195,15 @@ def storage_blob_upload_batch(client, source, destination, pattern=None, source_
     :param bool dryrun:
         Show the summary of the operations to be taken instead of actually upload the file(s)
 
+    :param int max_connections:
+        Maximum number of parallel connections used by the whole batch. Up to this many files are
+        uploaded at the same time.
+
+    :param bool skip_unchanged:
+        Skip the files which were uploaded by a previous run with the same settings and haven't
+        changed since, locally or in the container. Only runs with this option record the uploaded
+        files, so use it from the first run of an upload which may need to be resumed.
+
     :param string if_match:
         An ETag value, or the wildcard character (*). Specify this header to perform the operation
         only if the resource's ETag matches the value specified.
@@ -159,7 +215,7 @@ def storage_blob_upload_batch(client, source, destination, pattern=None, source_
         and fail the operation if it does exist.
     """
 
-    def _append_blob(file_path, blob_name, blob_content_settings):
+    def _append_blob(file_path, blob_name, blob_content_settings, connections):  # pylint: disable=unused-argument
         if not client.exists(destination_container_name, blob_name):
             client.create_blob(
                 container_name=destination_container_name,
@@ -187,7 +243,7 @@ def storage_blob_upload_batch(client, source, destination, pattern=None, source_
 
         return client.append_blob_from_path(**append_blob_args)
 
-    def _upload_blob(file_path, blob_name, blob_content_settings):
+    def _upload_blob(file_path, blob_name, blob_content_settings, connections):
         create_blob_args = {
             'container_name': destination_container_name,
             'blob_name': blob_name,
@@ -195,7 +251,7 @@ def storage_blob_upload_batch(client, source, destination, pattern=None, source_
             'progress_callback': lambda c, t: None,
             'content_settings': blob_content_settings,
             'metadata': metadata,
-            'max_connections': max_connections,
+            'max_connections': connections,
             'lease_id': lease_id,
             'if_modified_since': if_modified_since,
             'if_unmodified_since': if_unmodified_since,
@@ -230,25 +286,78 @@ def storage_blob_upload_batch(client, source, destination, pattern=None, source_
         results = []
         for src, dst in source_files or []:
             results.append(_create_return_result(dst, guess_content_type(src, content_settings, settings_class)))
-    else:
-        for src, dst in source_files or []:
-            logger.warning('uploading {}'.format(src))
-            guessed_content_settings = guess_content_type(src, content_settings, settings_class)
-            results.append(
-                _create_return_result(dst, guessed_content_settings, upload_action(src, dst, guessed_content_settings)))
+        return results
+
+    statistics = TransferStatistics()
+    source_files = [(src, dst, os.stat(src)) for src, dst in source_files or []]
+
+    manifest = None
+    if skip_unchanged:
+        # the manifest is specific to the upload settings, a change of them uploads all the files again
+        manifest = TransferManifest(client.account_name, destination_container_name, source, blob_type,
+                                    sorted(vars(content_settings).items()) if content_settings else None,
+                                    sorted(metadata.items()) if metadata else None)
+        uploaded_etags = _get_uploaded_blob_etags(client, destination_container_name,
+                                                  [dst for _, dst, _ in source_files], manifest)
+        remaining_files = []
+        for src, dst, stat in source_files:
+            entry = manifest.get(dst)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime and \
+                    entry['etag'] == uploaded_etags.get(dst):
+                statistics.add_skipped()
+            else:
+                remaining_files.append((src, dst, stat))
+        source_files = remaining_files
+
+    def _upload_action(source_file, connections):
+        src, dst, stat = source_file
+        logger.info('uploading %s', src)
+        guessed_content_settings = guess_content_type(src, content_settings, settings_class)
+        upload_result = upload_action(src, dst, guessed_content_settings, connections)
+        if manifest:
+            manifest.set(dst, {'size': stat.st_size, 'mtime': stat.st_mtime,
+                               'etag': upload_result.etag if upload_result else None})
+        return _create_return_result(dst, guessed_content_settings, upload_result)
 
+    try:
+        results, errors = run_batch(_upload_action, source_files, max_connections, statistics,
+                                    get_size=lambda source_file: source_file[2].st_size)
+    finally:
+        if manifest:
+            manifest.save()
+    statistics.report('Uploaded')
+
+    if errors:
+        for (src, _, _), ex in errors:
+            logger.error('Failed to upload %s: %s', src, ex)
+        message = '{} of {} file(s) failed to upload.'.format(len(errors), len(source_files))
+        if skip_unchanged:
+            message += ' Run the command again to upload the remaining files.'
+        raise CLIError(message)
     return results
 
 
-def _download_blob(blob_service, container, destination_folder, blob_name):
-    # TODO: try catch IO exception
-    destination_path = os.path.join(destination_folder, blob_name)
-    destination_folder = os.path.dirname(destination_path)
-    if not os.path.exists(destination_folder):
-        mkdir_p(destination_folder)
+def _get_uploaded_blob_etags(client, container_name, blob_names, manifest):
+    """ Returns the current ETags of the given blobs which are recorded in the manifest. """
+    blob_names = set(name for name in blob_names if manifest.get(name))
+    if not blob_names:
+        return {}
+    prefix = os.path.commonprefix(list(blob_names)) or None
+    return {blob.name: blob.properties.etag for blob in client.list_blobs(container_name, prefix=prefix)
+            if blob.name in blob_names}
+
+
+def _download_blob(blob_service, container, destination_folder, blob, max_connections=2):
+    destination_path = os.path.join(destination_folder, blob.name)
+    downloaded = blob_service.get_blob_to_path(container, blob.name, destination_path,
+                                               max_connections=max_connections)
 
-    blob = blob_service.get_blob_to_path(container, blob_name, destination_path)
-    return blob.name
+    # keep the modification time of the blob, so that an unchanged blob is recognized without hashing the file
+    last_modified = downloaded.properties.last_modified
+    if last_modified:
+        timestamp = get_timestamp(last_modified)
+        os.utime(destination_path, (timestamp, timestamp))
+    return downloaded.name
 
 
 def _copy_blob_to_blob_container(blob_service, source_blob_service, destination_container,
@@ -257,8 +366,8 @@ def _copy_blob_to_blob_container(blob_service, source_blob_service, destination_
                                                         sas_token=source_sas)
 
     try:
-        blob_service.copy_blob(destination_container, source_blob_name, source_blob_url)
-        return blob_service.make_blob_url(destination_container, source_blob_name)
+        copy = blob_service.copy_blob(destination_container, source_blob_name, source_blob_url)
+        return blob_service.make_blob_url(destination_container, source_blob_name), source_blob_name, copy
     except AzureException:
         error_template = 'Failed to copy blob {} to container {}.'
         raise CLIError(error_template.format(source_blob_name, destination_container))
@@ -274,8 +383,8 @@ def _copy_file_to_blob_container(blob_service, source_file_service, destination_
         if source_file_dir else source_file_name
 
     try:
-        blob_service.copy_blob(destination_container, blob_name=blob_name, copy_source=file_url)
-        return blob_service.make_blob_url(destination_container, blob_name)
+        copy = blob_service.copy_blob(destination_container, blob_name=blob_name, copy_source=file_url)
+        return blob_service.make_blob_url(destination_container, blob_name), blob_name, copy
     except AzureException as ex:
         error_template = 'Failed to copy file {} to container {}. {}'
         raise CLIError(error_template.format(source_file_name, destination_container, ex))
@@ -12,14 +12,15 @@ from azure.cli.core.azlogging import get_az_logger
 from azure.cli.core.util import CLIError
 from azure.common import AzureException, AzureHttpError
 from azure.cli.core.profiles import supported_api_version, ResourceType, get_sdk
-from azure.cli.command_modules.storage.util import (filter_none, collect_blobs, collect_files,
+from azure.cli.command_modules.storage.util import (collect_blobs, collect_files,
                                                     create_blob_service_from_storage_client,
                                                     create_short_lived_container_sas,
-                                                    create_short_lived_share_sas, guess_content_type)
+                                                    create_short_lived_share_sas, guess_content_type,
+                                                    run_batch, run_copy_batch, TransferStatistics)
 
 
 def storage_file_upload_batch(client, destination, source, pattern=None, dryrun=False, validate_content=False,
-                              content_settings=None, max_connections=1, metadata=None):
+                              content_settings=None, max_connections=2, metadata=None):
     """ Upload local files to Azure Storage File Share in batch """
 
     from .util import glob_files_locally
@@ -36,13 +37,15 @@ def storage_file_upload_batch(client, destination, source, pattern=None, dryrun=
                  'Type': guess_content_type(src, content_settings, settings_class).content_type}
                 for src, dst in source_files]
 
-    # TODO: Performance improvement
-    # 1. Upload files in parallel
-    def _upload_action(src, dst):
+    statistics = TransferStatistics()
+    _make_directories_in_files_share(client, destination, (os.path.dirname(dst) for _, dst in source_files),
+                                     max_connections=max_connections)
+
+    def _upload_action(source_file, connections):
+        src, dst = source_file
         dir_name = os.path.dirname(dst)
         file_name = os.path.basename(dst)
 
-        _make_directory_in_files_share(client, destination, dir_name)
         create_file_args = {
             'share_name': destination,
             'directory_name': dir_name,
@@ -50,71 +53,88 @@ def storage_file_upload_batch(client, destination, source, pattern=None, dryrun=
             'local_file_path': src,
             'content_settings': guess_content_type(src, content_settings, settings_class),
             'metadata': metadata,
-            'max_connections': max_connections,
+            'max_connections': connections,
         }
 
         if supported_api_version(ResourceType.DATA_STORAGE, min_api='2016-05-31'):
             create_file_args['validate_content'] = validate_content
 
-        logger.warning('uploading %s', src)
+        logger.info('uploading %s', src)
         client.create_file_from_path(**create_file_args)
 
         return client.make_file_url(destination, dir_name, file_name)
 
-    return list(_upload_action(src, dst) for src, dst in source_files)
+    results, errors = run_batch(_upload_action, source_files, max_connections, statistics,
+                                get_size=lambda source_file: os.path.getsize(source_file[0]))
+    statistics.report('Uploaded')
+
+    if errors:
+        for (src, _), ex in errors:
+            logger.error('Failed to upload %s: %s', src, ex)
+        raise CLIError('{} of {} file(s) failed to upload.'.format(len(errors), len(source_files)))
+    return results
 
 
 def storage_file_download_batch(client, source, destination, pattern=None, dryrun=False,
-                                validate_content=False, max_connections=1):
+                                validate_content=False, max_connections=2):
     """
     Download files from file share to local directory in batch
     """
 
     from .util import glob_files_remotely, mkdir_p
 
-    source_files = glob_files_remotely(client, source, pattern)
+    source_files = list(glob_files_remotely(client, source, pattern))
+    logger = get_az_logger(__name__)
 
     if dryrun:
-        source_files_list = list(source_files)
-
-        logger = get_az_logger(__name__)
         logger.warning('upload files to file share')
         logger.warning('    account %s', client.account_name)
         logger.warning('      share %s', source)
         logger.warning('destination %s', destination)
         logger.warning('    pattern %s', pattern)
-        logger.warning('      total %d', len(source_files_list))
+        logger.warning('      total %d', len(source_files))
         logger.warning(' operations')
-        for f in source_files_list:
+        for f in source_files:
             logger.warning('  - %s/%s => %s', f[0], f[1], os.path.join(destination, *f))
 
         return []
 
-    def _download_action(pair):
-        destination_dir = os.path.join(destination, pair[0])
+    statistics = TransferStatistics()
+    for destination_dir in set(os.path.join(destination, f[0]) for f in source_files):
         mkdir_p(destination_dir)
 
+    def _download_action(pair, connections):
         get_file_args = {
             'share_name': source,
             'directory_name': pair[0],
             'file_name': pair[1],
             'file_path': os.path.join(destination, *pair),
-            'max_connections': max_connections
+            'max_connections': connections
         }
 
         if supported_api_version(ResourceType.DATA_STORAGE, min_api='2016-05-31'):
             get_file_args['validate_content'] = validate_content
 
+        logger.info('downloading %s', os.path.join(*pair))
         client.get_file_to_path(**get_file_args)
         return client.make_file_url(source, *pair)
 
-    return list(_download_action(f) for f in source_files)
+    results, errors = run_batch(_download_action, source_files, max_connections, statistics,
+                                get_size=lambda pair: os.path.getsize(os.path.join(destination, *pair)))
+    statistics.report('Downloaded')
+
+    if errors:
+        for pair, ex in errors:
+            logger.error('Failed to download %s: %s', os.path.join(*pair), ex)
+        raise CLIError('{} of {} file(s) failed to download.'.format(len(errors), len(source_files)))
+    return results
 
 
 def storage_file_copy_batch(client, source_client,
                             destination_share=None, destination_path=None,
                             source_container=None, source_share=None, source_sas=None,
-                            pattern=None, dryrun=False, metadata=None, timeout=None):
+                            pattern=None, dryrun=False, metadata=None, timeout=None, max_connections=8,
+                            wait=False):
     """
     Copy a group of files asynchronously
     """
@@ -130,6 +150,10 @@ def storage_file_copy_batch(client, source_client,
         logger.warning('    pattern %s', pattern)
         logger.warning(' operations')
 
+    def _get_copy(path):
+        return client.get_file_properties(destination_share, os.path.dirname(path) or None,
+                                          os.path.basename(path)).properties.copy
+
     if source_container:
         # copy blobs to file share
 
@@ -147,17 +171,19 @@ def storage_file_copy_batch(client, source_client,
                                                           source_client.account_key,
                                                           source_container)
 
-        def action_blob_copy(blob_name):
-            if dryrun:
+        source_blobs = collect_blobs(source_client, source_container, pattern)
+        if dryrun:
+            for blob_name in source_blobs:
                 logger.warning('  - copy blob %s', blob_name)
-            else:
-                return _create_file_and_directory_from_blob(
-                    client, source_client, destination_share, source_container, source_sas,
-                    blob_name, destination_dir=destination_path, metadata=metadata, timeout=timeout,
-                    existing_dirs=existing_dirs)
+            return []
+
+        def action_blob_copy(blob_name):
+            return _create_file_and_directory_from_blob(
+                client, source_client, destination_share, source_container, source_sas,
+                blob_name, destination_dir=destination_path, metadata=metadata, timeout=timeout,
+                existing_dirs=existing_dirs)
 
-        return list(filter_none(action_blob_copy(blob) for blob in
-                                collect_blobs(source_client, source_container, pattern)))
+        return run_copy_batch(action_blob_copy, source_blobs, max_connections, wait, _get_copy)
 
     elif source_share:
         # copy files from share to share
@@ -177,18 +203,20 @@ def storage_file_copy_batch(client, source_client,
                                                       source_client.account_key,
                                                       source_share)
 
+        source_files = collect_files(source_client, source_share, pattern)
+        if dryrun:
+            for dir_name, file_name in source_files:
+                logger.warning('  - copy file %s', os.path.join(dir_name, file_name))
+            return []
+
         def action_file_copy(file_info):
             dir_name, file_name = file_info
-            if dryrun:
-                logger.warning('  - copy file %s', os.path.join(dir_name, file_name))
-            else:
-                return _create_file_and_directory_from_file(
-                    client, source_client, destination_share, source_share, source_sas, dir_name,
-                    file_name, destination_dir=destination_path, metadata=metadata,
-                    timeout=timeout, existing_dirs=existing_dirs)
-
-        return list(filter_none(action_file_copy(file) for file in
-                                collect_files(source_client, source_share, pattern)))
+            return _create_file_and_directory_from_file(
+                client, source_client, destination_share, source_share, source_sas, dir_name,
+                file_name, destination_dir=destination_path, metadata=metadata,
+                timeout=timeout, existing_dirs=existing_dirs)
+
+        return run_copy_batch(action_file_copy, source_files, max_connections, wait, _get_copy)
     else:
         # won't happen, the validator should ensure either source_container or source_share is set
         raise ValueError('Fail to find source. Neither blob container or file share is specified.')
@@ -208,8 +236,8 @@ def _create_file_and_directory_from_blob(file_service, blob_service, share, cont
     _make_directory_in_files_share(file_service, share, dir_name, existing_dirs)
 
     try:
-        file_service.copy_file(share, dir_name, file_name, blob_url, metadata, timeout)
-        return file_service.make_file_url(share, dir_name, file_name)
+        copy = file_service.copy_file(share, dir_name, file_name, blob_url, metadata, timeout)
+        return file_service.make_file_url(share, dir_name, file_name), full_path, copy
     except AzureException:
         error_template = 'Failed to copy blob {} to file share {}. Please check if you have ' + \
                          'permission to read source or set a correct sas token.'
@@ -232,8 +260,8 @@ def _create_file_and_directory_from_file(file_service, source_file_service, shar
     _make_directory_in_files_share(file_service, share, dir_name, existing_dirs)
 
     try:
-        file_service.copy_file(share, dir_name, file_name, file_url, metadata, timeout)
-        return file_service.make_file_url(share, dir_name or None, file_name)
+        copy = file_service.copy_file(share, dir_name, file_name, file_url, metadata, timeout)
+        return file_service.make_file_url(share, dir_name or None, file_name), full_path, copy
     except AzureException:
         error_template = 'Failed to copy file {} from share {} to file share {}. Please check if ' \
                          'you have right permission to read source or set a correct sas token.'
@@ -259,7 +287,7 @@ def _make_directory_in_files_share(file_service, file_share, directory_path, exi
         p = os.path.dirname(p)
 
     for dir_name in reversed(parents):
-        if existing_dirs and (dir_name in existing_dirs):
+        if existing_dirs is not None and dir_name in existing_dirs:
             continue
 
         try:
@@ -269,5 +297,31 @@ def _make_directory_in_files_share(file_service, file_share, directory_path, exi
         except AzureHttpError:
             raise CLIError('Failed to create directory {}'.format(dir_name))
 
-        if existing_dirs:
-            existing_dirs.add(directory_path)
+        if existing_dirs is not None:
+            existing_dirs.add(dir_name)
+
+
+def _make_directories_in_files_share(file_service, file_share, directory_paths, existing_dirs=None,
+                                     max_connections=1):
+    """
+    Create the given directories and their parents. The directories of the same depth are created
+    concurrently, the parents before their children.
+    """
+    existing_dirs = existing_dirs if existing_dirs is not None else set()
+    levels = {}
+    for directory_path in directory_paths:
+        parents = []
+        while directory_path:
+            parents.append(directory_path)
+            directory_path = os.path.dirname(directory_path)
+        for depth, dir_name in enumerate(reversed(parents)):
+            if dir_name not in existing_dirs:
+                levels.setdefault(depth, set()).add(dir_name)
+
+    def _create_action(dir_name, _):
+        _make_directory_in_files_share(file_service, file_share, dir_name, existing_dirs)
+
+    for depth in sorted(levels):
+        _, errors = run_batch(_create_action, sorted(levels[depth]), max_connections)
+        if errors:
+            raise errors[0][1]
@@ -0,0 +1,223 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from collections import namedtuple
+from datetime import datetime
+
+import mock
+
+from azure.cli.command_modules.storage.util import (run_batch, TransferStatistics, TransferManifest,
+                                                    collect_blob_objects, get_timestamp, get_file_md5,
+                                                    is_local_file_unchanged, glob_files_remotely,
+                                                    run_copy_batch, wait_for_copies)
+from azure.cli.core.util import CLIError
+
+Properties = namedtuple('Properties', ['content_length', 'last_modified', 'content_settings'])
+ContentSettings = namedtuple('ContentSettings', ['content_md5'])
+Blob = namedtuple('Blob', ['name', 'properties'])
+Directory = namedtuple('Directory', ['name'])
+File = namedtuple('File', ['name'])
+CopyProperties = namedtuple('CopyProperties', ['status', 'progress', 'status_description'])
+
+
+class TestStorageBatchUtil(unittest.TestCase):
+
+    def test_run_batch_results_in_order(self):
+        def _action(item, connections):
+            if item == 3:
+                raise ValueError('bad item')
+            return item * connections
+
+        statistics = TransferStatistics()
+        results, errors = run_batch(_action, [1, 2, 3, 4], max_connections=8, statistics=statistics,
+                                    get_size=lambda item: item)
+
+        # 4 items share the budget of 8 connections
+        self.assertEqual(results, [2, 4, None, 8])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], 3)
+        self.assertIsInstance(errors[0][1], ValueError)
+        self.assertEqual(statistics.total_bytes, 7)
+        self.assertEqual(len(statistics.latencies), 3)
+        self.assertEqual(statistics.failed, 1)
+
+    def test_run_batch_bounded_workers(self):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def _action(item, connections):  # pylint: disable=unused-argument
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+            return connections
+
+        results, errors = run_batch(_action, range(20), max_connections=3)
+        self.assertEqual(results, [1] * 20)
+        self.assertEqual(errors, [])
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_transfer_manifest_persisted(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        with mock.patch('azure.cli.core._environment.get_config_dir', return_value=config_dir):
+            manifest = TransferManifest('account', 'container', '/source')
+            self.assertIsNone(manifest.get('a.txt'))
+            manifest.set('a.txt', {'size': 1, 'mtime': 2.0, 'etag': '"0x1"'})
+            manifest.save()
+
+            self.assertEqual(TransferManifest('account', 'container', '/source').get('a.txt'),
+                             {'size': 1, 'mtime': 2.0, 'etag': '"0x1"'})
+            self.assertIsNone(TransferManifest('account', 'other', '/source').get('a.txt'))
+
+    def test_transfer_manifest_expired(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        folder = os.path.join(config_dir, 'storage', 'manifests')
+        with mock.patch('azure.cli.core._environment.get_config_dir', return_value=config_dir):
+            manifest = TransferManifest('account', 'old', '/source')
+            manifest.set('a.txt', {'size': 1, 'mtime': 2.0, 'etag': '"0x1"'})
+            manifest.save()
+            expired = time.time() - TransferManifest.MAX_AGE - 60
+            os.utime(os.path.join(folder, os.listdir(folder)[0]), (expired, expired))
+            manifest = TransferManifest('account', 'recent', '/source')
+            manifest.set('a.txt', {'size': 1, 'mtime': 2.0, 'etag': '"0x1"'})
+            manifest.save()
+
+            # opening a manifest removes those which weren't saved for too long
+            self.assertIsNone(TransferManifest('account', 'old', '/source').get('a.txt'))
+            self.assertIsNotNone(TransferManifest('account', 'recent', '/source').get('a.txt'))
+
+    def test_collect_blob_objects(self):
+        service = mock.MagicMock()
+        service.list_blobs.return_value = [Blob('dir/a.txt', None), Blob('dir/b.bin', None), Blob('c.txt', None)]
+        self.assertEqual([b.name for b in collect_blob_objects(service, 'container', '*.txt')],
+                         ['dir/a.txt', 'c.txt'])
+        service.list_blobs.assert_called_with('container', prefix=None)
+        self.assertEqual([b.name for b in collect_blob_objects(service, 'container', 'dir/*.txt')], ['dir/a.txt'])
+        service.list_blobs.assert_called_with('container', prefix='dir/')
+
+        service.exists.return_value = False
+        self.assertEqual(list(collect_blob_objects(service, 'container', 'c.txt')), [])
+        service.exists.return_value = True
+        service.get_blob_properties.return_value = Blob('c.txt', None)
+        self.assertEqual(list(collect_blob_objects(service, 'container', 'c.txt')), [Blob('c.txt', None)])
+
+    def test_is_local_file_unchanged(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, 'a.txt')
+        with open(path, 'wb') as f:
+            f.write(b'content')
+        last_modified = datetime(2017, 9, 1, 12, 0, 0)
+        timestamp = get_timestamp(last_modified)
+        md5 = get_file_md5(path)
+
+        self.assertFalse(is_local_file_unchanged(os.path.join(folder, 'missing'),
+                                                 Properties(7, last_modified, None)))
+        self.assertFalse(is_local_file_unchanged(path, Properties(8, last_modified, ContentSettings(md5))))
+        self.assertFalse(is_local_file_unchanged(path, Properties(7, last_modified, ContentSettings(None))))
+        self.assertTrue(is_local_file_unchanged(path, Properties(7, last_modified, ContentSettings(md5))))
+
+        os.utime(path, (timestamp, timestamp))
+        self.assertTrue(is_local_file_unchanged(path, Properties(7, last_modified, ContentSettings(None))))
+
+    @unittest.skipIf(os.path.normcase('A/') != 'A/', 'paths are matched case-insensitively')
+    @mock.patch('azure.cli.command_modules.storage.util.get_sdk', return_value=(Directory, File))
+    def test_glob_files_remotely(self, _):
+        share = {
+            'logs': [Directory('2016'), Directory('2017'), File('readme.txt')],
+            'logs/2016': [File('a.log')],
+            'logs/2017': [Directory('10'), Directory('11'), File('b.log')],
+            'logs/2017/10': [File('c.log'), File('d.txt')],
+            'logs/2017/11': [File('e.log')],
+        }
+        client = mock.MagicMock()
+        client.list_directories_and_files.side_effect = lambda share_name, directory: iter(share[directory])
+
+        self.assertEqual(list(glob_files_remotely(client, 'share', 'logs/2017/1*.log')),
+                         [('logs/2017/10', 'c.log'), ('logs/2017/11', 'e.log')])
+        self.assertEqual(sorted(c[0][1] for c in client.list_directories_and_files.call_args_list),
+                         ['logs/2017', 'logs/2017/10', 'logs/2017/11'])
+
+        client.list_directories_and_files.reset_mock()
+        self.assertEqual(list(glob_files_remotely(client, 'share', 'logs/2017/10*')),
+                         [('logs/2017/10', 'c.log'), ('logs/2017/10', 'd.txt')])
+        self.assertEqual(sorted(c[0][1] for c in client.list_directories_and_files.call_args_list),
+                         ['logs/2017', 'logs/2017/10'])
+
+    def test_make_directory_in_files_share_populates_cache(self):
+        from azure.cli.command_modules.storage.file import _make_directory_in_files_share
+        client = mock.MagicMock()
+        existing_dirs = set()
+        _make_directory_in_files_share(client, 'share', 'a/b', existing_dirs)
+        _make_directory_in_files_share(client, 'share', 'a/c', existing_dirs)
+
+        self.assertEqual(existing_dirs, set(['a', 'a/b', 'a/c']))
+        self.assertEqual([c[1]['directory_name'] for c in client.create_directory.call_args_list],
+                         ['a', 'a/b', 'a/c'])
+
+    def test_make_directories_in_files_share_parents_first(self):
+        from azure.cli.command_modules.storage.file import _make_directories_in_files_share
+        lock = threading.Lock()
+        created = []
+
+        def _create_directory(share_name, directory_name, fail_on_exist):  # pylint: disable=unused-argument
+            with lock:
+                parent = os.path.dirname(directory_name)
+                self.assertTrue(not parent or parent in created)
+                created.append(directory_name)
+
+        client = mock.MagicMock()
+        client.create_directory.side_effect = _create_directory
+        _make_directories_in_files_share(client, 'share', ['a/b/c', 'a/b', 'a/d', '', 'e/f', 'a/b/c'],
+                                         max_connections=4)
+        self.assertEqual(sorted(created), ['a', 'a/b', 'a/b/c', 'a/d', 'e', 'e/f'])
+
+    @mock.patch('azure.cli.command_modules.storage.util.time.sleep')
+    def test_wait_for_copies_backoff(self, sleep):
+        statuses = {'a': iter(['pending', 'pending', 'success']),
+                    'b': iter(['pending', 'pending', 'pending', 'failed'])}
+
+        def _get_copy(name):
+            return CopyProperties(next(statuses[name]), '1/2', 'description')
+
+        pending = CopyProperties('pending', '0/2', None)
+        failed = wait_for_copies([('a', pending), ('b', pending), ('c', CopyProperties('success', '2/2', None))],
+                                 _get_copy, max_connections=2)
+
+        self.assertEqual(failed, [('b', CopyProperties('failed', '1/2', 'description'))])
+        # the interval doubles while nothing completes and is reset after a copy completed
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [1, 2, 4, 1])
+
+    @mock.patch('azure.cli.command_modules.storage.util.time.sleep')
+    def test_run_copy_batch(self, _):
+        def _copy_action(name):
+            if name == 'bad':
+                raise CLIError('cannot copy')
+            return 'https://account/' + name, name, CopyProperties('pending', None, None)
+
+        self.assertEqual(run_copy_batch(_copy_action, ['a', 'b'], max_connections=2, wait=True,
+                                        get_copy=lambda name: CopyProperties('success', None, None)),
+                         ['https://account/a', 'https://account/b'])
+        self.assertEqual(run_copy_batch(_copy_action, ['a', 'b']), ['https://account/a', 'https://account/b'])
+
+        with self.assertRaisesRegexp(CLIError, '1 of 3 copies failed'):
+            run_copy_batch(_copy_action, ['a', 'bad', 'b'], max_connections=2)
+        with self.assertRaisesRegexp(CLIError, '2 of 2 copies failed'):
+            run_copy_batch(_copy_action, ['a', 'b'], wait=True,
+                           get_copy=lambda name: CopyProperties('aborted', None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,21 @@
 
 import os
 import os.path
+import re
+import threading
+import time
 from fnmatch import fnmatch
 
+from azure.cli.core.azlogging import get_az_logger
 from azure.cli.core.profiles import get_sdk, ResourceType
+from azure.cli.core.util import CLIError
+
+# number of file share directories listed at the same time
+LISTING_MAX_WORKERS = 8
+
+# bounds of the interval between two polls of the status of pending copies, in seconds
+COPY_POLL_MIN_INTERVAL = 1
+COPY_POLL_MAX_INTERVAL = 30
 
 
 def collect_blobs(blob_service, container, pattern=None):
@@ -23,7 +35,27 @@ def collect_blobs(blob_service, container, pattern=None):
     if not _pattern_has_wildcards(pattern):
         return [pattern] if blob_service.exists(container, pattern) else []
 
-    return (blob.name for blob in blob_service.list_blobs(container) if _match_path(pattern, blob.name))
+    return (blob.name for blob in collect_blob_objects(blob_service, container, pattern))
+
+
+def collect_blob_objects(blob_service, container, pattern=None):
+    """
+    List the blobs in the given blob container, filter the blob by comparing their path to the given pattern.
+    Returns an iterable of blobs with their properties.
+    """
+    if not blob_service:
+        raise ValueError('missing parameter blob_service')
+
+    if not container:
+        raise ValueError('missing parameter container')
+
+    if not _pattern_has_wildcards(pattern):
+        if not blob_service.exists(container, pattern):
+            return []
+        return [blob_service.get_blob_properties(container, pattern)]
+
+    blobs = blob_service.list_blobs(container, prefix=_get_pattern_prefix(pattern))
+    return (blob for blob in blobs if _match_path(pattern, blob.name))
 
 
 def collect_files(file_service, share, pattern=None):
@@ -78,18 +110,36 @@ def glob_files_locally(folder_path, pattern):
 
 def glob_files_remotely(client, share_name, pattern):
     """glob the files in remote file share based on the given pattern"""
-    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from azure.common import AzureMissingResourceHttpError
     Directory, File = get_sdk(ResourceType.DATA_STORAGE, 'file.models#Directory', 'file.models#File')
 
-    queue = deque([""])
-    while queue:
-        current_dir = queue.pop()
-        for f in client.list_directories_and_files(share_name, current_dir):
-            if isinstance(f, File):
-                if (pattern and fnmatch(os.path.join(current_dir, f.name), pattern)) or (not pattern):
-                    yield current_dir, f.name
-            elif isinstance(f, Directory):
-                queue.appendleft(os.path.join(current_dir, f.name))
+    # only the directory holding the literal prefix of the pattern and the directories below it can have matches
+    prefix = _get_pattern_prefix(pattern) or ''
+    start_dir = prefix[:prefix.rfind('/') + 1].strip('/')
+
+    def _list(directory):
+        try:
+            return list(client.list_directories_and_files(share_name, directory))
+        except AzureMissingResourceHttpError:
+            if directory == start_dir:
+                return []
+            raise
+
+    # list the directories of each level concurrently, yielding the files in the same order as a sequential walk
+    with ThreadPoolExecutor(max_workers=LISTING_MAX_WORKERS) as executor:
+        level = [start_dir]
+        while level:
+            next_level = []
+            for current_dir, entries in zip(level, executor.map(_list, level)):
+                for f in entries:
+                    path = os.path.join(current_dir, f.name)
+                    if isinstance(f, File):
+                        if (pattern and fnmatch(path, pattern)) or (not pattern):
+                            yield current_dir, f.name
+                    elif isinstance(f, Directory) and (path + '/').startswith(prefix[:len(path) + 1]):
+                        next_level.append(path)
+            level = next_level
 
 
 def create_short_lived_container_sas(account_name, account_key, container):
@@ -125,10 +175,281 @@ def mkdir_p(path):
             raise
 
 
+def run_batch(action, items, max_connections=1, statistics=None, get_size=None):
+    """
+    Run `action(item, connections)` for every item on a pool of workers.
+
+    The batch uses at most `max_connections` connections overall: up to that many items are
+    transferred at the same time and each transfer is given an equal share of the budget as
+    `connections`. A failed item doesn't stop the others.
+
+    Returns a tuple of the results in item order (None for failed items) and a list of
+    (item, exception) for the failed items.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    items = list(items)
+    max_connections = max_connections or 1
+    workers = max(1, min(max_connections, len(items)))
+    connections = max(1, max_connections // workers)
+
+    def _run(item):
+        start = time.time()
+        result = action(item, connections)
+        if statistics:
+            statistics.add(get_size(item) if get_size else 0, time.time() - start)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run, item) for item in items]
+
+    results = []
+    errors = []
+    for item, future in zip(items, futures):
+        if future.exception():
+            errors.append((item, future.exception()))
+            if statistics:
+                statistics.add_failure()
+            results.append(None)
+        else:
+            results.append(future.result())
+    return results, errors
+
+
+class TransferStatistics(object):
+    """ Aggregates the number, size and duration of the transfers of a batch operation. """
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.latencies = []
+        self.total_bytes = 0
+        self.skipped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def add(self, size, latency):
+        with self._lock:
+            self.total_bytes += size
+            self.latencies.append(latency)
+
+    def add_skipped(self):
+        with self._lock:
+            self.skipped += 1
+
+    def add_failure(self):
+        with self._lock:
+            self.failed += 1
+
+    def report(self, operation):
+        logger = get_az_logger(__name__)
+        elapsed = max(time.time() - self.start_time, 0.001)
+        size_mb = self.total_bytes / 1024.0 / 1024.0
+        summary = '{} {} file(s), {:.1f} MiB in {:.1f}s ({:.2f} MiB/s)'.format(
+            operation, len(self.latencies), size_mb, elapsed, size_mb / elapsed)
+        if self.skipped:
+            summary += ', skipped {} unchanged file(s)'.format(self.skipped)
+        if self.failed:
+            summary += ', {} failed'.format(self.failed)
+        logger.warning(summary)
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            logger.info('Latency per file: average %.3fs, 95th percentile %.3fs, max %.3fs',
+                        sum(latencies) / len(latencies), latencies[int(len(latencies) * 0.95)],
+                        latencies[-1])
+
+
+class TransferManifest(object):
+    """
+    Records the files transferred by a batch operation, so that a later run of the same operation
+    can skip the files which haven't changed, e.g. to resume an interrupted run. The manifest is
+    kept in the CLI configuration directory and identified by the given keys.
+    """
+
+    SAVE_INTERVAL = 5  # seconds
+    MAX_AGE = 30 * 24 * 60 * 60  # seconds a manifest is kept after it was last saved
+
+    def __init__(self, *keys):
+        import hashlib
+        from azure.cli.core._environment import get_config_dir
+        from azure.cli.core._session import Session
+
+        folder = os.path.join(get_config_dir(), 'storage', 'manifests')
+        mkdir_p(folder)
+        _remove_expired_files(folder, TransferManifest.MAX_AGE)
+        name = hashlib.sha1('|'.join(str(k) for k in keys).encode('utf-8')).hexdigest()
+        self._session = Session()
+        try:
+            self._session.load(os.path.join(folder, '{}.json'.format(name)))
+        except ValueError:
+            get_az_logger(__name__).debug('Ignoring the corrupted transfer manifest %s', self._session.filename)
+        self._lock = threading.Lock()
+        self._last_save = time.time()
+
+    def get(self, name):
+        return self._session.data.get(name)
+
+    def set(self, name, entry):
+        with self._lock:
+            self._session.data[name] = entry
+            if time.time() - self._last_save > TransferManifest.SAVE_INTERVAL:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        try:
+            self._session.save_with_retry()
+        except (OSError, IOError) as ex:
+            get_az_logger(__name__).warning('Unable to save the transfer manifest: %s', ex)
+        self._last_save = time.time()
+
+
+def _remove_expired_files(folder, max_age):
+    expiry = time.time() - max_age
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(path) < expiry:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def get_timestamp(value):
+    """ Returns the POSIX timestamp of an aware or UTC datetime. """
+    import calendar
+    return calendar.timegm(value.utctimetuple())
+
+
+def get_file_md5(path):
+    """ Returns the base64 encoded MD5 hash of a local file, as reported in the Content-MD5 of a blob or file. """
+    import base64
+    import hashlib
+    md5 = hashlib.md5()
+    with open(path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode('utf-8')
+
+
+def is_local_file_unchanged(path, properties):
+    """
+    Whether the local file has the content described by the properties of a blob or file. The file is
+    unchanged if its size matches and either its modification time is the last modified time of the remote
+    content, which is the case for downloaded files, or its MD5 hash matches the remote Content-MD5.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+
+    if stat.st_size != properties.content_length:
+        return False
+    if properties.last_modified and int(stat.st_mtime) == get_timestamp(properties.last_modified):
+        return True
+    content_md5 = properties.content_settings.content_md5 if properties.content_settings else None
+    return bool(content_md5) and get_file_md5(path) == content_md5
+
+
+def run_copy_batch(copy_action, sources, max_connections=1, wait=False, get_copy=None):
+    """
+    Start the server side copies of the sources concurrently.
+
+    `copy_action(source)` starts a copy and returns a tuple of the URL and name of the destination and
+    the copy properties returned by the service. When `wait` is set, the status of the copies is polled
+    with `get_copy(name)` until every copy is completed.
+
+    Returns the URLs of the destinations. Raises CLIError when a copy failed to start or to complete.
+    """
+    logger = get_az_logger(__name__)
+    results, errors = run_batch(lambda source, _: copy_action(source), sources, max_connections)
+    for source, ex in errors:
+        logger.error('Failed to start the copy of %s: %s', source, ex)
+
+    started = [result for result in results if result is not None]
+    failed_copies = wait_for_copies([(name, copy) for _, name, copy in started], get_copy,
+                                    max_connections) if wait else []
+    for name, copy in failed_copies:
+        logger.error('Failed to copy %s: %s', name, getattr(copy, 'status_description', None) or
+                     getattr(copy, 'status', None) or copy)
+
+    if errors or failed_copies:
+        raise CLIError('{} of {} copies failed.'.format(len(errors) + len(failed_copies), len(results)))
+    return [url for url, _, _ in started]
+
+
+def wait_for_copies(copies, get_copy, max_connections=1):
+    """
+    Poll the status of the given (name, copy properties) pairs until every copy is completed. The
+    pending copies are polled concurrently. The polling interval doubles, up to COPY_POLL_MAX_INTERVAL,
+    while no copy completes and is reset when some do.
+
+    Returns the (name, copy properties or exception) pairs of the copies which didn't succeed.
+    """
+    logger = get_az_logger(__name__)
+    interval = COPY_POLL_MIN_INTERVAL
+    total = len(copies)
+    failed = []
+    succeeded = 0
+    while True:
+        pending = []
+        for name, copy in copies:
+            if copy.status == 'pending':
+                pending.append(name)
+            elif copy.status in ('failed', 'aborted'):
+                failed.append((name, copy))
+            else:
+                succeeded += 1
+
+        if not pending:
+            break
+
+        copied, size = _get_copy_progress(copy for _, copy in copies if copy.status == 'pending')
+        logger.warning('Copied %d of %d, %d failed, %d pending (%.1f of %.1f MiB of the pending copies)',
+                       succeeded, total, len(failed), len(pending), copied / 1024.0 / 1024.0,
+                       size / 1024.0 / 1024.0)
+
+        time.sleep(interval)
+        results, errors = run_batch(lambda name, _: get_copy(name), pending, max_connections)
+        failed.extend(errors)
+        copies = [(name, copy) for name, copy in zip(pending, results) if copy is not None]
+
+        completed = sum(1 for _, copy in copies if copy.status != 'pending') + len(errors)
+        interval = COPY_POLL_MIN_INTERVAL if completed else min(interval * 2, COPY_POLL_MAX_INTERVAL)
+
+    logger.warning('Copied %d of %d, %d failed', succeeded, total, len(failed))
+    return failed
+
+
+def _get_copy_progress(copies):
+    """ Sums the bytes copied and the total bytes of the copies, from their progress '<copied>/<total>'. """
+    copied = size = 0
+    for copy in copies:
+        try:
+            current, total = (int(v) for v in copy.progress.split('/'))
+        except (AttributeError, ValueError):
+            continue
+        copied += current
+        size += total
+    return copied, size
+
+
 def _pattern_has_wildcards(p):
     return not p or p.find('*') != -1 or p.find('?') != -1 or p.find('[') != -1
 
 
+def _get_pattern_prefix(pattern):
+    """
+    Returns the literal part of the pattern before its first wildcard, which starts every matching path,
+    or None when the pattern has no such part.
+    """
+    if not pattern or os.path.normcase('aA/') != 'aA/':
+        # paths are matched case-insensitively on this platform, so they don't share a literal prefix
+        return None
+    return re.match(r'[^*?[]*', pattern).group(0) or None
+
+
 def _match_path(pattern, *args):
     return fnmatch(os.path.join(*args), pattern) if pattern else True
 
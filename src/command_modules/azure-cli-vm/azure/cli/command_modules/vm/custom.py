@@ -32,7 +32,8 @@ from ._vm_diagnostics_templates import get_default_diag_config
 
 from ._actions import (load_images_from_aliases_doc,
                        load_extension_images_thru_services,
-                       load_images_thru_services)
+                       load_images_thru_services,
+                       _get_thread_count)
 from ._client_factory import _compute_client_factory, cf_public_ip_addresses
 
 logger = azlogging.get_az_logger(__name__)
@@ -157,7 +158,8 @@ def list_vm(resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(_parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        # the NICs and public IPs of the whole subscription are only worth listing for all of its VMs
+        return _list_vm_details(ccf, list(vm_list), use_lookup=not resource_group_name)
 
     return list(vm_list)
 
@@ -166,25 +168,61 @@ def show_vm(resource_group_name, vm_name, show_details=False):
     return get_vm_details(resource_group_name, vm_name) if show_details else get_vm(resource_group_name, vm_name)
 
 
+def _get_network_resource_getter(operation, lookup=None):
+    def _get(resource_id):
+        # resources missing from the lookup, like those created since it was listed, are read on their own
+        resource = lookup.get(resource_id.lower()) if lookup is not None else None
+        if resource is None:
+            parts = parse_resource_id(resource_id)
+            resource = operation(parts['resource_group'], parts['name'])
+        return resource
+    return _get
+
+
 def get_vm_details(resource_group_name, vm_name):
     result = get_instance_view(resource_group_name, vm_name)
     network_client = get_mgmt_service_client(ResourceType.MGMT_NETWORK)
+    return _set_vm_details(result,
+                           _get_network_resource_getter(network_client.network_interfaces.get),
+                           _get_network_resource_getter(network_client.public_ip_addresses.get))
+
+
+def _list_vm_details(compute_client, vms, use_lookup=False):
+    from concurrent.futures import ThreadPoolExecutor
+    if not vms:
+        return []
+    network_client = get_mgmt_service_client(ResourceType.MGMT_NETWORK)
+    nics = public_ips = None
+    if use_lookup:
+        # Rather than reading the NICs and public IPs of every VM one at a time, list all of them once (like
+        # 'vm list-ip-addresses') and join them to the VMs.
+        nics = {nic.id.lower(): nic for nic in network_client.network_interfaces.list_all()}
+        public_ips = {pip.id.lower(): pip for pip in network_client.public_ip_addresses.list_all()}
+    get_nic = _get_network_resource_getter(network_client.network_interfaces.get, nics)
+    get_public_ip = _get_network_resource_getter(network_client.public_ip_addresses.get, public_ips)
+
+    def _get_details(vm):
+        result = compute_client.virtual_machines.get(_parse_rg_name(vm.id)[0], vm.name, expand='instanceView')
+        return _set_vm_details(result, get_nic, get_public_ip)
+
+    with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+        return list(executor.map(_get_details, vms))
+
+
+def _set_vm_details(result, get_nic, get_public_ip):
     public_ips = []
     fqdns = []
     private_ips = []
     mac_addresses = []
     # pylint: disable=line-too-long,no-member
     for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+        nic = get_nic(nic_ref.id)
         if nic.mac_address:
             mac_addresses.append(nic.mac_address)
         for ip_configuration in nic.ip_configurations:
             private_ips.append(ip_configuration.private_ip_address)
             if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
+                public_ip_info = get_public_ip(ip_configuration.public_ip_address.id)
                 if public_ip_info.ip_address:
                     public_ips.append(public_ip_info.ip_address)
                 if public_ip_info.dns_settings:
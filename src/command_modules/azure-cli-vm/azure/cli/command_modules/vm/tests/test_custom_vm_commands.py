@@ -15,7 +15,7 @@ from azure.cli.command_modules.vm.custom import (_get_access_extension_upgrade_i
                                                  _WINDOWS_ACCESS_EXT,
                                                  _get_extension_instance_name)
 from azure.cli.command_modules.vm.custom import \
-    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
+    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view, list_vm)
 from azure.cli.command_modules.vm.disk_encryption import (enable,
                                                           disable,
                                                           _check_encrypt_is_supported)
@@ -209,6 +209,68 @@ class Test_Vm_Custom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client')
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory')
+    def test_list_vm_show_details(self, factory_mock, network_factory_mock):
+        sub = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/'
+
+        def _nic(name, *public_ips):
+            ip_configurations = [mock.MagicMock(private_ip_address='10.0.0.{}'.format(i),
+                                                public_ip_address=mock.MagicMock(id=p) if p else None)
+                                 for i, p in enumerate(public_ips)]
+            return mock.MagicMock(id=sub + 'rg1/providers/Microsoft.Network/networkInterfaces/' + name,
+                                  mac_address='00-0D-3A-00-00-0' + name[-1], ip_configurations=ip_configurations)
+
+        def _public_ip(name, ip_address):
+            return mock.MagicMock(id=sub + 'rg1/providers/Microsoft.Network/publicIPAddresses/' + name,
+                                  ip_address=ip_address, dns_settings=None)
+
+        pips = [_public_ip('pip1', '40.0.0.1'), _public_ip('pip2', '40.0.0.2')]
+        nics = [_nic('nic1', pips[0].id, None), _nic('nic2', pips[1].id.upper())]
+        vms = [mock.MagicMock(id=sub + 'rg{0}/providers/Microsoft.Compute/virtualMachines/vm{0}'.format(i))
+               for i in range(1, 3)]
+        for i, vm in enumerate(vms):
+            vm.name = 'vm{}'.format(i + 1)
+
+        def _get_vm(resource_group_name, vm_name, expand=None):  # pylint: disable=unused-argument
+            nic_ref = mock.MagicMock(id=nics[int(vm_name[-1]) - 1].id)
+            return mock.MagicMock(network_profile=mock.MagicMock(network_interfaces=[nic_ref]),
+                                  instance_view=mock.MagicMock(statuses=[
+                                      InstanceViewStatus(code='ProvisioningState/succeeded'),
+                                      InstanceViewStatus(code='PowerState/running', display_status='VM running')]))
+
+        compute_client = factory_mock.return_value
+        compute_client.virtual_machines.list_all.return_value = iter(vms)
+        compute_client.virtual_machines.get.side_effect = _get_vm
+        network_client = network_factory_mock.return_value
+        network_client.network_interfaces.list_all.return_value = iter(nics)
+        network_client.public_ip_addresses.list_all.return_value = iter(pips)
+
+        # execute
+        result = list_vm(show_details=True)
+
+        # assert the NICs and public IPs are listed once rather than read for every VM
+        self.assertEqual([(r.power_state, r.private_ips, r.public_ips, r.mac_addresses) for r in result],
+                         [('VM running', '10.0.0.0,10.0.0.1', '40.0.0.1', '00-0D-3A-00-00-01'),
+                          ('VM running', '10.0.0.0', '40.0.0.2', '00-0D-3A-00-00-02')])
+        compute_client.virtual_machines.get.assert_any_call('rg2', 'vm2', expand='instanceView')
+        self.assertFalse(network_client.network_interfaces.get.called)
+        self.assertFalse(network_client.public_ip_addresses.get.called)
+        self.assertEqual(network_factory_mock.call_count, 1)
+
+        # the VMs of a resource group read their own NICs and public IPs rather than those of the subscription
+        network_client.reset_mock()
+        compute_client.virtual_machines.list.return_value = iter(vms[:1])
+        network_client.network_interfaces.get.return_value = nics[0]
+        network_client.public_ip_addresses.get.return_value = pips[0]
+        result = list_vm(resource_group_name='rg1', show_details=True)
+        self.assertEqual([(r.private_ips, r.public_ips) for r in result], [('10.0.0.0,10.0.0.1', '40.0.0.1')])
+        compute_client.virtual_machines.list.assert_called_once_with(resource_group_name='rg1')
+        network_client.network_interfaces.get.assert_called_once_with('rg1', 'nic1')
+        network_client.public_ip_addresses.get.assert_called_once_with('rg1', 'pip1')
+        self.assertFalse(network_client.network_interfaces.list_all.called)
+        self.assertFalse(network_client.public_ip_addresses.list_all.called)
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)